@@ -1,15 +1,16 @@
-import json
-
 import frappe
 from bs4 import BeautifulSoup
 from frappe import _
 from frappe.desk.form.load import get_docinfo
-from frappe.query_builder import JoinType
+from frappe.query_builder import Criterion, JoinType, Order
+from frappe.utils import cint, get_datetime
 
 from crm.fcrm.doctype.crm_call_log.crm_call_log import parse_call_log
+from crm.fcrm.doctype.crm_field_activity.crm_field_activity import get_field_activities, make_activity
 
 
 @frappe.whitelist()
+@frappe.read_only()
 def get_activities(name, _force_refresh=None):
 	"""Get activities for a lead or deal
 	
@@ -37,18 +38,6 @@ def get_activities(name, _force_refresh=None):
 def get_deal_activities(name):
 	get_docinfo("", "CRM Deal", name)
 	docinfo = frappe.response["docinfo"]
-	deal_meta = frappe.get_meta("CRM Deal")
-	deal_fields = {
-		field.fieldname: {"label": field.label, "options": field.options} for field in deal_meta.fields
-	}
-	avoid_fields = [
-		"lead",
-		"response_by",
-		"sla_creation",
-		"sla",
-		"first_response_time",
-		"first_responded_on",
-	]
 
 	doc = frappe.db.get_values("CRM Deal", name, ["creation", "owner", "lead"])[0]
 	lead = doc[2]
@@ -74,54 +63,7 @@ def get_deal_activities(name):
 		}
 	)
 
-	docinfo.versions.reverse()
-
-	for version in docinfo.versions:
-		data = json.loads(version.data)
-		if not data.get("changed"):
-			continue
-
-		if change := data.get("changed")[0]:
-			field = deal_fields.get(change[0], None)
-
-			if not field or change[0] in avoid_fields or (not change[1] and not change[2]):
-				continue
-
-			field_label = field.get("label") or change[0]
-			field_option = field.get("options") or None
-
-			activity_type = "changed"
-			data = {
-				"field": change[0],
-				"field_label": field_label,
-				"old_value": change[1],
-				"value": change[2],
-			}
-
-			if not change[1] and change[2]:
-				activity_type = "added"
-				data = {
-					"field": change[0],
-					"field_label": field_label,
-					"value": change[2],
-				}
-			elif change[1] and not change[2]:
-				activity_type = "removed"
-				data = {
-					"field": change[0],
-					"field_label": field_label,
-					"value": change[1],
-				}
-
-		activity = {
-			"activity_type": activity_type,
-			"creation": version.creation,
-			"owner": version.owner,
-			"data": data,
-			"is_lead": False,
-			"options": field_option,
-		}
-		activities.append(activity)
+	activities.extend(get_field_activities([("CRM Deal", name)]))
 
 	for comment in docinfo.comments:
 		activity = {
@@ -181,18 +123,6 @@ def get_deal_activities(name):
 def get_lead_activities(name):
 	get_docinfo("", "CRM Lead", name)
 	docinfo = frappe.response["docinfo"]
-	lead_meta = frappe.get_meta("CRM Lead")
-	lead_fields = {
-		field.fieldname: {"label": field.label, "options": field.options} for field in lead_meta.fields
-	}
-	avoid_fields = [
-		"converted",
-		"response_by",
-		"sla_creation",
-		"sla",
-		"first_response_time",
-		"first_responded_on",
-	]
 
 	doc = frappe.db.get_values("CRM Lead", name, ["creation", "owner"])[0]
 	activities = [
@@ -205,54 +135,7 @@ def get_lead_activities(name):
 		}
 	]
 
-	docinfo.versions.reverse()
-
-	for version in docinfo.versions:
-		data = json.loads(version.data)
-		if not data.get("changed"):
-			continue
-
-		if change := data.get("changed")[0]:
-			field = lead_fields.get(change[0], None)
-
-			if not field or change[0] in avoid_fields or (not change[1] and not change[2]):
-				continue
-
-			field_label = field.get("label") or change[0]
-			field_option = field.get("options") or None
-
-			activity_type = "changed"
-			data = {
-				"field": change[0],
-				"field_label": field_label,
-				"old_value": change[1],
-				"value": change[2],
-			}
-
-			if not change[1] and change[2]:
-				activity_type = "added"
-				data = {
-					"field": change[0],
-					"field_label": field_label,
-					"value": change[2],
-				}
-			elif change[1] and not change[2]:
-				activity_type = "removed"
-				data = {
-					"field": change[0],
-					"field_label": field_label,
-					"value": change[1],
-				}
-
-		activity = {
-			"activity_type": activity_type,
-			"creation": version.creation,
-			"owner": version.owner,
-			"data": data,
-			"is_lead": True,
-			"options": field_option,
-		}
-		activities.append(activity)
+	activities.extend(get_field_activities([("CRM Lead", name)]))
 
 	for comment in docinfo.comments:
 		activity = {
@@ -331,6 +214,7 @@ def get_attachments(doctype, name):
 
 
 def handle_multiple_versions(versions):
+	"""Group consecutive field changes of the same owner into the first one of them"""
 	activities = []
 	grouped_versions = []
 	old_version = None
@@ -352,8 +236,9 @@ def handle_multiple_versions(versions):
 			if is_version:
 				grouped_versions.append(version)
 		old_version = version
-		if version == versions[-1] and grouped_versions:
-			activities.append(parse_grouped_versions(grouped_versions))
+
+	if grouped_versions:
+		activities.append(parse_grouped_versions(grouped_versions))
 
 	return activities
 
@@ -510,3 +395,272 @@ def parse_attachment_log(html, type):
 		"file_url": a_tag["href"],
 		"is_private": is_private,
 	}
+
+
+# tables read by the activity feed
+FEED_SOURCES = {
+	"CRM Field Activity": {
+		"reference_fields": ("reference_doctype", "reference_docname"),
+		"fields": (
+			"name",
+			"creation",
+			"owner",
+			"reference_doctype",
+			"activity_type",
+			"field",
+			"field_label",
+			"field_options",
+			"old_value",
+			"value",
+		),
+	},
+	"Comment": {
+		"reference_fields": ("reference_doctype", "reference_name"),
+		"fields": ("name", "creation", "owner", "reference_doctype", "comment_type", "content"),
+		"condition": lambda table: table.comment_type.isin(["Comment", "Attachment", "Attachment Removed"]),
+	},
+	"Communication": {
+		"reference_fields": ("reference_doctype", "reference_name"),
+		"fields": (
+			"name",
+			"creation",
+			"reference_doctype",
+			"communication_type",
+			"subject",
+			"content",
+			"sender_full_name",
+			"sender",
+			"recipients",
+			"cc",
+			"bcc",
+			"read_by_recipient",
+			"delivery_status",
+		),
+		"condition": lambda table: table.communication_type.isin(["Communication", "Automated Message"]),
+	},
+	"CRM Call Log": {
+		"reference_fields": ("reference_doctype", "reference_docname"),
+		"fields": (
+			"name",
+			"creation",
+			"reference_doctype",
+			"caller",
+			"receiver",
+			"from",
+			"to",
+			"duration",
+			"start_time",
+			"end_time",
+			"status",
+			"type",
+			"recording_url",
+			"note",
+		),
+	},
+	"FCRM Note": {
+		"reference_fields": ("reference_doctype", "reference_docname"),
+		"fields": ("name", "creation", "owner", "reference_doctype", "title", "content", "modified"),
+	},
+}
+
+
+@frappe.whitelist()
+@frappe.read_only()
+def get_activity_feed(name, cursor=None, page_length=20):
+	"""Returns a page of the activities of a lead or deal, newest first.
+
+	Field changes, comments, communications, calls, notes and attachment logs of the deal and the lead it
+	was converted from are read straight from their tables, ordered by (creation, doctype, name).
+	Pass the returned `next_cursor` to get the next page, it is None on the last page."""
+	doctype = "CRM Deal" if frappe.db.exists("CRM Deal", name) else "CRM Lead"
+	frappe.get_doc(doctype, name).check_permission("read")
+
+	references = [(doctype, name)]
+	if doctype == "CRM Deal" and (lead := frappe.db.get_value("CRM Deal", name, "lead")):
+		references.append(("CRM Lead", lead))
+
+	page_length = min(cint(page_length) or 20, 100)
+	cursor = parse_feed_cursor(cursor)
+
+	rows = get_creation_rows(references, cursor)
+	for source in FEED_SOURCES:
+		rows.extend(get_feed_rows(source, references, cursor, page_length + 1))
+	rows.sort(key=feed_sort_key, reverse=True)
+
+	has_more = len(rows) > page_length
+	rows = rows[:page_length]
+	next_cursor = None
+	if has_more:
+		last = rows[-1]
+		next_cursor = [str(last.creation), last.source, last.name]
+
+	return {"activities": make_feed_activities(rows, references), "next_cursor": next_cursor}
+
+
+def parse_feed_cursor(cursor):
+	if not cursor:
+		return None
+
+	creation, source, name = frappe.parse_json(cursor)
+	return frappe._dict(creation=get_datetime(creation), source=source, name=name)
+
+
+def feed_sort_key(row):
+	return (row.creation, row.source, row.name)
+
+
+def get_creation_rows(references, cursor):
+	"""Returns the creation of the lead and deal as feed rows if they come after `cursor`"""
+	rows = []
+	for doctype, name in references:
+		creation, owner = frappe.db.get_value(doctype, name, ["creation", "owner"])
+		row = frappe._dict(
+			source="Creation", name=name, creation=creation, owner=owner, reference_doctype=doctype
+		)
+		if not cursor or feed_sort_key(row) < feed_sort_key(cursor):
+			rows.append(row)
+	return rows
+
+
+def get_feed_rows(source, references, cursor, limit):
+	"""Returns up to `limit` rows of `source` linked to `references` that come after `cursor`"""
+	config = FEED_SOURCES[source]
+	table = frappe.qb.DocType(source)
+	reference_doctype, reference_name = config["reference_fields"]
+
+	query = (
+		frappe.qb.from_(table)
+		.select(*(table[field] for field in config["fields"]))
+		.where(
+			Criterion.any(
+				(table[reference_doctype] == doctype) & (table[reference_name] == name)
+				for doctype, name in references
+			)
+		)
+		.orderby(table.creation, order=Order.desc)
+		.orderby(table.name, order=Order.desc)
+		.limit(limit)
+	)
+	if condition := config.get("condition"):
+		query = query.where(condition(table))
+
+	if cursor:
+		# rows are ordered by (creation, source, name), the source is the same for the whole query
+		if source < cursor.source:
+			query = query.where(table.creation <= cursor.creation)
+		elif source == cursor.source:
+			query = query.where(
+				(table.creation < cursor.creation)
+				| ((table.creation == cursor.creation) & (table.name < cursor.name))
+			)
+		else:
+			query = query.where(table.creation < cursor.creation)
+
+	rows = query.run(as_dict=True)
+	for row in rows:
+		row.source = source
+	return rows
+
+
+def make_feed_activities(rows, references):
+	attachments = get_feed_attachments(rows)
+	activities = []
+	for row in rows:
+		is_lead = row.reference_doctype == "CRM Lead"
+		if row.source == "Creation":
+			activity = {
+				"activity_type": "creation",
+				"creation": row.creation,
+				"owner": row.owner,
+				"data": "created this lead" if is_lead else "created this deal",
+			}
+			if not is_lead and len(references) > 1:
+				activity["data"] = "converted the lead to this deal"
+		elif row.source == "CRM Field Activity":
+			activity = make_activity(row)
+		elif row.source == "Comment" and row.comment_type == "Comment":
+			activity = {
+				"name": row.name,
+				"activity_type": "comment",
+				"creation": row.creation,
+				"owner": row.owner,
+				"content": row.content,
+				"attachments": attachments.get(("Comment", row.name), []),
+			}
+		elif row.source == "Comment":
+			activity = {
+				"name": row.name,
+				"activity_type": "attachment_log",
+				"creation": row.creation,
+				"owner": row.owner,
+				"data": parse_attachment_log(row.content, row.comment_type),
+			}
+		elif row.source == "Communication":
+			activity = {
+				"name": row.name,
+				"activity_type": "communication",
+				"communication_type": row.communication_type,
+				"creation": row.creation,
+				"data": {
+					"subject": row.subject,
+					"content": row.content,
+					"sender_full_name": row.sender_full_name,
+					"sender": row.sender,
+					"recipients": row.recipients,
+					"cc": row.cc,
+					"bcc": row.bcc,
+					"attachments": attachments.get(("Communication", row.name), []),
+					"read_by_recipient": row.read_by_recipient,
+					"delivery_status": row.delivery_status,
+				},
+			}
+		elif row.source == "CRM Call Log":
+			activity = parse_call_log(row)
+		else:
+			activity = {
+				"name": row.name,
+				"activity_type": "note",
+				"creation": row.creation,
+				"owner": row.owner,
+				"title": row.title,
+				"content": row.content,
+				"modified": row.modified,
+			}
+
+		if activity:
+			activity["is_lead"] = is_lead
+			activities.append(activity)
+
+	return handle_multiple_versions(activities)
+
+
+def get_feed_attachments(rows):
+	"""Returns files attached to the comments and communications of `rows` by (doctype, name)"""
+	names = [row.name for row in rows if row.source in ("Comment", "Communication")]
+	if not names:
+		return {}
+
+	attachments = {}
+	for file in frappe.get_all(
+		"File",
+		filters={
+			"attached_to_doctype": ("in", ["Comment", "Communication"]),
+			"attached_to_name": ("in", names),
+		},
+		fields=[
+			"name",
+			"file_name",
+			"file_type",
+			"file_url",
+			"file_size",
+			"is_private",
+			"modified",
+			"creation",
+			"owner",
+			"attached_to_doctype",
+			"attached_to_name",
+		],
+	):
+		key = (file.pop("attached_to_doctype"), file.pop("attached_to_name"))
+		attachments.setdefault(key, []).append(file)
+	return attachments
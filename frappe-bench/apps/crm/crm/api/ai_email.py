@@ -771,91 +771,101 @@ def process_bulk_emails(leads, tone, additional_context, test_mode=True, **kwarg
         failed_leads_details = job_data.get("failed_leads_details", [])
         
         total_leads = len(leads)
-        for i, lead_info in enumerate(leads):
-            lead_name = lead_info.get("name")
-            if not lead_name:
-                job_log(f"Skipping lead at index {i} due to missing name", "warning")
-                continue # Skip this iteration
+        # grows as leads are sent, messages share it and are serialized when the buffer flushes
+        processed_leads = [d["name"] for d in successful_leads_details]
+        # progress of a lead supersedes the previous one, the client only needs the latest message
+        # which carries every lead sent so far in processed_leads
+        with frappe.realtime.coalesce_realtime(events=["bulk_email_progress"], interval=1):
+            for i, lead_info in enumerate(leads):
+                lead_name = lead_info.get("name")
+                if not lead_name:
+                    job_log(f"Skipping lead at index {i} due to missing name", "warning")
+                    continue # Skip this iteration
                 
-            try:
-                job_log(f"Processing lead {i+1}/{total_leads}: {lead_name}", "info")
+                try:
+                    job_log(f"Processing lead {i+1}/{total_leads}: {lead_name}", "info")
                 
-                # Update progress in Redis
-                progress = int(((i + 1) / total_leads) * 100)
-                job_data["progress"] = progress
-                frappe.cache().set_value(job_meta_key, job_data, expires_in_sec=86400)
+                    # Update progress in Redis
+                    progress = int(((i + 1) / total_leads) * 100)
+                    job_data["progress"] = progress
+                    frappe.cache().set_value(job_meta_key, job_data, expires_in_sec=86400)
                 
-                # Broadcast progress update via websocket
-                try:
-                    frappe.publish_realtime(
-                        "bulk_email_progress", 
-                        {"lead": lead_name, "progress": progress, "status": "processing", "job_id": job_id}
-                    )
-                except Exception as e:
-                    job_log(f"Error sending realtime update: {str(e)}", "error")
+                    # Broadcast progress update via websocket
+                    try:
+                        frappe.publish_realtime(
+                            "bulk_email_progress", 
+                            {"lead": lead_name, "progress": progress, "status": "processing", "job_id": job_id,
+                             "processed_leads": processed_leads}
+                        )
+                    except Exception as e:
+                        job_log(f"Error sending realtime update: {str(e)}", "error")
                 
-                # Process this lead - Use the modified function
-                result = generate_email_for_lead(lead_name, tone, additional_context, test_mode)
+                    # Process this lead - Use the modified function
+                    result = generate_email_for_lead(lead_name, tone, additional_context, test_mode)
                 
-                # Record detailed success/failure
-                if result.get("generation_successful"):
-                    lead_detail = {
-                        "name": lead_name, 
-                        "communication_id": result.get("communication_id")
-                    }
-                    if result.get("sending_successful"):
-                        job_log(f"Successfully generated and sent email for lead {lead_name}", "info")
-                        successful_leads_details.append(lead_detail)
-                        # Send realtime update for success
-                        try:
-                            frappe.publish_realtime(
-                                "bulk_email_progress", 
-                                {"lead": lead_name, "progress": progress, "status": "success", "job_id": job_id}
-                            )
-                        except Exception as e:
-                            job_log(f"Error sending realtime success update: {str(e)}", "error")
+                    # Record detailed success/failure
+                    if result.get("generation_successful"):
+                        lead_detail = {
+                            "name": lead_name, 
+                            "communication_id": result.get("communication_id")
+                        }
+                        if result.get("sending_successful"):
+                            job_log(f"Successfully generated and sent email for lead {lead_name}", "info")
+                            successful_leads_details.append(lead_detail)
+                            processed_leads.append(lead_name)
+                            # Send realtime update for success
+                            try:
+                                frappe.publish_realtime(
+                                    "bulk_email_progress", 
+                                    {"lead": lead_name, "progress": progress, "status": "success", "job_id": job_id,
+                                     "processed_leads": processed_leads}
+                                )
+                            except Exception as e:
+                                job_log(f"Error sending realtime success update: {str(e)}", "error")
+                        else:
+                            job_log(f"Generated communication for {lead_name} but failed to send email: {result.get('message')}", "error")
+                            lead_detail["error"] = f"Send failed: {result.get('message')}"
+                            failed_leads_details.append(lead_detail)
+                            # Send realtime update for error
+                            try:
+                                frappe.publish_realtime(
+                                    "bulk_email_progress", 
+                                    {"lead": lead_name, "progress": progress, "status": "error", "job_id": job_id, "error": result.get("message"),
+                                     "processed_leads": processed_leads}
+                                )
+                            except Exception as e:
+                                job_log(f"Error sending realtime error update: {str(e)}", "error")
                     else:
-                        job_log(f"Generated communication for {lead_name} but failed to send email: {result.get('message')}", "error")
-                        lead_detail["error"] = f"Send failed: {result.get('message')}"
-                        failed_leads_details.append(lead_detail)
+                        job_log(f"Failed to generate email/communication for lead {lead_name}: {result.get('message')}", "error")
+                        failed_leads_details.append({
+                            "name": lead_name, 
+                            "error": f"Generation failed: {result.get('message')}"
+                        })
                         # Send realtime update for error
                         try:
                             frappe.publish_realtime(
                                 "bulk_email_progress", 
-                                {"lead": lead_name, "progress": progress, "status": "error", "job_id": job_id, "error": result.get("message")}
+                                {"lead": lead_name, "progress": progress, "status": "error", "job_id": job_id, "error": result.get("message"),
+                                 "processed_leads": processed_leads}
                             )
                         except Exception as e:
                             job_log(f"Error sending realtime error update: {str(e)}", "error")
-                else:
-                    job_log(f"Failed to generate email/communication for lead {lead_name}: {result.get('message')}", "error")
-                    failed_leads_details.append({
-                        "name": lead_name, 
-                        "error": f"Generation failed: {result.get('message')}"
-                    })
-                    # Send realtime update for error
-                    try:
-                        frappe.publish_realtime(
-                            "bulk_email_progress", 
-                            {"lead": lead_name, "progress": progress, "status": "error", "job_id": job_id, "error": result.get("message")}
-                        )
-                    except Exception as e:
-                        job_log(f"Error sending realtime error update: {str(e)}", "error")
 
-                # Update job data in Redis with detailed lists immediately after processing
-                job_data["successful_leads_details"] = successful_leads_details
-                job_data["failed_leads_details"] = failed_leads_details
-                frappe.cache().set_value(job_meta_key, job_data, expires_in_sec=86400)
+                    # Update job data in Redis with detailed lists immediately after processing
+                    job_data["successful_leads_details"] = successful_leads_details
+                    job_data["failed_leads_details"] = failed_leads_details
+                    frappe.cache().set_value(job_meta_key, job_data, expires_in_sec=86400)
                 
-                time.sleep(0.5) # Add delay
+                    time.sleep(0.5) # Add delay
                 
-            except Exception as e:
-                # Catch unexpected errors during the loop iteration
-                job_log(f"CRITICAL LOOP ERROR processing lead {lead_name}: {str(e)}", "error")
-                job_log(f"ERROR TRACEBACK (loop): {frappe.get_traceback()}", "error")
-                failed_leads_details.append({"name": lead_name, "error": f"Loop error: {str(e)}"})
-                # Update job data in Redis immediately
-                job_data["failed_leads_details"] = failed_leads_details
-                frappe.cache().set_value(job_meta_key, job_data, expires_in_sec=86400)
+                except Exception as e:
+                    # Catch unexpected errors during the loop iteration
+                    job_log(f"CRITICAL LOOP ERROR processing lead {lead_name}: {str(e)}", "error")
+                    job_log(f"ERROR TRACEBACK (loop): {frappe.get_traceback()}", "error")
+                    failed_leads_details.append({"name": lead_name, "error": f"Loop error: {str(e)}"})
+                    # Update job data in Redis immediately
+                    job_data["failed_leads_details"] = failed_leads_details
+                    frappe.cache().set_value(job_meta_key, job_data, expires_in_sec=86400)
                 
         # Update final job status in Redis
         job_data["status"] = "completed" if not failed_leads_details else "completed_with_errors"
@@ -0,0 +1,145 @@
+import frappe
+import numpy as np
+from frappe import _
+
+from crm.fcrm.doctype.crm_pipeline_velocity.crm_pipeline_velocity import (
+	PIPELINE_DOCTYPES,
+	get_percentiles,
+	parse_histograms,
+)
+
+PERCENTILES = [50, 75, 90, 95]
+
+# length of the ISO date prefix identifying a period
+PERIODS = {"day": 10, "month": 7, "year": 4}
+
+STATUS_DOCTYPES = {"CRM Lead": "CRM Lead Status", "CRM Deal": "CRM Deal Status"}
+
+
+@frappe.whitelist()
+@frappe.read_only()
+def get_pipeline_velocity(doctype="CRM Deal", from_date=None, to_date=None, group_by=None, period=None):
+	"""Returns time spent per stage (transitions, average and percentile durations in seconds) along
+	with the ratio of exits towards every next stage, computed from CRM Pipeline Velocity rollups.
+
+	:param group_by: `user` to split every stage per owner
+	:param period: `day`, `month` or `year` to split every stage per period
+	"""
+	rollups = get_rollups(doctype, from_date, to_date)
+	if not rollups:
+		return []
+
+	group_keys = np.array(
+		[
+			"\x1f".join(
+				(
+					r.from_status or "",
+					(r.user or "") if group_by == "user" else "",
+					str(r.date)[: PERIODS[period]] if period in PERIODS else "",
+				)
+			)
+			for r in rollups
+		]
+	)
+	to_status = np.array([r.to_status or "" for r in rollups])
+	transitions = np.array([r.transitions for r in rollups], dtype=np.int64)
+	total_durations = np.array([r.total_duration for r in rollups], dtype=float)
+	histograms = parse_histograms([r.duration_histogram for r in rollups])
+
+	groups, inverse = np.unique(group_keys, return_inverse=True)
+	group_transitions = np.bincount(inverse, weights=transitions, minlength=len(groups))
+	group_durations = np.bincount(inverse, weights=total_durations, minlength=len(groups))
+	group_histograms = np.zeros((len(groups), histograms.shape[1]), dtype=np.int64)
+	np.add.at(group_histograms, inverse, histograms)
+	percentiles = get_percentiles(group_histograms, PERCENTILES)
+
+	# exits per (group, next stage)
+	exit_keys = np.char.add(np.char.add(inverse.astype(str), "\x1f"), to_status)
+	exits, exit_inverse = np.unique(exit_keys, return_inverse=True)
+	exit_transitions = np.bincount(exit_inverse, weights=transitions, minlength=len(exits))
+
+	stages = []
+	for i, key in enumerate(groups):
+		stage, user, _period = key.split("\x1f")
+		count = group_transitions[i]
+		row = {
+			"stage": stage,
+			"transitions": int(count),
+			"average_duration": float(group_durations[i] / count) if count else 0,
+			"exits": {},
+		}
+		if group_by == "user":
+			row["user"] = user or None
+		if period in PERIODS:
+			row["period"] = _period
+		for p, value in zip(PERCENTILES, percentiles[i], strict=True):
+			row[f"p{p}"] = float(value)
+		stages.append(row)
+
+	for key, count in zip(exits, exit_transitions, strict=True):
+		group, to = key.split("\x1f")
+		stage = stages[int(group)]
+		stage["exits"][to] = round(float(count / stage["transitions"]), 4) if stage["transitions"] else 0
+
+	return stages
+
+
+@frappe.whitelist()
+@frappe.read_only()
+def get_pipeline_funnel(doctype="CRM Deal", from_date=None, to_date=None):
+	"""Returns, for every stage in pipeline order, how many transitions left it and the share of
+	those that moved forward to a later stage."""
+	rollups = get_rollups(doctype, from_date, to_date)
+
+	statuses = frappe.get_all(
+		STATUS_DOCTYPES[doctype], fields=["name"], order_by="position asc", pluck="name"
+	)
+	positions = {status: i for i, status in enumerate(statuses)}
+
+	from_position = np.array([positions.get(r.from_status, -1) for r in rollups], dtype=np.int64)
+	to_position = np.array([positions.get(r.to_status, -1) for r in rollups], dtype=np.int64)
+	transitions = np.array([r.transitions for r in rollups], dtype=np.int64)
+
+	known = from_position >= 0
+	exits = np.bincount(from_position[known], weights=transitions[known], minlength=len(statuses))
+	forward = known & (to_position > from_position)
+	advanced = np.bincount(from_position[forward], weights=transitions[forward], minlength=len(statuses))
+
+	return [
+		{
+			"stage": status,
+			"exits": int(exits[i]),
+			"advanced": int(advanced[i]),
+			"conversion": round(float(advanced[i] / exits[i]), 4) if exits[i] else 0,
+		}
+		for i, status in enumerate(statuses)
+	]
+
+
+def get_rollups(doctype, from_date=None, to_date=None):
+	if doctype not in PIPELINE_DOCTYPES:
+		frappe.throw(_("Pipeline analytics are not available for {0}").format(doctype))
+
+	frappe.has_permission("CRM Pipeline Velocity", "read", throw=True)
+
+	filters = {"reference_doctype": doctype}
+	if from_date and to_date:
+		filters["date"] = ["between", [from_date, to_date]]
+	elif from_date:
+		filters["date"] = [">=", from_date]
+	elif to_date:
+		filters["date"] = ["<=", to_date]
+
+	return frappe.get_all(
+		"CRM Pipeline Velocity",
+		filters=filters,
+		fields=[
+			"date",
+			"user",
+			"from_status",
+			"to_status",
+			"transitions",
+			"total_duration",
+			"duration_histogram",
+		],
+	)
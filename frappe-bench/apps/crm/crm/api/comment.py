@@ -19,17 +19,22 @@ def notify_mentions(doc):
     if not content:
         return
     mentions = extract_mentions(content)
-    reference_doc = frappe.get_doc(doc.reference_doctype, doc.reference_name)
+    if not mentions:
+        return
+
+    owner = frappe.get_cached_value("User", doc.owner, "full_name")
+    doctype = doc.reference_doctype
+    if doctype.startswith("CRM "):
+        doctype = doctype[4:].lower()
+    reference = frappe.db.get_value(
+        doc.reference_doctype,
+        doc.reference_name,
+        ["lead_name", "organization"] if doctype == "deal" else ["lead_name"],
+        as_dict=True,
+    ) or frappe._dict()
+    name = reference.get("organization") or reference.lead_name
+
     for mention in mentions:
-        owner = frappe.get_cached_value("User", doc.owner, "full_name")
-        doctype = doc.reference_doctype
-        if doctype.startswith("CRM "):
-            doctype = doctype[4:].lower()
-        name = (
-            reference_doc.lead_name
-            if doctype == "lead"
-            else reference_doc.organization or reference_doc.lead_name
-        )
         notification_text = f"""
             <div class="mb-2 leading-5 text-ink-gray-5">
                 <span class="font-medium text-ink-gray-9">{ owner }</span>
@@ -1,5 +1,6 @@
 import frappe
 from frappe import _
+from frappe.core.doctype.version.version import deferred_versions
 
 
 def validate(doc, method):
@@ -9,16 +10,16 @@ def validate(doc, method):
 def update_deals_email_mobile_no(doc):
 	linked_deals = frappe.get_all(
 		"CRM Contacts",
-		filters={"contact": doc.name, "is_primary": 1},
-		fields=["parent"],
+		filters={"contact": doc.name, "is_primary": 1, "parenttype": "CRM Deal"},
+		pluck="parent",
 	)
 
-	for linked_deal in linked_deals:
-		deal = frappe.get_cached_doc("CRM Deal", linked_deal.parent)
-		if deal.email != doc.email_id or deal.mobile_no != doc.mobile_no:
-			deal.email = doc.email_id
-			deal.mobile_no = doc.mobile_no
-			deal.save(ignore_permissions=True)
+	with deferred_versions():
+		for deal in frappe.get_docs("CRM Deal", linked_deals):
+			if deal.email != doc.email_id or deal.mobile_no != doc.mobile_no:
+				deal.email = doc.email_id
+				deal.mobile_no = doc.mobile_no
+				deal.save(ignore_permissions=True)
 
 
 @frappe.whitelist()
@@ -49,24 +50,7 @@ def get_linked_deals(contact):
 	)
 
 	# get deals data
-	deals = []
-	for d in deal_names:
-		deal = frappe.get_cached_doc(
-			"CRM Deal",
-			d.parent,
-			fields=[
-				"name",
-				"organization",
-				"currency",
-				"annual_revenue",
-				"status",
-				"email",
-				"mobile_no",
-				"deal_owner",
-				"modified",
-			],
-		)
-		deals.append(deal.as_dict())
+	deals = [deal.as_dict() for deal in frappe.get_cached_docs("CRM Deal", [d.parent for d in deal_names])]
 
 	return deals
 
@@ -1,111 +1,191 @@
 import frappe
 import random
-import json
-import datetime
-from frappe.utils import now_datetime, add_days, get_datetime
+from frappe.query_builder.functions import Count, Sum
+from frappe.utils import now_datetime, nowdate, add_days, get_datetime, getdate
 import numpy as np
 
-@frappe.whitelist(allow_guest=True)
+from crm.fcrm.doctype.crm_organization.crm_organization import SEGMENTS
+
+# days of won deals the forecast model is fitted on
+HISTORY_DAYS = 120
+# days of history returned for the chart
+DISPLAY_DAYS = 30
+FORECAST_DAYS = 14
+WON_STATUS = "Won"
+# deal fields the forecast is computed from
+FORECAST_FIELDS = ("status", "close_date", "annual_revenue")
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+@frappe.whitelist()
+@frappe.read_only()
 def get_sales_forecast():
     """
-    Generate a simulated sales forecast with machine learning-like predictions
+    Sales forecast fitted on won deal amounts by close date.
+
+    Only deals the user can read are included, so the result is cached per user and rebuilt when
+    a won deal changes or the day rolls over. Forecasts read from a lagging replica aren't cached.
     """
-    # Generate some random historical data
-    today = get_datetime(now_datetime())
-    dates = [(add_days(today, -i)).strftime("%Y-%m-%d") for i in range(30, 0, -1)]
-    
-    # Create some realistic sales data with weekly patterns
-    base_sales = 1000
-    weekly_pattern = [1.2, 1.0, 0.9, 0.8, 1.1, 1.5, 0.7]  # Mon-Sun pattern
-    
-    historical_data = []
-    for i, date in enumerate(dates):
-        day_of_week = get_datetime(date).weekday()
-        pattern_factor = weekly_pattern[day_of_week]
-        
-        # Add some randomness and a slight upward trend
-        trend_factor = 1 + (i * 0.005)
-        random_factor = random.uniform(0.85, 1.15)
-        
-        sales = base_sales * pattern_factor * trend_factor * random_factor
-        historical_data.append({
-            "date": date,
-            "sales": round(sales, 2),
-            "actual": True
-        })
-    
-    # Generate forecast data
-    future_dates = [(add_days(today, i)).strftime("%Y-%m-%d") for i in range(1, 15)]
-    
-    # Simple "ML" forecast - use historical patterns with added uncertainty
-    forecast_data = []
-    for i, date in enumerate(future_dates):
-        day_of_week = get_datetime(date).weekday()
-        pattern_factor = weekly_pattern[day_of_week]
-        
-        # Calculate trend from historical data
-        historical_avg = sum(item["sales"] for item in historical_data) / len(historical_data)
-        recent_avg = sum(item["sales"] for item in historical_data[-7:]) / 7
-        trend_direction = recent_avg / historical_avg
-        
-        # Forecast with increasing uncertainty
-        uncertainty = 1 + (i * 0.02)
-        forecast = base_sales * pattern_factor * trend_direction * uncertainty
-        
-        # Calculate confidence intervals
-        lower_bound = forecast * (1 - (0.05 * (i+1)))
-        upper_bound = forecast * (1 + (0.05 * (i+1)))
-        
-        forecast_data.append({
-            "date": date,
-            "sales": round(forecast, 2),
-            "lower_bound": round(lower_bound, 2),
-            "upper_bound": round(upper_bound, 2),
-            "actual": False
-        })
-    
-    # Generate insights
-    weekly_total = sum(item["sales"] for item in historical_data[-7:])
-    previous_weekly_total = sum(item["sales"] for item in historical_data[-14:-7])
-    week_over_week_change = (weekly_total - previous_weekly_total) / previous_weekly_total * 100
-    
-    best_day = max(historical_data[-30:], key=lambda x: x["sales"])
-    worst_day = min(historical_data[-30:], key=lambda x: x["sales"])
-    
-    # Calculate seasonality using FFT
-    sales_values = [item["sales"] for item in historical_data]
-    fft_values = np.abs(np.fft.rfft(sales_values))
-    frequencies = np.fft.rfftfreq(len(sales_values))
-    
-    # Find dominant frequencies (excluding DC component)
+    frappe.has_permission("CRM Deal", "read", throw=True)
+
+    today = getdate(nowdate())
+    user = frappe.session.user
+    forecast = frappe.cache.hget("crm_sales_forecast", user)
+    if not forecast or forecast["date"] != str(today):
+        forecast = build_sales_forecast(today)
+        if getattr(frappe.local, "replica_db", None) is not frappe.db:
+            frappe.cache.hset("crm_sales_forecast", user, forecast)
+    return forecast["forecast"]
+
+
+def clear_sales_forecast_cache(doc, method=None):
+    """Clear the cached forecasts after commit when a won deal is deleted or its status, close date or
+    amount changed, clearing before commit lets a concurrent request cache the old figures again"""
+    previous = doc.get_doc_before_save()
+    if doc.status != WON_STATUS and not (previous and previous.status == WON_STATUS):
+        return
+    if method != "on_trash" and not any(doc.has_value_changed(field) for field in FORECAST_FIELDS):
+        return
+
+    # once per transaction
+    if frappe.flags.sales_forecast_changed:
+        return
+    frappe.flags.sales_forecast_changed = True
+    frappe.db.after_commit.add(delete_sales_forecast_cache)
+    frappe.db.after_rollback.add(reset_sales_forecast_changed)
+
+
+def delete_sales_forecast_cache():
+    reset_sales_forecast_changed()
+    frappe.cache.delete_value("crm_sales_forecast")
+
+
+def reset_sales_forecast_changed():
+    frappe.flags.sales_forecast_changed = False
+
+
+def get_daily_sales(start, end):
+    """Returns an array of won deal amounts per day from `start` to `end` (both inclusive), of deals the
+    user can read"""
+    rows = frappe.get_list(
+        "CRM Deal",
+        filters={"status": WON_STATUS, "close_date": ["between", [start, end]]},
+        fields=["close_date", "sum(annual_revenue) as amount"],
+        group_by="close_date",
+        order_by="close_date",
+        as_list=True,
+    )
+
+    sales = np.zeros((end - start).days + 1)
+    if rows:
+        close_dates, amounts = zip(*rows, strict=True)
+        days = (np.array(close_dates, dtype="datetime64[D]") - np.datetime64(start, "D")).astype(int)
+        np.add.at(sales, days, np.array(amounts, dtype=float))
+    return sales
+
+
+def get_design_matrix(days, first_weekday):
+    """Trend + weekly seasonality regressors: intercept, day index and one-hot weekday (Monday as baseline)"""
+    weekdays = (first_weekday + days) % 7
+    seasonal = weekdays[:, None] == np.arange(1, 7)[None, :]
+    return np.column_stack([np.ones(len(days)), days, seasonal.astype(float)])
+
+
+def fit_sales_forecast(sales, first_weekday, horizon):
+    """
+    Fit a linear trend with weekly seasonality on `sales` by least squares.
+
+    Returns the fitted model as (forecast, lower_bound, upper_bound, r_squared, weekday_effects)
+    with 95% prediction intervals for the next `horizon` days.
+    """
+    n = len(sales)
+    X = get_design_matrix(np.arange(n), first_weekday)
+    coefficients, *_ = np.linalg.lstsq(X, sales, rcond=None)
+
+    residuals = sales - X @ coefficients
+    dof = max(n - X.shape[1], 1)
+    sigma = np.sqrt(residuals @ residuals / dof)
+    total = ((sales - sales.mean()) ** 2).sum()
+    r_squared = 1 - (residuals @ residuals) / total if total else 0.0
+
+    X_future = get_design_matrix(np.arange(n, n + horizon), first_weekday)
+    forecast = X_future @ coefficients
+    leverage = np.einsum("ij,jk,ik->i", X_future, np.linalg.pinv(X.T @ X), X_future)
+    margin = 1.96 * sigma * np.sqrt(1 + leverage)
+
+    # seasonal effects relative to Monday, indexed by weekday
+    weekday_effects = np.concatenate([[0.0], coefficients[2:]])
+    return (
+        np.clip(forecast, 0, None),
+        np.clip(forecast - margin, 0, None),
+        np.clip(forecast + margin, 0, None),
+        float(np.clip(r_squared, 0, 1)),
+        weekday_effects,
+    )
+
+
+def get_seasonality(sales):
+    """Detect a weekly cycle from the dominant frequencies of the detrended series"""
+    if len(sales) < 14 or not sales.any():
+        return "No clear pattern"
+
+    days = np.arange(len(sales))
+    detrended = sales - np.polyval(np.polyfit(days, sales, 1), days)
+    fft_values = np.abs(np.fft.rfft(detrended))
+    frequencies = np.fft.rfftfreq(len(sales))
+
+    # dominant frequencies, excluding the DC component
     dominant_idx = np.argsort(fft_values[1:])[-3:] + 1
-    dominant_periods = [round(1/frequencies[idx]) if frequencies[idx] > 0 else 0 for idx in dominant_idx]
-    
-    # Filter out invalid periods
-    valid_periods = [p for p in dominant_periods if 0 < p <= len(sales_values)]
-    seasonality = "Weekly" if 7 in valid_periods or 6 in valid_periods or 8 in valid_periods else "No clear pattern"
-    
-    # Projected monthly revenue
-    projected_monthly = sum(item["sales"] for item in forecast_data[:min(len(forecast_data), 30)])
-    
+    dominant_periods = np.round(1 / frequencies[dominant_idx])
+    return "Weekly" if np.isin(dominant_periods, [6, 7, 8]).any() else "No clear pattern"
+
+
+def build_sales_forecast(today):
+    start = add_days(today, -HISTORY_DAYS)
+    end = add_days(today, -1)
+    sales = get_daily_sales(start, end)
+    first_weekday = start.weekday()
+
+    forecast, lower_bound, upper_bound, r_squared, weekday_effects = fit_sales_forecast(
+        sales, first_weekday, 30
+    )
+
+    display_dates = [add_days(end, -i) for i in range(DISPLAY_DAYS - 1, -1, -1)]
+    historical_data = [
+        {"date": str(date), "sales": round(float(value), 2), "actual": True}
+        for date, value in zip(display_dates, sales[-DISPLAY_DAYS:], strict=True)
+    ]
+    forecast_data = [
+        {
+            "date": str(add_days(today, i)),
+            "sales": round(float(forecast[i]), 2),
+            "lower_bound": round(float(lower_bound[i]), 2),
+            "upper_bound": round(float(upper_bound[i]), 2),
+            "actual": False,
+        }
+        for i in range(FORECAST_DAYS)
+    ]
+
+    weekly_total = sales[-7:].sum()
+    previous_weekly_total = sales[-14:-7].sum()
+    week_over_week_change = (
+        (weekly_total - previous_weekly_total) / previous_weekly_total * 100 if previous_weekly_total else 0
+    )
+
+    recent = sales[-DISPLAY_DAYS:]
+    best_day = historical_data[int(recent.argmax())]
+    worst_day = historical_data[int(recent.argmin())]
+
     insights = {
-        "week_over_week_change": round(week_over_week_change, 2),
-        "best_day": {
-            "date": best_day["date"],
-            "sales": round(best_day["sales"], 2)
-        },
-        "worst_day": {
-            "date": worst_day["date"],
-            "sales": round(worst_day["sales"], 2)
-        },
-        "seasonality": seasonality,
-        "projected_monthly_revenue": round(projected_monthly, 2),
-        "confidence_score": random.randint(70, 95)
+        "week_over_week_change": round(float(week_over_week_change), 2),
+        "best_day": {"date": best_day["date"], "sales": best_day["sales"]},
+        "worst_day": {"date": worst_day["date"], "sales": worst_day["sales"]},
+        "seasonality": get_seasonality(sales),
+        "projected_monthly_revenue": round(float(forecast.sum()), 2),
+        "confidence_score": round(r_squared * 100),
     }
-    
-    # Generate some recommendations based on the data
+
     recommendations = []
-    
     if week_over_week_change < 0:
         recommendations.append({
             "type": "warning",
@@ -116,60 +196,68 @@ def get_sales_forecast():
             "type": "success",
             "message": "Sales are up {0}% week-over-week. Great job!".format(round(week_over_week_change, 1))
         })
-    
-    # Day of week recommendation
-    best_day_name = get_datetime(best_day["date"]).strftime("%A")
-    worst_day_name = get_datetime(worst_day["date"]).strftime("%A")
-    
-    recommendations.append({
-        "type": "info",
-        "message": "{0} is typically your best performing day. Consider allocating more resources.".format(best_day_name)
-    })
-    
-    recommendations.append({
-        "type": "info",
-        "message": "{0} is typically your worst performing day. Consider special promotions.".format(worst_day_name)
-    })
-    
-    # Return combined data
+
+    if weekday_effects.any():
+        recommendations.append({
+            "type": "info",
+            "message": "{0} is typically your best performing day. Consider allocating more resources.".format(WEEKDAYS[int(weekday_effects.argmax())])
+        })
+        recommendations.append({
+            "type": "info",
+            "message": "{0} is typically your worst performing day. Consider special promotions.".format(WEEKDAYS[int(weekday_effects.argmin())])
+        })
+
     return {
-        "historical_data": historical_data,
-        "forecast_data": forecast_data,
-        "insights": insights,
-        "recommendations": recommendations
+        "date": str(today),
+        "forecast": {
+            "historical_data": historical_data,
+            "forecast_data": forecast_data,
+            "insights": insights,
+            "recommendations": recommendations,
+        },
     }
 
-@frappe.whitelist(allow_guest=True)
+@frappe.whitelist()
+@frappe.read_only()
 def get_customer_segments():
     """
-    Generate simulated customer segmentation data
+    Organization counts and won deal revenue per customer segment, see `update_customer_segments`
     """
-    segments = [
-        {"name": "High Value", "count": random.randint(50, 150), "avg_revenue": random.uniform(5000, 10000)},
-        {"name": "Regular", "count": random.randint(500, 1500), "avg_revenue": random.uniform(1000, 3000)},
-        {"name": "Occasional", "count": random.randint(2000, 5000), "avg_revenue": random.uniform(200, 800)},
-        {"name": "New", "count": random.randint(100, 400), "avg_revenue": random.uniform(50, 200)},
-        {"name": "At Risk", "count": random.randint(20, 100), "avg_revenue": random.uniform(1500, 4000)}
-    ]
-    
-    # Calculate totals
-    total_customers = sum(segment["count"] for segment in segments)
-    total_revenue = sum(segment["count"] * segment["avg_revenue"] for segment in segments)
-    
-    # Add percentage and format values
-    for segment in segments:
-        segment["percentage"] = round((segment["count"] / total_customers) * 100, 1)
-        segment["avg_revenue"] = round(segment["avg_revenue"], 2)
-        segment["total_revenue"] = round(segment["count"] * segment["avg_revenue"], 2)
-        segment["revenue_percentage"] = round((segment["total_revenue"] / total_revenue) * 100, 1)
-    
+    frappe.has_permission("CRM Organization", "read", throw=True)
+
+    Organization = frappe.qb.DocType("CRM Organization")
+    rows = (
+        frappe.qb.from_(Organization)
+        .select(Organization.customer_segment, Count("*"), Sum(Organization.won_deal_revenue))
+        .where(Organization.customer_segment.isin(SEGMENTS))
+        .groupby(Organization.customer_segment)
+        .run()
+    )
+    totals = {segment: (count, revenue or 0) for segment, count, revenue in rows}
+
+    total_customers = sum(count for count, _ in totals.values())
+    total_revenue = sum(revenue for _, revenue in totals.values())
+
+    segments = []
+    for name in SEGMENTS:
+        count, revenue = totals.get(name, (0, 0))
+        segments.append({
+            "name": name,
+            "count": count,
+            "avg_revenue": round(revenue / count, 2) if count else 0,
+            "total_revenue": round(revenue, 2),
+            "percentage": round(count / total_customers * 100, 1) if total_customers else 0,
+            "revenue_percentage": round(revenue / total_revenue * 100, 1) if total_revenue else 0,
+        })
+
     return {
         "segments": segments,
         "total_customers": total_customers,
         "total_revenue": round(total_revenue, 2)
     }
 
-@frappe.whitelist(allow_guest=True)
+@frappe.whitelist()
+@frappe.read_only()
 def get_sentiment_analysis():
     """
     Generate simulated sentiment analysis data from customer interactions
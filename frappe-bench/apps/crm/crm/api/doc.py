@@ -1,3 +1,4 @@
+import hashlib
 import json
 
 import frappe
@@ -9,7 +10,7 @@ from frappe.utils import make_filter_tuple
 from pypika import Criterion
 
 from crm.api.views import get_views
-from crm.fcrm.doctype.crm_form_script.crm_form_script import get_form_script
+from crm.fcrm.doctype.crm_form_script.crm_form_script import get_form_script, get_form_scripts
 
 
 @frappe.whitelist()
@@ -272,6 +273,7 @@ def update_in_standard_filter(fieldname, doctype, value):
 
 
 @frappe.whitelist()
+@frappe.read_only()
 def get_data(
 	doctype: str,
 	filters: dict,
@@ -286,7 +288,12 @@ def get_data(
 	kanban_fields=[],
 	view=None,
 	default_filters=None,
+	script_hashes=None,
 ):
+	"""
+	:param script_hashes: hashes of the form and list scripts the client already has, as
+	        `{"Form": hash, "List": hash}`, matching scripts are not sent again
+	"""
 	custom_view = False
 	filters = frappe._dict(filters)
 	rows = frappe.parse_json(rows or "[]")
@@ -556,12 +563,21 @@ def get_data(
 			0
 		].total_count,
 		"row_count": len(data),
-		"form_script": get_form_script(doctype),
-		"list_script": get_form_script(doctype, "List"),
+		**get_scripts_payload(doctype, frappe.parse_json(script_hashes) or {}),
 		"view_type": view_type,
 	}
 
 
+def get_scripts_payload(doctype, script_hashes):
+	payload = {}
+	for view, key in (("Form", "form_script"), ("List", "list_script")):
+		scripts = get_form_scripts(doctype, view)
+		payload[f"{key}_hash"] = scripts["hash"]
+		if not scripts["hash"] or scripts["hash"] != script_hashes.get(view):
+			payload[key] = scripts["script"]
+	return payload
+
+
 def parse_list_data(data, doctype):
 	_list = get_controller(doctype)
 	if hasattr(_list, "parse_list_data"):
@@ -659,6 +675,52 @@ def get_fields_meta(doctype, restricted_fieldtypes=None, as_array=False, only_re
 	return fields_meta
 
 
+@frappe.whitelist()
+def get_form_meta(doctype: str):
+	"""Returns the static form metadata (fields meta & form script) of the doctype along with its version.
+
+	Document payloads (`get_lead`, `get_deal`) only carry the version token so the client can reuse the
+	metadata it already has and call this only when the token changes."""
+	form_meta = _get_form_meta(doctype)
+	return {
+		"version": form_meta["version"],
+		"fields_meta": form_meta["fields_meta"],
+		"form_script": form_meta["form_script"],
+	}
+
+
+def get_form_meta_version(doctype):
+	"""Returns the token identifying the current form metadata of the doctype"""
+	return _get_form_meta(doctype)["version"]
+
+
+def _get_form_meta(doctype):
+	# metadata_version is reset whenever a doctype's cache is cleared (DocType, Custom Field,
+	# Property Setter changes), form script changes clear the cached entry via `clear_form_meta_cache`
+	metadata_version = frappe.client_cache.get_value("metadata_version") or frappe.reset_metadata_version()
+
+	form_meta = frappe.cache.hget("crm_form_meta", doctype)
+	if form_meta and form_meta.get("metadata_version") == metadata_version:
+		return form_meta
+
+	fields_meta = get_fields_meta(doctype)
+	form_script = get_form_script(doctype)
+	form_meta = {
+		"metadata_version": metadata_version,
+		"fields_meta": fields_meta,
+		"form_script": form_script,
+		"version": hashlib.md5(
+			frappe.as_json([fields_meta, form_script], indent=None).encode(), usedforsecurity=False
+		).hexdigest(),
+	}
+	frappe.cache.hset("crm_form_meta", doctype, form_meta)
+	return form_meta
+
+
+def clear_form_meta_cache(doctype):
+	frappe.cache.hdel("crm_form_meta", doctype)
+
+
 def get_assigned_users(doctype, name, default_assigned_to=None):
 	assigned_users = frappe.get_all(
 		"ToDo",
@@ -0,0 +1,187 @@
+import csv
+import os
+
+import frappe
+import openpyxl
+from frappe import _
+from frappe.core.doctype.access_log.access_log import make_access_log
+from frappe.desk.reportview import get_field_info, parse_field
+from frappe.desk.utils import slug
+from frappe.model.db_query import DatabaseQuery
+from frappe.utils import cint, format_duration
+from frappe.utils.xlsxutils import ILLEGAL_CHARACTERS_RE, INVALID_TITLE_REGEX, handle_html
+
+FILE_EXTENSIONS = {"CSV": "csv", "Excel": "xlsx"}
+
+# rows between two progress updates
+PROGRESS_INTERVAL = 5000
+
+
+@frappe.whitelist()
+def export_list(
+	doctype: str,
+	fields: str,
+	filters=None,
+	order_by: str | None = None,
+	page_length: int | None = None,
+	file_format_type: str = "Excel",
+	selected_items=None,
+	title: str | None = None,
+):
+	"""Export list view rows in a background job.
+
+	Rows are streamed from the database to a private file, progress and the url of the file are
+	published to the user with the `crm_export` realtime event. Returns the id identifying those events.
+	"""
+	if file_format_type not in FILE_EXTENSIONS:
+		frappe.throw(_("Invalid file format {0}").format(file_format_type))
+
+	if not (frappe.permissions.can_export(doctype) or frappe.permissions.can_export(doctype, is_owner=True)):
+		raise frappe.PermissionError(_("You are not allowed to export {} doctype").format(doctype))
+
+	filters = frappe.parse_json(filters) or {}
+	if selected_items := frappe.parse_json(selected_items):
+		filters = {"name": ("in", selected_items)}
+
+	make_access_log(doctype=doctype, file_type=file_format_type, filters=filters)
+
+	export_id = frappe.generate_hash(length=10)
+	frappe.enqueue(
+		build_export,
+		queue="long",
+		export_id=export_id,
+		doctype=doctype,
+		fields=frappe.parse_json(fields),
+		filters=filters,
+		order_by=order_by,
+		page_length=cint(page_length) or None,
+		file_format_type=file_format_type,
+		title=title or doctype,
+	)
+	return export_id
+
+
+def build_export(export_id, doctype, fields, filters, order_by, page_length, file_format_type, title):
+	try:
+		file_url = write_export(
+			export_id, doctype, fields, filters, order_by, page_length, file_format_type, title
+		)
+	except Exception:
+		frappe.log_error(title=_("Export of {0} failed").format(doctype))
+		publish_export_progress(export_id, error=True)
+		return
+
+	publish_export_progress(export_id, progress=100, file_url=file_url)
+
+
+def write_export(export_id, doctype, fields, filters, order_by, page_length, file_format_type, title):
+	"""Stream the rows of the list query into a private file and return its url"""
+	if not frappe.permissions.can_export(doctype):
+		# users allowed to export only their own records
+		filters = add_owner_filter(doctype, filters)
+
+	total = frappe.get_list(doctype, filters=filters, fields="count(*) as total_count")[0].total_count
+	if page_length:
+		total = min(total, page_length)
+
+	db_query = DatabaseQuery(doctype)
+	query = db_query.execute(
+		fields=fields,
+		filters=filters,
+		order_by=order_by,
+		limit_page_length=page_length,
+		as_list=True,
+		run=False,
+	)
+	fields_info = get_field_info(db_query.fields, doctype)
+	durations = get_duration_fields(doctype, db_query.fields)
+
+	file_name = f"{slug(title)}-{export_id}.{FILE_EXTENSIONS[file_format_type]}"
+	path = frappe.get_site_path("private", "files", file_name)
+	writer = CSVWriter(path) if file_format_type == "CSV" else XLSXWriter(path, title)
+
+	try:
+		writer.append([_("Sr"), *(info["label"] for info in fields_info)])
+
+		with frappe.db.unbuffered_cursor():
+			for i, row in enumerate(frappe.db.sql(query, as_iterator=True), 1):
+				row = list(row)
+				for idx, df in durations:
+					if row[idx]:
+						row[idx] = format_duration(row[idx], df.hide_days)
+				writer.append([i, *row])
+
+				if i % PROGRESS_INTERVAL == 0:
+					publish_export_progress(export_id, progress=i * 100 // max(total, 1))
+	finally:
+		writer.close()
+
+	file = frappe.get_doc(
+		{
+			"doctype": "File",
+			"file_name": file_name,
+			"file_url": f"/private/files/{file_name}",
+			"file_size": os.path.getsize(path),
+			"is_private": 1,
+		}
+	)
+	file.insert(ignore_permissions=True)
+	return file.file_url
+
+
+def add_owner_filter(doctype, filters):
+	if isinstance(filters, dict):
+		return {**filters, "owner": frappe.session.user}
+	return [*filters, [doctype, "owner", "=", frappe.session.user]]
+
+
+def get_duration_fields(doctype, fields):
+	"""Returns (column index, field) of the Duration fields in `fields`"""
+	durations = []
+	for i, field in enumerate(fields):
+		try:
+			parenttype, fieldname = parse_field(field)
+		except ValueError:
+			continue
+
+		df = frappe.get_meta(parenttype or doctype).get_field(fieldname)
+		if df and df.fieldtype == "Duration":
+			durations.append((i, df))
+	return durations
+
+
+def publish_export_progress(export_id, **kwargs):
+	frappe.publish_realtime("crm_export", {"export_id": export_id, **kwargs}, user=frappe.session.user)
+
+
+class CSVWriter:
+	def __init__(self, path):
+		self.file = open(path, "w", newline="", encoding="utf-8")
+		self.writer = csv.writer(self.file, quoting=csv.QUOTE_NONNUMERIC)
+
+	def append(self, row):
+		self.writer.writerow([handle_html(value) if isinstance(value, str) else value for value in row])
+
+	def close(self):
+		self.file.close()
+
+
+class XLSXWriter:
+	"""Write-only workbook, openpyxl keeps appended rows in a temporary file until it is saved"""
+
+	def __init__(self, path, sheet_name):
+		self.path = path
+		self.workbook = openpyxl.Workbook(write_only=True)
+		self.sheet = self.workbook.create_sheet(INVALID_TITLE_REGEX.sub(" ", sheet_name))
+
+	def append(self, row):
+		self.sheet.append([clean_xlsx_value(value) for value in row])
+
+	def close(self):
+		self.workbook.save(self.path)
+
+
+def clean_xlsx_value(value):
+	if not isinstance(value, str):
+		return value
+	return ILLEGAL_CHARACTERS_RE.sub("", handle_html(value))
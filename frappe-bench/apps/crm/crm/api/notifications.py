@@ -3,6 +3,7 @@ from frappe.query_builder import Order
 
 
 @frappe.whitelist()
+@frappe.read_only()
 def get_notifications():
     Notification = frappe.qb.DocType("CRM Notification")
     query = (
@@ -54,8 +55,8 @@ def mark_as_read(user=None, doc=None):
             {"comment": doc},
             {"notification_type_doc": doc},
         ]
-    for n in frappe.get_all("CRM Notification", filters=filters, or_filters=or_filters):
-        d = frappe.get_doc("CRM Notification", n.name)
+    names = frappe.get_all("CRM Notification", filters=filters, or_filters=or_filters, pluck="name")
+    for d in frappe.get_docs("CRM Notification", names):
         d.read = True
         d.save()
 
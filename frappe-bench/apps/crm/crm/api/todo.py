@@ -1,7 +1,15 @@
 import frappe
 from frappe import _
+from frappe.desk.form.assign_to import add_bulk
 from crm.fcrm.doctype.crm_notification.crm_notification import notify_user
 
+# fields of the assigned documents used in assignment notifications
+NOTIFICATION_REFERENCE_FIELDS = {
+    "CRM Lead": ["lead_name"],
+    "CRM Deal": ["organization", "lead_name"],
+    "CRM Task": ["title", "reference_doctype", "reference_docname"],
+}
+
 
 def after_insert(doc, method):
     if (
@@ -37,8 +45,66 @@ def on_update(doc, method):
         notify_assigned_user(doc, is_cancelled=True)
 
 
-def notify_assigned_user(doc, is_cancelled=False):
-    _doc = frappe.get_doc(doc.reference_type, doc.reference_name)
+@frappe.whitelist()
+def bulk_assign(doctype, assignments):
+    """
+    Assign many documents at once, `assignments` maps document names to users.
+
+    ToDos are inserted together by `add_bulk`, so the `after_insert` hook doesn't run for them.
+    Missing lead or deal owners are set with one update and assignees are notified in one batch.
+    """
+    todos = add_bulk(doctype, frappe.parse_json(assignments))
+    if not todos:
+        return []
+
+    if doctype in ["CRM Lead", "CRM Deal"]:
+        set_missing_owners(doctype, todos)
+
+    if doctype in NOTIFICATION_REFERENCE_FIELDS:
+        notify_assigned_users(doctype, todos)
+
+    return [todo.name for todo in todos]
+
+
+def set_missing_owners(doctype, todos):
+    """Set the first assignee as the owner of the leads or deals without one"""
+    fieldname = "lead_owner" if doctype == "CRM Lead" else "deal_owner"
+    owners = dict(
+        frappe.get_all(
+            doctype,
+            filters={"name": ["in", list({todo.reference_name for todo in todos})]},
+            fields=["name", fieldname],
+            as_list=True,
+        )
+    )
+
+    updates = {}
+    for todo in todos:
+        if not owners.get(todo.reference_name) and todo.reference_name not in updates:
+            updates[todo.reference_name] = {fieldname: todo.allocated_to}
+
+    frappe.db.bulk_update(doctype, updates)
+    for name in updates:
+        frappe.clear_document_cache(doctype, name)
+
+
+def notify_assigned_users(doctype, todos):
+    """`notify_assigned_user` for many ToDos of `doctype`, reading the documents with one query"""
+    references = {
+        d.name: d
+        for d in frappe.get_all(
+            doctype,
+            filters={"name": ["in", list({todo.reference_name for todo in todos})]},
+            fields=["name", *NOTIFICATION_REFERENCE_FIELDS[doctype]],
+        )
+    }
+    for todo in todos:
+        if reference_doc := references.get(todo.reference_name):
+            notify_assigned_user(todo, reference_doc=reference_doc)
+
+
+def notify_assigned_user(doc, is_cancelled=False, reference_doc=None):
+    _doc = reference_doc or frappe.get_doc(doc.reference_type, doc.reference_name)
     owner = frappe.get_cached_value("User", frappe.session.user, "full_name")
     notification_text = get_notification_text(owner, doc, _doc, is_cancelled)
 
@@ -52,7 +118,7 @@ def notify_assigned_user(doc, is_cancelled=False):
         )
     )
 
-    redirect_to_doctype, redirect_to_name = get_redirect_to_doc(doc)
+    redirect_to_doctype, redirect_to_name = get_redirect_to_doc(doc, _doc)
 
     notify_user(
         {
@@ -124,9 +190,11 @@ def get_notification_text(owner, doc, reference_doc, is_cancelled=False):
         """
 
 
-def get_redirect_to_doc(doc):
+def get_redirect_to_doc(doc, reference_doc=None):
     if doc.reference_type == "CRM Task":
-        reference_doc = frappe.get_doc(doc.reference_type, doc.reference_name)
+        reference_doc = reference_doc or frappe.get_doc(
+            doc.reference_type, doc.reference_name
+        )
         return reference_doc.reference_doctype, reference_doc.reference_docname
 
     return doc.reference_type, doc.reference_name
@@ -3,6 +3,7 @@ from pypika import Criterion
 
 
 @frappe.whitelist()
+@frappe.read_only()
 def get_views(doctype):
 	View = frappe.qb.DocType("CRM View Settings")
 	query = (
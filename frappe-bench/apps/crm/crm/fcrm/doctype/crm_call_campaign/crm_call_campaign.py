@@ -0,0 +1,225 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+from concurrent.futures import ThreadPoolExecutor
+
+import frappe
+import requests
+from frappe import _
+from frappe.model.document import Document
+from frappe.utils import add_to_date, cint, get_time, now_datetime, nowtime
+
+from crm.api.doc import convert_filter_to_tuple
+from crm.integrations.vapi.handler import FINAL_STATUSES, VapiClient, flush_call_results
+
+# calls still marked as active after this long no longer hold a concurrency slot
+STALE_CALL_MINUTES = 60
+# upper bound on the threads used to place calls in parallel
+MAX_DIAL_WORKERS = 32
+
+
+class CRMCallCampaign(Document):
+	def validate(self):
+		if self.lead_filters:
+			try:
+				frappe.parse_json(self.lead_filters)
+			except ValueError:
+				frappe.throw(_("Lead Filters must be valid JSON"))
+
+	def dial(self, client, slots, min_call_interval):
+		"""Call up to `slots` of the next leads of this campaign, returns the number of calls placed"""
+		leads = self.get_next_leads(slots)
+		if not leads:
+			self.db_set("status", "Completed")
+			return 0
+
+		to_call, skipped = filter_paced_leads(leads, min_call_interval)
+		if not to_call and not skipped:
+			# the next lead can't be called yet, retry it in a later run
+			return 0
+
+		results = place_calls(client, to_call)
+		placed = [(lead, call) for lead, call in results if call]
+		insert_call_logs(self.name, client, placed)
+
+		self.db_set(
+			{
+				# leads are in name order and the handled ones are a prefix of them
+				"last_lead": max(lead.name for lead in to_call + skipped),
+				"calls_placed": cint(self.calls_placed) + len(placed),
+				"calls_failed": cint(self.calls_failed) + len(results) - len(placed),
+				"leads_skipped": cint(self.leads_skipped) + len(skipped),
+			},
+			update_modified=False,
+		)
+		return len(placed)
+
+	def get_next_leads(self, limit):
+		filters = convert_filter_to_tuple("CRM Lead", frappe.parse_json(self.lead_filters or "{}"))
+		if self.last_lead:
+			filters.append(["CRM Lead", "name", ">", self.last_lead])
+
+		return frappe.get_all(
+			"CRM Lead",
+			filters=filters,
+			fields=["name", "mobile_no"],
+			order_by="name asc",
+			limit=limit,
+		)
+
+
+def run_call_campaigns():
+	"""Place calls for running campaigns within the concurrency, pacing and quiet hours limits"""
+	settings = frappe.get_single("CRM Vapi Settings")
+	if not settings.enabled:
+		return
+
+	# results missed by the webhook triggered flush are picked up here
+	flush_call_results()
+
+	if in_quiet_hours(settings.quiet_hours_start, settings.quiet_hours_end, get_time(nowtime())):
+		return
+
+	slots = cint(settings.max_concurrent_calls) - get_active_calls()
+	campaigns = frappe.get_all(
+		"CRM Call Campaign", filters={"status": "Running"}, pluck="name", order_by="modified asc"
+	)
+	for campaign in campaigns:
+		if slots <= 0:
+			break
+
+		campaign = frappe.get_doc("CRM Call Campaign", campaign)
+		client = VapiClient.connect(campaign.assistant_id, pool_size=min(slots, MAX_DIAL_WORKERS))
+		slots -= campaign.dial(client, slots, cint(settings.min_call_interval))
+		frappe.db.commit()  # nosemgrep
+
+
+def in_quiet_hours(start, end, current_time):
+	if not start or not end:
+		return False
+
+	start, end = get_time(start), get_time(end)
+	if start <= end:
+		return start <= current_time < end
+	# quiet hours spanning midnight
+	return current_time >= start or current_time < end
+
+
+def get_active_calls():
+	return frappe.db.count(
+		"CRM Call Log",
+		{
+			"telephony_medium": "Vapi",
+			"campaign": ["is", "set"],
+			"status": ["not in", FINAL_STATUSES],
+			"creation": [">", add_to_date(now_datetime(), minutes=-STALE_CALL_MINUTES)],
+		},
+	)
+
+
+def filter_paced_leads(leads, min_call_interval):
+	"""Returns the leads to call now and the leads skipped for having no mobile number.
+
+	Both are taken from the start of `leads` up to the first lead that can't be called yet, because
+	its number is shared with an earlier lead of the batch or was called in the last
+	`min_call_interval` minutes. That lead and the ones after it are left for a later run."""
+	numbers = {lead.mobile_no for lead in leads if lead.mobile_no}
+	recently_called = set()
+	if numbers and min_call_interval:
+		recently_called = set(
+			frappe.get_all(
+				"CRM Call Log",
+				filters={
+					"to": ["in", list(numbers)],
+					"creation": [">", add_to_date(now_datetime(), minutes=-min_call_interval)],
+				},
+				pluck="to",
+				distinct=True,
+			)
+		)
+
+	to_call, skipped = [], []
+	for lead in leads:
+		if not lead.mobile_no:
+			skipped.append(lead)
+			continue
+		if lead.mobile_no in recently_called:
+			break
+		recently_called.add(lead.mobile_no)
+		to_call.append(lead)
+
+	return to_call, skipped
+
+
+def place_calls(client, leads):
+	"""Place calls in parallel, returns (lead, call) pairs with call None if it could not be placed.
+
+	Only HTTP requests run in the worker threads, they never touch the database."""
+	if not leads:
+		return []
+
+	def place_call(lead):
+		try:
+			return lead, client.place_call(lead.mobile_no)
+		except requests.exceptions.RequestException as e:
+			error = e.response.text if e.response is not None else str(e)
+			return lead, frappe._dict(error=error)
+
+	with ThreadPoolExecutor(max_workers=min(len(leads), MAX_DIAL_WORKERS)) as executor:
+		results = list(executor.map(place_call, leads))
+
+	for lead, call in results:
+		if call.get("error"):
+			frappe.log_error(
+				title=_("Vapi call to lead {0} failed").format(lead.name), message=call.get("error")
+			)
+
+	return [(lead, None if call.get("error") else call) for lead, call in results]
+
+
+def insert_call_logs(campaign, client, placed):
+	if not placed:
+		return
+
+	now = now_datetime()
+	user = frappe.session.user
+	frappe.db.bulk_insert(
+		"CRM Call Log",
+		fields=[
+			"name",
+			"id",
+			"creation",
+			"modified",
+			"owner",
+			"modified_by",
+			"telephony_medium",
+			"type",
+			"status",
+			"from",
+			"to",
+			"medium",
+			"reference_doctype",
+			"reference_docname",
+			"campaign",
+		],
+		values=[
+			(
+				call.get("id"),
+				call.get("id"),
+				now,
+				now,
+				user,
+				user,
+				"Vapi",
+				"Outgoing",
+				"Queued",
+				client.phone_number_id,
+				lead.mobile_no,
+				"Vapi",
+				"CRM Lead",
+				lead.name,
+				campaign,
+			)
+			for lead, call in placed
+		],
+	)
@@ -0,0 +1,35 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+from datetime import time
+
+import frappe
+from frappe.tests import UnitTestCase
+
+from crm.fcrm.doctype.crm_call_campaign.crm_call_campaign import filter_paced_leads, in_quiet_hours
+
+
+class TestCRMCallCampaign(UnitTestCase):
+	def test_quiet_hours(self):
+		self.assertFalse(in_quiet_hours(None, None, time(3)))
+		self.assertTrue(in_quiet_hours("09:00:00", "17:00:00", time(12)))
+		self.assertFalse(in_quiet_hours("09:00:00", "17:00:00", time(17)))
+
+	def test_quiet_hours_spanning_midnight(self):
+		self.assertTrue(in_quiet_hours("21:00:00", "08:00:00", time(23)))
+		self.assertTrue(in_quiet_hours("21:00:00", "08:00:00", time(7, 59)))
+		self.assertFalse(in_quiet_hours("21:00:00", "08:00:00", time(12)))
+
+	def test_paced_leads_stop_at_first_lead_to_retry(self):
+		leads = [
+			frappe._dict(name="L1", mobile_no="+1"),
+			frappe._dict(name="L2", mobile_no=None),
+			frappe._dict(name="L3", mobile_no="+3"),
+			frappe._dict(name="L4", mobile_no="+1"),
+			frappe._dict(name="L5", mobile_no="+5"),
+		]
+		to_call, skipped = filter_paced_leads(leads, 0)
+
+		# L4 shares its number with L1, it and the leads after it are called in a later run
+		self.assertEqual([lead.name for lead in to_call], ["L1", "L3"])
+		self.assertEqual([lead.name for lead in skipped], ["L2"])
@@ -1,7 +1,6 @@
 import frappe
 
-from crm.api.doc import get_assigned_users, get_fields_meta
-from crm.fcrm.doctype.crm_form_script.crm_form_script import get_form_script
+from crm.api.doc import get_assigned_users, get_form_meta_version
 
 
 @frappe.whitelist()
@@ -11,47 +10,62 @@ def get_deal(name):
 
 	deal = deal.as_dict()
 
-	deal["fields_meta"] = get_fields_meta("CRM Deal")
-	deal["_form_script"] = get_form_script("CRM Deal")
+	deal["_form_meta_version"] = get_form_meta_version("CRM Deal")
 	deal["_assign"] = get_assigned_users("CRM Deal", deal.name)
 	return deal
 
 
 @frappe.whitelist()
 def get_deal_contacts(name):
-	contacts = frappe.get_all(
-		"CRM Contacts",
-		filters={"parenttype": "CRM Deal", "parent": name},
-		fields=["contact", "is_primary"],
-		distinct=True,
+	CRMContacts = frappe.qb.DocType("CRM Contacts")
+	Contact = frappe.qb.DocType("Contact")
+	ContactEmail = frappe.qb.DocType("Contact Email")
+	ContactPhone = frappe.qb.DocType("Contact Phone")
+
+	rows = (
+		frappe.qb.from_(CRMContacts)
+		.join(Contact)
+		.on(Contact.name == CRMContacts.contact)
+		.left_join(ContactEmail)
+		.on((ContactEmail.parent == Contact.name) & (ContactEmail.parenttype == "Contact"))
+		.left_join(ContactPhone)
+		.on((ContactPhone.parent == Contact.name) & (ContactPhone.parenttype == "Contact"))
+		.select(
+			Contact.name,
+			Contact.image,
+			Contact.full_name,
+			CRMContacts.is_primary,
+			ContactEmail.email_id,
+			ContactEmail.is_primary.as_("email_is_primary"),
+			ContactPhone.phone,
+			ContactPhone.is_primary.as_("phone_is_primary"),
+		)
+		.where(CRMContacts.parenttype == "CRM Deal")
+		.where(CRMContacts.parent == name)
+		.orderby(CRMContacts.idx)
+		.orderby(ContactEmail.idx)
+		.orderby(ContactPhone.idx)
+		.run(as_dict=True)
 	)
-	deal_contacts = []
-	for contact in contacts:
-		if not contact.contact:
-			continue
-
-		is_primary = contact.is_primary
-		contact = frappe.get_doc("Contact", contact.contact).as_dict()
-
-		def get_primary_email(contact):
-			for email in contact.email_ids:
-				if email.is_primary:
-					return email.email_id
-			return contact.email_ids[0].email_id if contact.email_ids else ""
-
-		def get_primary_mobile_no(contact):
-			for phone in contact.phone_nos:
-				if phone.is_primary:
-					return phone.phone
-			return contact.phone_nos[0].phone if contact.phone_nos else ""
-
-		_contact = {
-			"name": contact.name,
-			"image": contact.image,
-			"full_name": contact.full_name,
-			"email": get_primary_email(contact),
-			"mobile_no": get_primary_mobile_no(contact),
-			"is_primary": is_primary,
-		}
-		deal_contacts.append(_contact)
-	return deal_contacts
+
+	# rows are ordered by idx, so the first email/phone seen is the fallback when none is primary
+	deal_contacts = {}
+	for row in rows:
+		_contact = deal_contacts.get(row.name)
+		if not _contact:
+			_contact = deal_contacts[row.name] = {
+				"name": row.name,
+				"image": row.image,
+				"full_name": row.full_name,
+				"email": row.email_id or "",
+				"mobile_no": row.phone or "",
+				"is_primary": row.is_primary,
+			}
+		if row.email_is_primary and row.email_id:
+			_contact["email"] = row.email_id
+		if row.phone_is_primary and row.phone:
+			_contact["mobile_no"] = row.phone
+		if row.is_primary:
+			_contact["is_primary"] = row.is_primary
+
+	return list(deal_contacts.values())
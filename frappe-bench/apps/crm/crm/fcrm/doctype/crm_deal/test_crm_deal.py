@@ -1,9 +1,38 @@
 # Copyright (c) 2023, Frappe Technologies Pvt. Ltd. and Contributors
 # See license.txt
 
-# import frappe
-from frappe.tests import UnitTestCase
+import json
 
+import frappe
+from frappe.tests import IntegrationTestCase
 
-class TestCRMDeal(UnitTestCase):
-	pass
+from crm.api.todo import bulk_assign
+
+
+class TestCRMDeal(IntegrationTestCase):
+	def make_user(self, email):
+		if not frappe.db.exists("User", email):
+			user = frappe.get_doc(
+				{"doctype": "User", "email": email, "first_name": "Test", "send_welcome_email": 0}
+			).insert()
+			user.add_roles("Sales User")
+		return email
+
+	def test_bulk_assign(self):
+		user = self.make_user("crm-assignee@example.com")
+		deal = frappe.get_doc({"doctype": "CRM Deal"}).insert()
+		owned = frappe.get_doc({"doctype": "CRM Deal", "deal_owner": "Administrator"}).insert()
+		# cached before the assignment, e.g. by the contact page
+		frappe.get_cached_doc("CRM Deal", deal.name)
+
+		todos = bulk_assign("CRM Deal", json.dumps({deal.name: user, owned.name: user}))
+		self.assertEqual(len(todos), 2)
+
+		deal = frappe.get_cached_doc("CRM Deal", deal.name)
+		self.assertEqual(deal.deal_owner, user)
+		self.assertIn(user, json.loads(deal._assign))
+		self.assertEqual(frappe.db.get_value("CRM Deal", owned.name, "deal_owner"), "Administrator")
+
+		# the cached copy is up to date, saving it doesn't raise TimestampMismatchError
+		deal.next_step = "Demo"
+		deal.save()
@@ -0,0 +1,159 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import json
+
+import frappe
+from frappe.model.document import Document
+from frappe.query_builder import Criterion
+
+# doctypes whose field changes are shown in the activity timeline and the fields left out of it
+AVOID_FIELDS = {
+	"CRM Lead": {
+		"converted",
+		"response_by",
+		"sla_creation",
+		"sla",
+		"first_response_time",
+		"first_responded_on",
+	},
+	"CRM Deal": {"lead", "response_by", "sla_creation", "sla", "first_response_time", "first_responded_on"},
+}
+
+FIELDS = [
+	"name",
+	"creation",
+	"modified",
+	"owner",
+	"modified_by",
+	"reference_doctype",
+	"reference_docname",
+	"version",
+	"activity_type",
+	"field",
+	"field_label",
+	"field_options",
+	"old_value",
+	"value",
+	"idx",
+]
+
+
+class CRMFieldActivity(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("CRM Field Activity", ["reference_doctype", "reference_docname", "creation"])
+
+
+def project_version(doc, method=None):
+	"""Version after_insert hook, store the field changes of leads and deals as CRM Field Activity rows"""
+	# versions inserted together are projected together by `project_versions`
+	if doc.flags.in_bulk_insert:
+		return
+
+	project_versions([doc])
+
+
+def project_versions(versions):
+	"""after_insert_versions hook, project the field changes of many versions with one insert"""
+	rows = []
+	for version in versions:
+		if version.ref_doctype in AVOID_FIELDS:
+			rows.extend(get_field_activity_rows(version, idx=len(rows)))
+	if rows:
+		frappe.db.bulk_insert("CRM Field Activity", FIELDS, rows)
+
+
+def get_field_activity_rows(version, idx=0):
+	"""Returns CRM Field Activity values (in FIELDS order) for the changed fields of `version`.
+
+	Rows are numbered from `idx` in the order of the diff, versions inserted together share their
+	creation time and are ordered by it. Values are kept as JSON to preserve their type."""
+	changed = json.loads(version.data).get("changed") if version.data else None
+	if not changed:
+		return []
+
+	meta = frappe.get_meta(version.ref_doctype)
+	avoid_fields = AVOID_FIELDS[version.ref_doctype]
+
+	rows = []
+	for fieldname, old_value, value, *_ in changed:
+		field = meta.get_field(fieldname)
+		if not field or fieldname in avoid_fields or (not old_value and not value):
+			continue
+
+		activity_type = "changed"
+		if not old_value:
+			activity_type = "added"
+		elif not value:
+			activity_type = "removed"
+
+		rows.append(
+			(
+				frappe.generate_hash(length=10),
+				version.creation,
+				version.creation,
+				version.owner,
+				version.owner,
+				version.ref_doctype,
+				version.docname,
+				version.name,
+				activity_type,
+				fieldname,
+				field.label or fieldname,
+				field.options,
+				json.dumps(old_value) if old_value not in (None, "") else None,
+				json.dumps(value) if value not in (None, "") else None,
+				idx + len(rows),
+			)
+		)
+
+	return rows
+
+
+def get_field_activities(references):
+	"""Returns timeline activities of the field changes of (doctype, name) `references`, oldest first"""
+	Activity = frappe.qb.DocType("CRM Field Activity")
+	query = (
+		frappe.qb.from_(Activity)
+		.select(
+			Activity.reference_doctype,
+			Activity.creation,
+			Activity.owner,
+			Activity.activity_type,
+			Activity.field,
+			Activity.field_label,
+			Activity.field_options,
+			Activity.old_value,
+			Activity.value,
+		)
+		.where(
+			Criterion.any(
+				(Activity.reference_doctype == doctype) & (Activity.reference_docname == name)
+				for doctype, name in references
+			)
+		)
+		.orderby(Activity.creation)
+		.orderby(Activity.idx)
+	)
+	return [make_activity(row) for row in query.run(as_dict=True)]
+
+
+def make_activity(row):
+	old_value, value = (json.loads(v) if v is not None else None for v in (row.old_value, row.value))
+	data = {"field": row.field, "field_label": row.field_label, "value": value}
+	if row.activity_type == "changed":
+		data["old_value"] = old_value
+	elif row.activity_type == "removed":
+		data["value"] = old_value
+
+	return {
+		"activity_type": row.activity_type,
+		"creation": row.creation,
+		"owner": row.owner,
+		"data": data,
+		"is_lead": row.reference_doctype == "CRM Lead",
+		"options": row.field_options or None,
+	}
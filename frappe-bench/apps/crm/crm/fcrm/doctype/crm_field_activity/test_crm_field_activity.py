@@ -0,0 +1,84 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import json
+from unittest.mock import patch
+
+import frappe
+from frappe.core.doctype.version.version import deferred_versions
+from frappe.tests import IntegrationTestCase
+from frappe.utils import now_datetime
+
+from crm.fcrm.doctype.crm_field_activity.crm_field_activity import (
+	FIELDS,
+	get_field_activity_rows,
+	make_activity,
+)
+
+
+class TestCRMFieldActivity(IntegrationTestCase):
+	def test_field_activity_rows(self):
+		version = frappe._dict(
+			name="test-version",
+			creation=now_datetime(),
+			owner="Administrator",
+			ref_doctype="CRM Lead",
+			docname="CRM-LEAD-TEST",
+			data=json.dumps(
+				{
+					"changed": [
+						["status", "New", "Contacted"],
+						["first_name", None, "Jane"],
+						["annual_revenue", 500, 1000.0],
+						["sla", "Default", None],
+						["not_a_field", "a", "b"],
+					]
+				}
+			),
+		)
+		rows = [frappe._dict(zip(FIELDS, row, strict=True)) for row in get_field_activity_rows(version)]
+
+		self.assertEqual(
+			[(row.field, row.activity_type, row.idx) for row in rows],
+			[("status", "changed", 0), ("first_name", "added", 1), ("annual_revenue", "changed", 2)],
+		)
+		self.assertEqual(rows[0].field_label, "Status")
+
+		activity = make_activity(rows[0])
+		self.assertEqual(
+			activity["data"],
+			{"field": "status", "field_label": "Status", "old_value": "New", "value": "Contacted"},
+		)
+		self.assertTrue(activity["is_lead"])
+		# values keep their type
+		self.assertEqual(make_activity(rows[2])["data"]["value"], 1000)
+
+	def test_deferred_deal_version(self):
+		deals = [frappe.get_doc({"doctype": "CRM Deal", "next_step": "Call"}).insert() for _ in range(2)]
+		with deferred_versions():
+			for deal in deals:
+				deal.next_step = "Demo"
+				deal.save(ignore_version=False)
+
+		names = [deal.name for deal in deals]
+		self.assertFalse(frappe.db.exists("CRM Field Activity", {"reference_docname": ["in", names]}))
+		with patch.object(frappe.db, "bulk_insert", wraps=frappe.db.bulk_insert) as bulk_insert:
+			frappe.db.before_commit.run()
+
+		# the activities of all versions are inserted together
+		self.assertEqual(
+			[c.args[0] for c in bulk_insert.call_args_list].count("CRM Field Activity"),
+			1,
+			bulk_insert.call_args_list,
+		)
+		activity = frappe.get_all(
+			"CRM Field Activity",
+			filters={"reference_doctype": "CRM Deal", "reference_docname": ["in", names]},
+			fields=["reference_docname", "field", "old_value", "value", "version"],
+			order_by="reference_docname",
+		)
+		self.assertEqual(
+			[(a.reference_docname, a.field, json.loads(a.old_value), json.loads(a.value)) for a in activity],
+			[(name, "next_step", "Call", "Demo") for name in sorted(names)],
+		)
+		self.assertTrue(frappe.db.exists("Version", activity[0].version))
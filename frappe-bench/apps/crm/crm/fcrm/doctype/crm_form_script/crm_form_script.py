@@ -1,6 +1,8 @@
 # Copyright (c) 2023, Frappe Technologies Pvt. Ltd. and contributors
 # For license information, please see license.txt
 
+import hashlib
+
 import frappe
 from frappe import _
 from frappe.model.document import Document
@@ -23,8 +25,39 @@ class CRMFormScript(Document):
 			else:
 				frappe.throw(_("You need to be in developer mode to edit a Standard Form Script"))
 
+	def on_update(self):
+		self.clear_cache()
+
+	def on_trash(self):
+		self.clear_cache()
+
+	def clear_cache(self):
+		clear_form_script_cache(self.dt, self.view)
+		doc_before_save = self.get_doc_before_save()
+		if doc_before_save and (doc_before_save.dt, doc_before_save.view) != (self.dt, self.view):
+			clear_form_script_cache(doc_before_save.dt, doc_before_save.view)
+
+
 def get_form_script(dt, view="Form"):
 	"""Returns the form script for the given doctype"""
+	return get_form_scripts(dt, view)["script"]
+
+
+def get_form_script_hash(dt, view="Form"):
+	"""Returns the content hash of the form script for the given doctype, None if there is no script"""
+	return get_form_scripts(dt, view)["hash"]
+
+
+def get_form_scripts(dt, view="Form"):
+	"""Returns enabled scripts of the doctype and view with their content hash.
+
+	Kept in process and in Redis until a CRM Form Script of the same doctype and view changes."""
+	return frappe.client_cache.get_value(
+		get_form_script_cache_key(dt, view), generator=lambda: load_form_scripts(dt, view)
+	)
+
+
+def load_form_scripts(dt, view):
 	FormScript = frappe.qb.DocType("CRM Form Script")
 	query = (
 		frappe.qb.from_(FormScript)
@@ -32,10 +65,32 @@ def get_form_script(dt, view="Form"):
 		.where(FormScript.dt == dt)
 		.where(FormScript.view == view)
 		.where(FormScript.enabled == 1)
+		.orderby(FormScript.creation)
 	)
 
-	doc = query.run(as_dict=True)
-	if doc:
-		return [d.script for d in doc] if len(doc) > 1 else doc[0].script
-	else:
-		return None
+	scripts = query.run(pluck=True)
+	if not scripts:
+		return {"script": None, "hash": None}
+
+	script = scripts if len(scripts) > 1 else scripts[0]
+	return {
+		"script": script,
+		"hash": hashlib.md5(frappe.as_json(script, indent=None).encode(), usedforsecurity=False).hexdigest(),
+	}
+
+
+def clear_form_script_cache(dt, view="Form"):
+	from crm.api.doc import clear_form_meta_cache
+
+	def clear():
+		frappe.client_cache.delete_value(get_form_script_cache_key(dt, view))
+		if view == "Form":
+			clear_form_meta_cache(dt)
+
+	clear()
+	# other processes may cache the old scripts again until this transaction commits
+	frappe.db.after_commit.add(clear)
+
+
+def get_form_script_cache_key(dt, view):
+	return f"crm_form_script::{dt}::{view}"
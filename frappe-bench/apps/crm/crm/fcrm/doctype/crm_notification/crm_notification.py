@@ -4,6 +4,17 @@
 import frappe
 from frappe import _
 from frappe.model.document import Document
+from frappe.utils import now_datetime
+
+# fields identifying a notification, a notification is not sent twice for the same values
+NOTIFICATION_KEY_FIELDS = (
+	"from_user",
+	"to_user",
+	"type",
+	"notification_type_doctype",
+	"notification_type_doc",
+	"message",
+)
 
 
 class CRMNotification(Document):
@@ -11,16 +22,19 @@ class CRMNotification(Document):
 		if self.to_user:
 			frappe.publish_realtime("crm_notification", user= self.to_user)
 
+
 def notify_user(args):
 	"""
 	Notify the assigned user
+
+	Notifications are collected for the current transaction and inserted together when it commits,
+	see `flush_notifications`.
 	"""
 	args = frappe._dict(args)
 	if args.owner == args.assigned_to:
 		return
 
 	values = frappe._dict(
-		doctype="CRM Notification",
 		from_user=args.owner,
 		to_user=args.assigned_to,
 		type=args.notification_type,
@@ -31,7 +45,95 @@ def notify_user(args):
 		reference_doctype=args.redirect_to_doctype,
 		reference_name=args.redirect_to_docname,
 	)
+	get_pending_notifications().append(values)
+
+
+def get_pending_notifications():
+	pending = getattr(frappe.local, "crm_pending_notifications", None)
+	if pending is None:
+		pending = frappe.local.crm_pending_notifications = []
+		frappe.db.before_commit.add(flush_notifications)
+		frappe.db.after_rollback.add(clear_pending_notifications)
+	return pending
+
+
+def clear_pending_notifications():
+	frappe.local.crm_pending_notifications = None
+
+
+def flush_notifications():
+	"""Insert the notifications of the transaction not sent yet and publish one event per recipient"""
+	pending = frappe.local.crm_pending_notifications or []
+	clear_pending_notifications()
 
-	if frappe.db.exists("CRM Notification", values):
+	sent = get_sent_notifications(pending)
+	notifications = []
+	for values in pending:
+		key = tuple(values.get(field) for field in NOTIFICATION_KEY_FIELDS)
+		if key not in sent:
+			sent.add(key)
+			notifications.append(values)
+
+	if not notifications:
 		return
-	frappe.get_doc(values).insert(ignore_permissions=True)
+
+	now = now_datetime()
+	user = frappe.session.user
+	frappe.db.bulk_insert(
+		"CRM Notification",
+		fields=[
+			"name",
+			"creation",
+			"modified",
+			"owner",
+			"modified_by",
+			"from_user",
+			"to_user",
+			"type",
+			"message",
+			"notification_text",
+			"notification_type_doctype",
+			"notification_type_doc",
+			"reference_doctype",
+			"reference_name",
+		],
+		values=[
+			(
+				frappe.generate_hash(length=10),
+				now,
+				now,
+				user,
+				user,
+				n.from_user,
+				n.to_user,
+				n.type,
+				n.message,
+				n.notification_text,
+				n.notification_type_doctype,
+				n.notification_type_doc,
+				n.reference_doctype,
+				n.reference_name,
+			)
+			for n in notifications
+		],
+	)
+
+	for to_user in {n.to_user for n in notifications}:
+		frappe.publish_realtime("crm_notification", user=to_user, after_commit=True)
+
+
+def get_sent_notifications(pending):
+	"""Returns keys of already sent notifications matching `pending`, with one query"""
+	if not pending:
+		return set()
+
+	sent = frappe.get_all(
+		"CRM Notification",
+		filters={
+			"to_user": ["in", list({n.to_user for n in pending})],
+			"notification_type_doc": ["in", list({n.notification_type_doc for n in pending})],
+		},
+		fields=list(NOTIFICATION_KEY_FIELDS),
+		as_list=True,
+	)
+	return {tuple(row) for row in sent}
@@ -2,7 +2,11 @@
 # For license information, please see license.txt
 
 import frappe
+import numpy as np
 from frappe.model.document import Document
+from frappe.query_builder import Case
+from frappe.query_builder.functions import Coalesce, Count, Max, Sum
+from frappe.utils import create_batch, getdate, now_datetime
 
 
 class CRMOrganization(Document):
@@ -52,3 +56,164 @@ class CRMOrganization(Document):
 				"modified",
 			]
 			return {'columns': columns, 'rows': rows}
+
+
+SEGMENTS = ["High Value", "Regular", "Occasional", "New", "At Risk"]
+WON_STATUS = "Won"
+# organizations that lost a deal, they aren't found through the modified timestamp of their deals
+STALE_ORGANIZATIONS_KEY = "crm_customer_segments_stale_organizations"
+NO_DEALS = {"last_won_deal_date": None, "no_of_deals": 0, "won_deal_revenue": 0}
+
+
+def update_customer_segments(rebuild=False):
+	"""
+	Refresh the RFM features (last won deal date, number of deals, won deal revenue) of organizations
+	whose deals changed since the last run, or that lost a deal, and re-segment organizations.
+
+	Segments come from tercile scores computed over all organizations, only changed labels are written.
+	Pass `rebuild` to recompute the features of every organization.
+	"""
+	now = now_datetime()
+	watermark = None if rebuild else frappe.db.get_global("crm_customer_segments_watermark")
+
+	stale = frappe.cache.smembers(STALE_ORGANIZATIONS_KEY)
+
+	Deal = frappe.qb.DocType("CRM Deal")
+	organizations = None
+	if watermark:
+		organizations = (
+			frappe.qb.from_(Deal)
+			.select(Deal.organization)
+			.distinct()
+			.where(Deal.modified > watermark)
+			.where(Deal.organization.isnotnull())
+			.run(pluck=True)
+		)
+		organizations = list({*organizations, *(frappe.safe_decode(o) for o in stale)})
+		if not organizations:
+			frappe.db.set_global("crm_customer_segments_watermark", str(now))
+			return
+
+	update_rfm_features(organizations)
+	update_segment_labels()
+	frappe.db.set_global("crm_customer_segments_watermark", str(now))
+	if stale:
+		frappe.cache.srem(STALE_ORGANIZATIONS_KEY, *stale)
+
+
+def rebuild_customer_segments():
+	"""Daily full recompute, catches changes missed by the hourly incremental run"""
+	update_customer_segments(rebuild=True)
+
+
+def mark_stale_organization(doc, method=None):
+	"""Queue the organization a deal was deleted from or moved out of for `update_customer_segments`"""
+	if method == "on_trash":
+		organization = doc.organization
+	else:
+		organization = (doc.get_doc_before_save() or {}).get("organization")
+		if organization == doc.organization:
+			return
+
+	if organization:
+		frappe.db.after_commit.add(lambda: frappe.cache.sadd(STALE_ORGANIZATIONS_KEY, organization))
+
+
+def update_rfm_features(organizations=None):
+	"""Compute RFM features with one grouped query over CRM Deal, for all organizations if none given"""
+	Deal = frappe.qb.DocType("CRM Deal")
+	won = Deal.status == WON_STATUS
+
+	query = (
+		frappe.qb.from_(Deal)
+		.select(
+			Deal.organization,
+			Max(Case().when(won, Coalesce(Deal.close_date, Deal.modified))),
+			Count("*"),
+			Sum(Case().when(won, Deal.annual_revenue).else_(0)),
+		)
+		.where(Deal.organization.isnotnull())
+		.groupby(Deal.organization)
+	)
+
+	if organizations is None:
+		# all deals in one query, organizations left without deals are reset
+		with_deals = frappe.get_all("CRM Organization", filters={"no_of_deals": [">", 0]}, pluck="name")
+		batches = [(with_deals, query)]
+	else:
+		batches = (
+			(chunk, query.where(Deal.organization.isin(chunk))) for chunk in create_batch(organizations, 1000)
+		)
+
+	for chunk, chunk_query in batches:
+		features = dict.fromkeys(chunk, NO_DEALS)
+		for organization, last_won, no_of_deals, revenue in chunk_query.run():
+			features[organization] = {
+				"last_won_deal_date": getdate(last_won) if last_won else None,
+				"no_of_deals": no_of_deals,
+				"won_deal_revenue": revenue or 0,
+			}
+		frappe.db.bulk_update("CRM Organization", features, chunk_size=500, update_modified=False)
+
+
+def update_segment_labels():
+	frappe.db.set_value(
+		"CRM Organization",
+		{"no_of_deals": 0, "customer_segment": ["is", "set"]},
+		"customer_segment",
+		None,
+		update_modified=False,
+	)
+
+	organizations = frappe.get_all(
+		"CRM Organization",
+		filters={"no_of_deals": [">", 0]},
+		fields=["name", "customer_segment", "last_won_deal_date", "no_of_deals", "won_deal_revenue"],
+	)
+	if not organizations:
+		return
+
+	segments = get_segments(
+		np.array([o.last_won_deal_date for o in organizations], dtype="datetime64[D]"),
+		np.array([o.no_of_deals for o in organizations], dtype=float),
+		np.array([o.won_deal_revenue or 0 for o in organizations], dtype=float),
+		np.datetime64(getdate(), "D"),
+	)
+
+	updates = {
+		o.name: {"customer_segment": segment}
+		for o, segment in zip(organizations, segments, strict=True)
+		if o.customer_segment != segment
+	}
+	frappe.db.bulk_update("CRM Organization", updates, chunk_size=500, update_modified=False)
+
+
+def get_segments(last_won_dates, no_of_deals, revenue, today):
+	"""Assign a segment to every organization from recency, frequency and monetary tercile scores"""
+	has_won = ~np.isnat(last_won_dates)
+	recency = np.where(has_won, (today - last_won_dates).astype("timedelta64[D]").astype(float), np.inf)
+
+	# lower recency is better
+	r = 4 - get_tercile_scores(recency, has_won)
+	f = get_tercile_scores(no_of_deals, has_won)
+	m = get_tercile_scores(revenue, has_won)
+
+	return np.select(
+		[
+			~has_won,
+			(m == 3) & (r >= 2),
+			(r == 1) & ((m >= 2) | (f >= 2)),
+			(f >= 2) & (r >= 2),
+		],
+		["New", "High Value", "At Risk", "Regular"],
+		default="Occasional",
+	)
+
+
+def get_tercile_scores(values, mask):
+	"""Score values from 1 to 3 by the terciles of `values[mask]`"""
+	if not mask.any():
+		return np.ones(len(values), dtype=int)
+
+	thresholds = np.quantile(values[mask], [1 / 3, 2 / 3])
+	return 1 + np.searchsorted(thresholds, values, side="right")
@@ -1,9 +1,50 @@
 # Copyright (c) 2023, Frappe Technologies Pvt. Ltd. and Contributors
 # See license.txt
 
-# import frappe
-from frappe.tests import UnitTestCase
+import frappe
+from frappe.tests import IntegrationTestCase
+from frappe.utils import add_to_date, now_datetime
 
+from crm.fcrm.doctype.crm_organization.crm_organization import (
+	STALE_ORGANIZATIONS_KEY,
+	update_customer_segments,
+)
 
-class TestCRMOrganization(UnitTestCase):
-	pass
+
+class TestCRMOrganization(IntegrationTestCase):
+	def setUp(self):
+		frappe.cache.delete_value(STALE_ORGANIZATIONS_KEY)
+
+	def tearDown(self):
+		frappe.cache.delete_value(STALE_ORGANIZATIONS_KEY)
+
+	def make_organization(self):
+		return frappe.get_doc(
+			{"doctype": "CRM Organization", "organization_name": frappe.generate_hash(length=10)}
+		).insert()
+
+	def get_features(self, organization):
+		return frappe.db.get_value(
+			"CRM Organization", organization.name, ["no_of_deals", "customer_segment"], as_dict=True
+		)
+
+	def test_segments_of_organization_losing_deals(self):
+		old, new = self.make_organization(), self.make_organization()
+		moved = frappe.get_doc({"doctype": "CRM Deal", "organization": old.name}).insert()
+		deleted = frappe.get_doc({"doctype": "CRM Deal", "organization": old.name}).insert()
+		update_customer_segments(rebuild=True)
+		self.assertEqual(self.get_features(old), {"no_of_deals": 2, "customer_segment": "New"})
+
+		frappe.db.set_global("crm_customer_segments_watermark", str(add_to_date(now_datetime(), seconds=-1)))
+		moved.organization = new.name
+		moved.save()
+		deleted.delete()
+		frappe.db.after_commit.run()
+		self.assertEqual(
+			{frappe.safe_decode(o) for o in frappe.cache.smembers(STALE_ORGANIZATIONS_KEY)}, {old.name}
+		)
+
+		update_customer_segments()
+		self.assertEqual(self.get_features(old), {"no_of_deals": 0, "customer_segment": None})
+		self.assertEqual(self.get_features(new), {"no_of_deals": 1, "customer_segment": "New"})
+		self.assertFalse(frappe.cache.smembers(STALE_ORGANIZATIONS_KEY))
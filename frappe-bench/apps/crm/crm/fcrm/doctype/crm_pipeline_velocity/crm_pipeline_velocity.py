@@ -0,0 +1,231 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import json
+
+import frappe
+import numpy as np
+from frappe.model.document import Document
+from frappe.utils import add_to_date, get_datetime, now_datetime
+
+# Upper bounds (in seconds) of the duration histogram buckets, √2 apart from 1 minute up to ~1 year.
+# A histogram holds len(DURATION_BUCKETS) + 1 counts, the last one collects everything above the last bound.
+DURATION_BUCKETS = 60 * np.power(2, np.arange(40) / 2)
+
+# doctypes with a status change log and the field holding their owner
+PIPELINE_DOCTYPES = {"CRM Lead": "lead_owner", "CRM Deal": "deal_owner"}
+
+# status change logs are closed while their parent is being saved, give those transactions
+# time to commit before moving the watermark past them
+SETTLE_MINUTES = 5
+CHUNK_SIZE = 50_000
+
+
+class CRMPipelineVelocity(Document):
+	pass
+
+
+def update_pipeline_velocity():
+	"""Roll up status changes closed since the last run into daily CRM Pipeline Velocity rows"""
+	for doctype in PIPELINE_DOCTYPES:
+		rollup_status_change_logs(doctype)
+
+
+def rollup_status_change_logs(doctype):
+	Log = frappe.qb.DocType("CRM Status Change Log")
+	Parent = frappe.qb.DocType(doctype)
+	owner_field = PIPELINE_DOCTYPES[doctype]
+
+	cutoff = add_to_date(now_datetime(), minutes=-SETTLE_MINUTES)
+	watermark = get_watermark(doctype)
+
+	while True:
+		query = (
+			frappe.qb.from_(Log)
+			.join(Parent)
+			.on(Parent.name == Log.parent)
+			.select(Log.name, Log.to_date, Parent[owner_field], Log["from"], Log["to"], Log.duration)
+			.where(Log.parenttype == doctype)
+			.where(Log.to_date.isnotnull())
+			.where(Log.to_date <= cutoff)
+			.where(Log["to"].isnotnull() & (Log["to"] != ""))
+			.orderby(Log.to_date)
+			.orderby(Log.name)
+			.limit(CHUNK_SIZE)
+		)
+		if watermark:
+			query = query.where(
+				(Log.to_date > watermark.to_date)
+				| ((Log.to_date == watermark.to_date) & (Log.name > watermark.name))
+			)
+
+		rows = query.run()
+		if not rows:
+			break
+
+		merge_rollups(doctype, rows)
+
+		watermark = frappe._dict(to_date=rows[-1][1], name=rows[-1][0])
+		set_watermark(doctype, watermark)
+		frappe.db.commit()  # nosemgrep
+
+		if len(rows) < CHUNK_SIZE:
+			break
+
+
+def merge_rollups(doctype, rows):
+	"""Aggregate status change log rows per (date, owner, from, to) and merge them into existing rollups"""
+	_names, to_dates, users, from_status, to_status, durations = zip(*rows, strict=True)
+
+	days = np.array(to_dates, dtype="datetime64[us]").astype("datetime64[D]")
+	dates = days.astype(str)
+	keys = np.array(
+		[
+			"\x1f".join(value or "" for value in key)
+			for key in zip(dates, users, from_status, to_status, strict=True)
+		]
+	)
+	durations = np.array([d or 0 for d in durations], dtype=float)
+
+	unique_keys, inverse = np.unique(keys, return_inverse=True)
+	transitions = np.bincount(inverse, minlength=len(unique_keys))
+	total_durations = np.bincount(inverse, weights=durations, minlength=len(unique_keys))
+	histograms = get_duration_histograms(inverse, durations, len(unique_keys))
+
+	existing = {
+		"\x1f".join((str(d.date), d.user or "", d.from_status or "", d.to_status or "")): d
+		for d in frappe.get_all(
+			"CRM Pipeline Velocity",
+			filters={
+				"reference_doctype": doctype,
+				"date": ["between", [str(days.min()), str(days.max())]],
+			},
+			fields=[
+				"name",
+				"date",
+				"user",
+				"from_status",
+				"to_status",
+				"transitions",
+				"total_duration",
+				"duration_histogram",
+			],
+		)
+	}
+
+	now = now_datetime()
+	new_rollups = []
+	for i, key in enumerate(unique_keys):
+		if rollup := existing.get(key):
+			frappe.db.set_value(
+				"CRM Pipeline Velocity",
+				rollup.name,
+				{
+					"transitions": rollup.transitions + int(transitions[i]),
+					"total_duration": rollup.total_duration + float(total_durations[i]),
+					"duration_histogram": json.dumps(
+						(parse_histograms([rollup.duration_histogram])[0] + histograms[i]).tolist()
+					),
+				},
+				update_modified=False,
+			)
+			continue
+
+		date, user, _from, to = key.split("\x1f")
+		new_rollups.append(
+			(
+				frappe.generate_hash(length=10),
+				now,
+				now,
+				"Administrator",
+				"Administrator",
+				date,
+				doctype,
+				user or None,
+				_from,
+				to,
+				int(transitions[i]),
+				float(total_durations[i]),
+				json.dumps(histograms[i].tolist()),
+			)
+		)
+
+	if new_rollups:
+		frappe.db.bulk_insert(
+			"CRM Pipeline Velocity",
+			fields=[
+				"name",
+				"creation",
+				"modified",
+				"owner",
+				"modified_by",
+				"date",
+				"reference_doctype",
+				"user",
+				"from_status",
+				"to_status",
+				"transitions",
+				"total_duration",
+				"duration_histogram",
+			],
+			values=new_rollups,
+		)
+
+
+def get_duration_histograms(keys, durations, size):
+	"""Returns a (size, buckets) matrix counting `durations` per bucket for every key index in `keys`"""
+	buckets = np.searchsorted(DURATION_BUCKETS, durations, side="right")
+	histograms = np.zeros((size, len(DURATION_BUCKETS) + 1), dtype=np.int64)
+	np.add.at(histograms, (keys, buckets), 1)
+	return histograms
+
+
+def parse_histograms(values):
+	"""Returns a (len(values), buckets) matrix from stored `duration_histogram` values"""
+	histograms = np.zeros((len(values), len(DURATION_BUCKETS) + 1), dtype=np.int64)
+	for i, value in enumerate(values):
+		if value:
+			histogram = json.loads(value)
+			histograms[i, : len(histogram)] = histogram
+	return histograms
+
+
+def get_percentiles(histograms, percentiles):
+	"""Estimate `percentiles` (0-100) of every histogram row, interpolating linearly inside a bucket.
+
+	Returns a (rows, len(percentiles)) matrix of durations in seconds, 0 for empty histograms."""
+	histograms = np.atleast_2d(histograms)
+	lower = np.concatenate(([0.0], DURATION_BUCKETS))
+	upper = np.concatenate((DURATION_BUCKETS, [DURATION_BUCKETS[-1] * 2]))
+
+	cumulative = np.cumsum(histograms, axis=1)
+	totals = cumulative[:, -1:]
+	targets = totals * (np.asarray(percentiles, dtype=float) / 100)
+
+	# bucket in which each target rank falls
+	idx = (cumulative[:, None, :] < targets[:, :, None]).sum(axis=2)
+	idx = np.minimum(idx, histograms.shape[1] - 1)
+
+	in_bucket = np.take_along_axis(histograms, idx, axis=1)
+	before = np.take_along_axis(cumulative, idx, axis=1) - in_bucket
+	fraction = np.divide(targets - before, in_bucket, out=np.zeros_like(targets), where=in_bucket > 0)
+
+	values = lower[idx] + fraction * (upper[idx] - lower[idx])
+	return np.where(totals > 0, values, 0.0)
+
+
+def get_watermark(doctype):
+	watermark = frappe.db.get_global(f"crm_pipeline_velocity_watermark::{doctype}")
+	if not watermark:
+		return None
+
+	watermark = frappe._dict(json.loads(watermark))
+	watermark.to_date = get_datetime(watermark.to_date)
+	return watermark
+
+
+def set_watermark(doctype, watermark):
+	frappe.db.set_global(
+		f"crm_pipeline_velocity_watermark::{doctype}",
+		json.dumps({"to_date": str(watermark.to_date), "name": watermark.name}),
+	)
@@ -0,0 +1,77 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+from datetime import datetime
+
+import frappe
+import numpy as np
+from frappe.tests import IntegrationTestCase, UnitTestCase
+
+from crm.fcrm.doctype.crm_pipeline_velocity.crm_pipeline_velocity import (
+	DURATION_BUCKETS,
+	get_duration_histograms,
+	get_percentiles,
+	merge_rollups,
+	parse_histograms,
+)
+
+
+class TestCRMPipelineVelocity(UnitTestCase):
+	def test_histogram_buckets(self):
+		keys = np.array([0, 0, 1, 1, 1])
+		durations = np.array([10, 3600, 3600, 7200, 86400 * 3], dtype=float)
+		histograms = get_duration_histograms(keys, durations, 2)
+
+		self.assertEqual(histograms.shape, (2, len(DURATION_BUCKETS) + 1))
+		self.assertEqual(histograms.sum(axis=1).tolist(), [2, 3])
+		self.assertEqual(histograms[0, 0], 1)
+
+	def test_percentiles_are_within_bucket_bounds(self):
+		durations = np.full(100, 86400.0)
+		histograms = get_duration_histograms(np.zeros(100, dtype=int), durations, 1)
+		p50, p90 = get_percentiles(histograms, [50, 90])[0]
+
+		bucket = np.searchsorted(DURATION_BUCKETS, 86400, side="right")
+		self.assertTrue(DURATION_BUCKETS[bucket - 1] <= p50 <= DURATION_BUCKETS[bucket])
+		self.assertLessEqual(p50, p90)
+
+	def test_percentiles_of_empty_histogram(self):
+		histograms = np.zeros((1, len(DURATION_BUCKETS) + 1), dtype=np.int64)
+		self.assertEqual(get_percentiles(histograms, [50]).tolist(), [[0.0]])
+
+
+class IntegrationTestCRMPipelineVelocity(IntegrationTestCase):
+	def test_merge_rollups(self):
+		frappe.db.delete("CRM Pipeline Velocity", {"reference_doctype": "CRM Lead"})
+		rows = [
+			("log-1", datetime(2026, 1, 1, 10), "Administrator", "New", "Contacted", 3600),
+			("log-2", datetime(2026, 1, 1, 18), "Administrator", "New", "Contacted", 7200),
+			("log-3", datetime(2026, 1, 2, 9), "Administrator", "New", "Contacted", None),
+		]
+		merge_rollups("CRM Lead", rows)
+		merge_rollups("CRM Lead", rows[:1])
+
+		rollups = frappe.get_all(
+			"CRM Pipeline Velocity",
+			filters={"reference_doctype": "CRM Lead"},
+			fields=[
+				"date",
+				"user",
+				"from_status",
+				"to_status",
+				"transitions",
+				"total_duration",
+				"duration_histogram",
+			],
+			order_by="date asc",
+		)
+		self.assertEqual([str(r.date) for r in rollups], ["2026-01-01", "2026-01-02"])
+		self.assertEqual([r.transitions for r in rollups], [3, 1])
+		self.assertEqual([r.total_duration for r in rollups], [3600 * 2 + 7200, 0])
+		self.assertEqual(
+			parse_histograms([r.duration_histogram for r in rollups]).sum(axis=1).tolist(), [3, 1]
+		)
+		self.assertEqual(
+			(rollups[0].user, rollups[0].from_status, rollups[0].to_status),
+			("Administrator", "New", "Contacted"),
+		)
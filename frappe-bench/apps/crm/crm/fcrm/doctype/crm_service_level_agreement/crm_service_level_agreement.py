@@ -15,6 +15,12 @@ from frappe.utils import (
 )
 from crm.fcrm.doctype.crm_service_level_agreement.utils import get_context
 
+# doctypes under SLA and the field holding the owner notified on breach
+SLA_DOCTYPES = {"CRM Lead": "lead_owner", "CRM Deal": "deal_owner"}
+
+# records saved while the previous sweep ran may commit after it, sweep again this far behind the watermark
+SWEEP_OVERLAP_MINUTES = 5
+
 
 class CRMServiceLevelAgreement(Document):
 	def validate(self):
@@ -223,3 +229,109 @@ class CRMServiceLevelAgreement(Document):
 		for row in holiday_list.holidays:
 			res.append(row.date)
 		return res
+
+
+def sweep_sla_breaches():
+	"""Mark leads and deals whose first response is overdue as Failed and notify their owners.
+
+	Only records with `response_by` past the previous sweep are checked, the status is otherwise
+	updated when the record is saved."""
+	now = now_datetime()
+	for doctype in SLA_DOCTYPES:
+		watermark = frappe.db.get_global(f"crm_sla_breach_watermark::{doctype}")
+		since = watermark and add_to_date(get_datetime(watermark), minutes=-SWEEP_OVERLAP_MINUTES)
+
+		breached = mark_sla_breaches(doctype, since, now)
+		# the first sweep catches up on the whole history, only notify breaches from then on
+		if watermark:
+			notify_sla_breaches(doctype, breached)
+
+		frappe.db.set_global(f"crm_sla_breach_watermark::{doctype}", str(now))
+		frappe.db.commit()  # nosemgrep
+
+
+def mark_sla_breaches(doctype, since, until):
+	"""Set `sla_status` to Failed with one update for all records overdue between `since` and `until`"""
+	Doc = frappe.qb.DocType(doctype)
+	condition = (
+		(Doc.sla_status == "First Response Due")
+		& Doc.first_responded_on.isnull()
+		& (Doc.response_by <= until)
+	)
+	if since:
+		condition &= Doc.response_by > since
+
+	title_fields = [Doc.lead_name] if doctype == "CRM Lead" else [Doc.organization, Doc.lead_name]
+	breached = (
+		frappe.qb.from_(Doc)
+		.select(Doc.name, Doc[SLA_DOCTYPES[doctype]].as_("owner"), *title_fields)
+		.where(condition)
+		.for_update()
+		.run(as_dict=True)
+	)
+	if breached:
+		frappe.qb.update(Doc).set(Doc.sla_status, "Failed").where(condition).run()
+
+	return breached
+
+
+def notify_sla_breaches(doctype, breached):
+	"""Insert one notification per breached record and publish one realtime event per owner"""
+	breached = [d for d in breached if d.owner]
+	if not breached:
+		return
+
+	now = now_datetime()
+	label = doctype[4:].lower()
+	frappe.db.bulk_insert(
+		"CRM Notification",
+		fields=[
+			"name",
+			"creation",
+			"modified",
+			"owner",
+			"modified_by",
+			"from_user",
+			"to_user",
+			"type",
+			"message",
+			"notification_text",
+			"notification_type_doctype",
+			"notification_type_doc",
+			"reference_doctype",
+			"reference_name",
+		],
+		values=[
+			(
+				frappe.generate_hash(length=10),
+				now,
+				now,
+				"Administrator",
+				"Administrator",
+				"Administrator",
+				d.owner,
+				"SLA",
+				_("First response for {0} {1} is overdue").format(label, d.name),
+				get_breach_notification_text(label, d.get("organization") or d.lead_name or d.name),
+				doctype,
+				d.name,
+				doctype,
+				d.name,
+			)
+			for d in breached
+		],
+	)
+
+	for user in {d.owner for d in breached}:
+		frappe.publish_realtime("crm_notification", user=user, after_commit=True)
+
+
+def get_breach_notification_text(label, title):
+	return f"""
+		<div class="mb-2 leading-5 text-ink-gray-5">
+			<span>{ _('First response for {0} {1} is overdue').format(
+				label,
+				f'<span class="font-medium text-ink-gray-9">{ frappe.utils.escape_html(title) }</span>'
+			) }</span>
+		</div>
+	"""
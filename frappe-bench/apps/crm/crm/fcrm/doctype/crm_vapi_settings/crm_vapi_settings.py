@@ -0,0 +1,24 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe import _
+from frappe.model.document import Document
+from frappe.utils import cint, get_url
+
+
+class CRMVapiSettings(Document):
+	@property
+	def webhook_url(self):
+		return get_url("api/method/crm.integrations.vapi.handler.handle_webhook")
+
+	def validate(self):
+		if not self.enabled:
+			return
+
+		for field in ("api_key", "assistant_id", "phone_number_id", "webhook_secret"):
+			if not self.get(field):
+				frappe.throw(_("{0} is required").format(_(self.meta.get_label(field))))
+
+		if cint(self.max_concurrent_calls) < 1:
+			frappe.throw(_("Max Concurrent Calls must be at least 1"))
@@ -0,0 +1,83 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import json
+import time
+
+import frappe
+from frappe.tests import IntegrationTestCase
+
+from crm.integrations.vapi.handler import (
+	CALL_RESULTS_KEY,
+	UNKNOWN_CALL_RETENTION_SECONDS,
+	flush_call_results,
+	get_call_result,
+	get_ended_status,
+)
+
+
+class TestCRMVapiSettings(IntegrationTestCase):
+	def setUp(self):
+		frappe.cache.delete_value(CALL_RESULTS_KEY)
+
+	def tearDown(self):
+		frappe.cache.delete_value(CALL_RESULTS_KEY)
+
+	def test_call_result(self):
+		self.assertIsNone(get_call_result({"type": "status-update", "status": "ringing"}))
+		self.assertEqual(
+			get_call_result({"type": "status-update", "status": "ringing", "call": {"id": "c1"}}),
+			{"id": "c1", "status": "Ringing"},
+		)
+		result = get_call_result(
+			{
+				"type": "end-of-call-report",
+				"call": {"id": "c1"},
+				"endedReason": "customer-busy",
+				"durationSeconds": 42.4,
+				"recordingUrl": "https://example.com/recording.wav",
+			}
+		)
+		self.assertEqual(result["status"], "Busy")
+		self.assertEqual(result["duration"], 42)
+		self.assertEqual(result["recording_url"], "https://example.com/recording.wav")
+
+	def test_ended_status(self):
+		self.assertEqual(get_ended_status("customer-did-not-answer"), "No Answer")
+		self.assertEqual(get_ended_status("pipeline-error-openai-llm-failed"), "Failed")
+		self.assertEqual(get_ended_status("customer-ended-call"), "Completed")
+		self.assertEqual(get_ended_status(None), "Completed")
+
+	def test_flush_call_results(self):
+		call_id = frappe.generate_hash()
+		frappe.get_doc(
+			{
+				"doctype": "CRM Call Log",
+				"id": call_id,
+				"telephony_medium": "Vapi",
+				"type": "Outgoing",
+				"status": "Queued",
+				"from": "+10000000000",
+				"to": "+10000000001",
+			}
+		).insert()
+
+		now = time.time()
+		for result in (
+			{"id": call_id, "status": "Completed", "duration": 30},
+			# late status update of an ended call
+			{"id": call_id, "status": "In Progress"},
+			# call log not committed yet
+			{"id": "pending-call", "status": "Ringing"},
+			# not a call placed from the CRM
+			{"id": "expired-call", "status": "Ringing", "received_at": now - UNKNOWN_CALL_RETENTION_SECONDS},
+		):
+			frappe.cache.rpush(CALL_RESULTS_KEY, json.dumps({"received_at": now, **result}))
+
+		flush_call_results()
+
+		call_log = frappe.db.get_value("CRM Call Log", call_id, ["status", "duration"], as_dict=True)
+		self.assertEqual((call_log.status, call_log.duration), ("Completed", 30))
+
+		requeued = [json.loads(r)["id"] for r in frappe.cache.lrange(CALL_RESULTS_KEY, 0, -1)]
+		self.assertEqual(requeued, ["pending-call"])
@@ -10,6 +10,8 @@ from frappe.frappeclient import FrappeClient
 from frappe.model.document import Document
 from frappe.utils import get_url_to_form, get_url_to_list
 
+from crm.fcrm.doctype.crm_form_script.crm_form_script import clear_form_script_cache
+
 
 class ERPNextCRMSettings(Document):
 	def validate(self):
@@ -76,6 +78,7 @@ class ERPNextCRMSettings(Document):
 			if frappe.db.exists("CRM Form Script", "Create Quotation from CRM Deal"):
 				script = get_crm_form_script()
 				frappe.db.set_value("CRM Form Script", "Create Quotation from CRM Deal", "script", script)
+				clear_form_script_cache("CRM Deal", "Form")
 				return True
 			return False
 		except Exception:
@@ -117,6 +120,15 @@ def get_customer_link(crm_deal):
 			frappe.throw(_("Error while fetching customer in ERPNext, check error log for more details"))
 
 
+@frappe.whitelist()
+def get_deal_erpnext_links(crm_deal):
+	"""Returns whether the integration is enabled and the link to the customer of the deal, in one call
+	for the deal form script."""
+	if not frappe.db.get_single_value("ERPNext CRM Settings", "enabled"):
+		return {"enabled": False}
+	return {"enabled": True, "customer_url": get_customer_link(crm_deal)}
+
+
 @frappe.whitelist()
 def get_quotation_url(crm_deal, organization):
 	erpnext_crm_settings = frappe.get_single("ERPNext CRM Settings")
@@ -266,7 +278,10 @@ def get_crm_form_script():
 	return """
 async function setupForm({ doc, call, $dialog, updateField, createToast }) {
 	let actions = [];
-	let is_erpnext_integration_enabled = await call("frappe.client.get_single_value", {doctype: "ERPNext CRM Settings", field: "enabled"});
+	let { enabled: is_erpnext_integration_enabled, customer_url } = await call(
+		"crm.fcrm.doctype.erpnext_crm_settings.erpnext_crm_settings.get_deal_erpnext_links",
+		{ crm_deal: doc.name }
+	);
 	if (!["Lost", "Won"].includes(doc?.status) && is_erpnext_integration_enabled) {
 		actions.push({
 			label: __("Create Quotation"),
@@ -285,16 +300,11 @@ async function setupForm({ doc, call, $dialog, updateField, createToast }) {
 			}
 		})
 	}
-	if (is_erpnext_integration_enabled) {
-		let customer_url = await call("crm.fcrm.doctype.erpnext_crm_settings.erpnext_crm_settings.get_customer_link", {
-			crm_deal: doc.name
+	if (customer_url) {
+		actions.push({
+			label: __("View Customer"),
+			onClick: () => window.open(customer_url, '_blank')
 		});
-		if (customer_url) {
-			actions.push({
-				label: __("View Customer"),
-				onClick: () => window.open(customer_url, '_blank')
-			});
-		}
 	}
 	return {
 		actions: actions,
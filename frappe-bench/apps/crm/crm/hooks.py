@@ -134,6 +134,10 @@ override_doctype_class = {
 	"Email Template": "crm.overrides.email_template.CustomEmailTemplate",
 }
 
+# Reuse the values read when loading these documents as the document before save,
+# instead of reloading them from the database on every save
+snapshot_before_save_doctypes = ["CRM Lead", "CRM Deal"]
+
 # Document Events
 # ---------------
 # Hook on document methods and events
@@ -149,13 +153,22 @@ doc_events = {
 	"Comment": {
 		"on_update": ["crm.api.comment.on_update"],
 	},
+	"Version": {
+		"after_insert": ["crm.fcrm.doctype.crm_field_activity.crm_field_activity.project_version"],
+	},
 	"WhatsApp Message": {
 		"validate": ["crm.api.whatsapp.validate"],
 		"on_update": ["crm.api.whatsapp.on_update"],
 	},
 	"CRM Deal": {
 		"on_update": [
-			"crm.fcrm.doctype.erpnext_crm_settings.erpnext_crm_settings.create_customer_in_erpnext"
+			"crm.fcrm.doctype.erpnext_crm_settings.erpnext_crm_settings.create_customer_in_erpnext",
+			"crm.api.dataviz.clear_sales_forecast_cache",
+			"crm.fcrm.doctype.crm_organization.crm_organization.mark_stale_organization",
+		],
+		"on_trash": [
+			"crm.api.dataviz.clear_sales_forecast_cache",
+			"crm.fcrm.doctype.crm_organization.crm_organization.mark_stale_organization",
 		],
 	},
 	"User": {
@@ -164,26 +177,29 @@ doc_events = {
 	},
 }
 
+# Versions inserted together by `frappe.core.doctype.version.version.insert_versions`
+after_insert_versions = ["crm.fcrm.doctype.crm_field_activity.crm_field_activity.project_versions"]
+
 # Scheduled Tasks
 # ---------------
 
-# scheduler_events = {
-# "all": [
-# "crm.tasks.all"
-# ],
-# "daily": [
-# "crm.tasks.daily"
-# ],
-# "hourly": [
-# "crm.tasks.hourly"
-# ],
-# "weekly": [
-# "crm.tasks.weekly"
-# ],
-# "monthly": [
-# "crm.tasks.monthly"
-# ],
-# }
+scheduler_events = {
+	"cron": {
+		"* * * * *": [
+			"crm.fcrm.doctype.crm_call_campaign.crm_call_campaign.run_call_campaigns",
+		],
+		"*/5 * * * *": [
+			"crm.fcrm.doctype.crm_service_level_agreement.crm_service_level_agreement.sweep_sla_breaches",
+		],
+	},
+	"hourly": [
+		"crm.fcrm.doctype.crm_pipeline_velocity.crm_pipeline_velocity.update_pipeline_velocity",
+		"crm.fcrm.doctype.crm_organization.crm_organization.update_customer_segments",
+	],
+	"daily": [
+		"crm.fcrm.doctype.crm_organization.crm_organization.rebuild_customer_segments",
+	],
+}
 
 # Testing
 # -------
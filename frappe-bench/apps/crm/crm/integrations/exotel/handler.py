@@ -2,7 +2,8 @@ import bleach
 import frappe
 import requests
 from frappe import _
-from frappe.integrations.utils import create_request_log
+from frappe.deferred_insert import deferred_insert
+from frappe.integrations.utils import get_json
 
 from crm.integrations.api import get_contact_by_phone_number
 
@@ -23,20 +24,16 @@ def handle_request(**kwargs):
 	if not is_integration_enabled():
 		return
 
-	request_log = create_request_log(
-		kwargs,
-		request_description="Exotel Call",
-		service_name="Exotel",
-		request_headers=frappe.request.headers,
-		is_remote_request=1,
-	)
+	request_log = {
+		"integration_request_service": "Exotel",
+		"request_description": "Exotel Call",
+		"request_headers": get_json(dict(frappe.request.headers)),
+		"data": get_json(kwargs),
+		"is_remote_request": 1,
+		"status": "Completed",
+	}
 
 	try:
-		request_log.status = "Completed"
-		exotel_settings = get_exotel_settings()
-		if not exotel_settings.enabled:
-			return
-
 		call_payload = kwargs
 
 		frappe.publish_realtime("exotel_call", call_payload)
@@ -56,14 +53,14 @@ def handle_request(**kwargs):
 				agent=call_payload.get("AgentEmail"),
 			)
 	except Exception:
-		request_log.status = "Failed"
-		request_log.error = frappe.get_traceback()
+		request_log["status"] = "Failed"
+		request_log["error"] = frappe.get_traceback()
 		frappe.db.rollback()
 		frappe.log_error(title="Error while creating/updating call record")
 		frappe.db.commit()
 	finally:
-		request_log.save(ignore_permissions=True)
-		frappe.db.commit()
+		# written in bulk by the scheduler instead of committing a log for every webhook
+		deferred_insert("Integration Request", [request_log])
 
 
 # Outgoing Call
@@ -156,13 +153,13 @@ def get_status_updater_url():
 
 
 def get_exotel_settings():
-	return frappe.get_single("CRM Exotel Settings")
+	return frappe.client_cache.get_doc("CRM Exotel Settings")
 
 
 def validate_request():
 	# workaround security since exotel does not support request signature
 	# /api/method/<exotel-integration-method>?key=<exotel-webhook=verify-token>
-	webhook_verify_token = frappe.db.get_single_value("CRM Exotel Settings", "webhook_verify_token")
+	webhook_verify_token = get_exotel_settings().webhook_verify_token
 	key = frappe.request.args.get("key")
 	is_valid = key and key == webhook_verify_token
 
@@ -172,7 +169,7 @@ def validate_request():
 
 @frappe.whitelist()
 def is_integration_enabled():
-	return frappe.db.get_single_value("CRM Exotel Settings", "enabled", True)
+	return get_exotel_settings().enabled
 
 
 # Call Log Functions
@@ -272,7 +269,9 @@ def update_call_log(call_payload, status="Ringing", call_log=None):
 			call_log.duration = (
 				call_payload.get("DialCallDuration") or call_payload.get("ConversationDuration") or 0
 			)
-			call_log.recording_url = call_payload.get("RecordingUrl") if call_payload.get("RecordingUrl") else ""
+			call_log.recording_url = (
+				call_payload.get("RecordingUrl") if call_payload.get("RecordingUrl") else ""
+			)
 			call_log.start_time = call_payload.get("StartTime")
 			call_log.end_time = call_payload.get("EndTime")
 
@@ -97,8 +97,11 @@ def link(contact_number, call_log):
 		call_log.link_with_reference_doc(doctype, docname)
 
 
-def update_call_log(call_sid, status=None):
-	"""Update call log status."""
+def update_call_log(call_sid, call_info=None):
+	"""Update call log duration and timings from the Twilio REST API.
+
+	Runs as a background job so webhooks do not wait on Twilio, the call status is set by the webhooks.
+	`call_info` is forwarded to the parent call as a user defined message."""
 	twilio = Twilio.connect()
 	if not (twilio and frappe.db.exists("CRM Call Log", call_sid)):
 		return
@@ -106,26 +109,38 @@ def update_call_log(call_sid, status=None):
 	try:
 		call_details = twilio.get_call_info(call_sid)
 		call_log = frappe.get_doc("CRM Call Log", call_sid)
-		call_log.status = TwilioCallDetails.get_call_status(status or call_details.status)
 		call_log.duration = call_details.duration
 		call_log.start_time = get_datetime_from_timestamp(call_details.start_time)
 		call_log.end_time = get_datetime_from_timestamp(call_details.end_time)
 		call_log.save(ignore_permissions=True)
 		frappe.db.commit()
+
+		if call_info:
+			twilio.twilio_client.calls(call_sid).user_defined_messages.create(content=json.dumps(call_info))
 		return call_log
 	except Exception:
 		frappe.log_error(title="Error while updating call record")
 		frappe.db.commit()
 
 
+def enqueue_update_call_log(call_sid, call_info=None):
+	frappe.enqueue(
+		"crm.integrations.twilio.api.update_call_log",
+		queue="short",
+		enqueue_after_commit=True,
+		call_sid=call_sid,
+		call_info=call_info,
+	)
+
+
 @frappe.whitelist(allow_guest=True)
 def update_recording_info(**kwargs):
 	try:
 		args = frappe._dict(kwargs)
 		recording_url = args.RecordingUrl
 		call_sid = args.CallSid
-		update_call_log(call_sid)
 		frappe.db.set_value("CRM Call Log", call_sid, "recording_url", recording_url)
+		enqueue_update_call_log(call_sid)
 	except Exception:
 		frappe.log_error(title=_("Failed to capture Twilio recording"))
 
@@ -135,7 +150,10 @@ def update_call_status_info(**kwargs):
 	try:
 		args = frappe._dict(kwargs)
 		parent_call_sid = args.ParentCallSid
-		update_call_log(parent_call_sid, status=args.CallStatus)
+		# status is written right away to keep the order in which Twilio sends the updates
+		frappe.db.set_value(
+			"CRM Call Log", parent_call_sid, "status", TwilioCallDetails.get_call_status(args.CallStatus)
+		)
 
 		call_info = {
 			"ParentCallSid": args.ParentCallSid,
@@ -145,9 +163,7 @@ def update_call_status_info(**kwargs):
 			"From": args.From,
 			"To": args.To,
 		}
-
-		client = Twilio.get_twilio_client()
-		client.calls(args.ParentCallSid).user_defined_messages.create(content=json.dumps(call_info))
+		enqueue_update_call_log(parent_call_sid, call_info)
 	except Exception:
 		frappe.log_error(title=_("Failed to update Twilio call status"))
 
@@ -1,6 +1,5 @@
 import frappe
 from frappe import _
-from frappe.utils.password import get_decrypted_password
 from twilio.jwt.access_token import AccessToken
 from twilio.jwt.access_token.grants import VoiceGrant
 from twilio.rest import Client as TwilioClient
@@ -8,6 +7,9 @@ from twilio.twiml.voice_response import Dial, VoiceResponse
 
 from .utils import get_public_url, merge_dicts
 
+# Twilio connectors per site, kept across requests by the process
+_connectors = {}
+
 
 class Twilio:
 	"""Twilio connector over TwilioClient."""
@@ -21,15 +23,20 @@ class Twilio:
 		self.application_sid = settings.twiml_sid
 		self.api_key = settings.api_key
 		self.api_secret = settings.get_password("api_secret")
-		self.twilio_client = self.get_twilio_client()
+		self.twilio_client = TwilioClient(settings.account_sid, settings.get_password("auth_token"))
 
 	@classmethod
 	def connect(self):
-		"""Make a twilio connection."""
-		settings = frappe.get_doc("CRM Twilio Settings")
+		"""Make a twilio connection, reused by the process until `CRM Twilio Settings` change."""
+		settings = frappe.client_cache.get_doc("CRM Twilio Settings")
 		if not (settings and settings.enabled):
 			return
-		return Twilio(settings=settings)
+
+		# client cache returns a new settings document once the cached one is invalidated
+		twilio = _connectors.get(frappe.local.site)
+		if not twilio or twilio.settings is not settings:
+			twilio = _connectors[frappe.local.site] = Twilio(settings=settings)
+		return twilio
 
 	def get_phone_numbers(self):
 		"""Get account's twilio phone numbers."""
@@ -114,14 +121,11 @@ class Twilio:
 
 	@classmethod
 	def get_twilio_client(self):
-		twilio_settings = frappe.get_doc("CRM Twilio Settings")
-		if not twilio_settings.enabled:
+		twilio = self.connect()
+		if not twilio:
 			frappe.throw(_("Please enable twilio settings before making a call."))
 
-		auth_token = get_decrypted_password("CRM Twilio Settings", "CRM Twilio Settings", "auth_token")
-		client = TwilioClient(twilio_settings.account_sid, auth_token)
-
-		return client
+		return twilio.twilio_client
 
 
 class IncomingCall:
@@ -0,0 +1,205 @@
+import hmac
+import json
+import time
+
+import frappe
+import requests
+from frappe import _
+from frappe.utils import cint, convert_utc_to_system_timezone, get_datetime
+from frappe.utils.password import get_decrypted_password
+
+# Endpoint for webhook, set it as the Server URL of the Vapi assistant:
+# <site>/api/method/crm.integrations.vapi.handler.handle_webhook
+
+# Vapi Reference:
+# https://docs.vapi.ai/api-reference/calls/create
+# https://docs.vapi.ai/server-url/events
+
+DEFAULT_BASE_URL = "https://api.vapi.ai"
+
+# webhook results are buffered in this redis list and written to CRM Call Log in batches
+CALL_RESULTS_KEY = "crm_vapi_call_results"
+FLUSH_BATCH_SIZE = 500
+# results for calls without a CRM Call Log are kept this long, the log may not be committed yet
+UNKNOWN_CALL_RETENTION_SECONDS = 10 * 60
+
+CALL_STATUSES = {
+	"queued": "Queued",
+	"ringing": "Ringing",
+	"in-progress": "In Progress",
+	"forwarding": "In Progress",
+}
+FINAL_STATUSES = ("Completed", "Failed", "Busy", "No Answer", "Canceled")
+
+
+class VapiClient:
+	"""Places calls through the Vapi REST API, reusing one pooled HTTP session"""
+
+	def __init__(self, api_key, assistant_id, phone_number_id, base_url=None, pool_size=32):
+		self.assistant_id = assistant_id
+		self.phone_number_id = phone_number_id
+		self.base_url = (base_url or DEFAULT_BASE_URL).rstrip("/")
+
+		self.session = requests.Session()
+		self.session.headers.update({"Authorization": f"Bearer {api_key}"})
+		adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+		self.session.mount("https://", adapter)
+		self.session.mount("http://", adapter)
+
+	@classmethod
+	def connect(cls, assistant_id=None, pool_size=32):
+		"""Make a Vapi client from CRM Vapi Settings, None if the integration is disabled"""
+		settings = frappe.get_single("CRM Vapi Settings")
+		if not settings.enabled:
+			return None
+
+		return cls(
+			api_key=settings.get_password("api_key"),
+			assistant_id=assistant_id or settings.assistant_id,
+			phone_number_id=settings.phone_number_id,
+			base_url=settings.base_url,
+			pool_size=pool_size,
+		)
+
+	def place_call(self, number):
+		"""Create an outbound call to `number`, returns the call object or raises `requests.HTTPError`"""
+		response = self.session.post(
+			f"{self.base_url}/call",
+			json={
+				"assistantId": self.assistant_id,
+				"phoneNumberId": self.phone_number_id,
+				"customer": {"number": number},
+			},
+			timeout=30,
+		)
+		response.raise_for_status()
+		return response.json()
+
+
+@frappe.whitelist(allow_guest=True, methods=["POST"])
+def handle_webhook():
+	"""Receives Vapi server messages, call updates are buffered and written by `flush_call_results`"""
+	validate_request()
+
+	payload = frappe.request.get_json(silent=True) or {}
+	result = get_call_result(payload.get("message") or {})
+	if not result:
+		return
+
+	result["received_at"] = time.time()
+	frappe.cache.rpush(CALL_RESULTS_KEY, json.dumps(result, default=str))
+	frappe.enqueue(
+		flush_call_results,
+		queue="short",
+		job_id=f"{frappe.local.site}::crm_vapi_flush_call_results",
+		deduplicate=True,
+	)
+
+
+def validate_request():
+	secret = get_decrypted_password(
+		"CRM Vapi Settings", "CRM Vapi Settings", "webhook_secret", raise_exception=False
+	)
+	received = frappe.get_request_header("X-Vapi-Secret") or ""
+	if not secret or not hmac.compare_digest(received.encode(), secret.encode()):
+		frappe.throw(_("Unauthorized request"), exc=frappe.PermissionError)
+
+
+def get_call_result(message):
+	"""Map a Vapi server message to CRM Call Log values, None for messages not related to call status"""
+	call_id = (message.get("call") or {}).get("id")
+	if not call_id:
+		return None
+
+	if message.get("type") == "status-update":
+		status = CALL_STATUSES.get(message.get("status"))
+		return {"id": call_id, "status": status} if status else None
+
+	if message.get("type") == "end-of-call-report":
+		recording = (message.get("artifact") or {}).get("recording") or {}
+		return {
+			"id": call_id,
+			"status": get_ended_status(message.get("endedReason")),
+			"duration": cint(message.get("durationSeconds")),
+			"start_time": to_system_datetime(message.get("startedAt")),
+			"end_time": to_system_datetime(message.get("endedAt")),
+			"recording_url": message.get("recordingUrl") or recording.get("url") or "",
+		}
+
+
+def get_ended_status(ended_reason):
+	ended_reason = ended_reason or ""
+	if "did-not-answer" in ended_reason or "voicemail" in ended_reason:
+		return "No Answer"
+	if "busy" in ended_reason:
+		return "Busy"
+	if "error" in ended_reason or "failed" in ended_reason:
+		return "Failed"
+	return "Completed"
+
+
+def to_system_datetime(timestamp):
+	if not timestamp:
+		return None
+	return convert_utc_to_system_timezone(get_datetime(timestamp)).replace(tzinfo=None)
+
+
+def flush_call_results():
+	"""Drain buffered webhook results into CRM Call Log, one bulk update per batch"""
+	unknown = []
+	while raw_results := pop_call_results(FLUSH_BATCH_SIZE):
+		updates = {}
+		raw_results_by_call = {}
+		for raw_result in raw_results:
+			result = json.loads(raw_result)
+			call_id = result.pop("id")
+			raw_results_by_call.setdefault(call_id, []).append((result.pop("received_at", 0), raw_result))
+			merge_call_result(updates.setdefault(call_id, {}), result)
+
+		call_statuses = dict(
+			frappe.get_all(
+				"CRM Call Log",
+				filters={"name": ["in", list(updates)]},
+				fields=["name", "status"],
+				as_list=True,
+			)
+		)
+		for call_id in list(updates):
+			if call_id not in call_statuses:
+				# the call log of a call placed from the CRM may not be committed yet,
+				# results of other calls expire
+				unknown.extend(
+					raw_result
+					for received_at, raw_result in raw_results_by_call[call_id]
+					if time.time() - received_at < UNKNOWN_CALL_RETENTION_SECONDS
+				)
+				del updates[call_id]
+			elif call_statuses[call_id] in FINAL_STATUSES:
+				updates[call_id].pop("status", None)
+
+		updates = {call_id: values for call_id, values in updates.items() if values}
+		frappe.db.bulk_update("CRM Call Log", updates, chunk_size=100)
+		frappe.db.commit()  # nosemgrep
+
+	# requeued after draining, so they are retried by the next flush
+	if unknown:
+		pipeline = frappe.cache.pipeline(transaction=False)
+		pipeline.rpush(frappe.cache.make_key(CALL_RESULTS_KEY), *unknown)
+		pipeline.execute()
+
+
+def pop_call_results(count):
+	"""Atomically remove and return up to `count` results from the head of the buffer"""
+	pipeline = frappe.cache.pipeline(transaction=True)
+	key = frappe.cache.make_key(CALL_RESULTS_KEY)
+	pipeline.lrange(key, 0, count - 1)
+	pipeline.ltrim(key, count, -1)
+	results, _trimmed = pipeline.execute()
+	return results
+
+
+def merge_call_result(values, result):
+	# a late status update must not override the final status of an ended call
+	if values.get("status") in FINAL_STATUSES and result.get("status") not in FINAL_STATUSES:
+		result.pop("status", None)
+	values.update(result)
@@ -0,0 +1,131 @@
+"""Minimal stand-in for the Vapi API to load test call campaigns without placing real calls.
+
+Every call created through `POST /call` is answered immediately, then the server replays the
+webhook messages Vapi would send (ringing, in-progress, end-of-call-report) to the CRM.
+
+Usage:
+	python -m crm.integrations.vapi.mock_server --webhook-url <site>/api/method/crm.integrations.vapi.handler.handle_webhook --secret <webhook secret>
+
+and set http://<host>:<port> as Base URL in CRM Vapi Settings.
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+ENDED_REASONS = [
+	("customer-ended-call", 0.6),
+	("assistant-ended-call", 0.2),
+	("customer-did-not-answer", 0.15),
+	("customer-busy", 0.05),
+]
+
+
+class MockVapi:
+	def __init__(self, webhook_url, secret, min_duration, max_duration):
+		self.webhook_url = webhook_url
+		self.min_duration = min_duration
+		self.max_duration = max_duration
+		self.session = requests.Session()
+		self.session.headers.update({"X-Vapi-Secret": secret})
+
+	def create_call(self, payload):
+		call = {
+			"id": str(uuid.uuid4()),
+			"status": "queued",
+			"assistantId": payload.get("assistantId"),
+			"phoneNumberId": payload.get("phoneNumberId"),
+			"customer": payload.get("customer"),
+			"createdAt": datetime.now(timezone.utc).isoformat(),
+		}
+		threading.Thread(target=self.play_call, args=(call,), daemon=True).start()
+		return call
+
+	def play_call(self, call):
+		time.sleep(random.uniform(0.5, 2))
+		self.send(call, {"type": "status-update", "status": "ringing"})
+
+		reason = random.choices(*zip(*ENDED_REASONS, strict=True))[0]
+		started_at = datetime.now(timezone.utc)
+		duration = 0
+		if reason.endswith("ended-call"):
+			self.send(call, {"type": "status-update", "status": "in-progress"})
+			duration = random.uniform(self.min_duration, self.max_duration)
+		time.sleep(duration)
+
+		self.send(call, {"type": "status-update", "status": "ended", "endedReason": reason})
+		self.send(
+			call,
+			{
+				"type": "end-of-call-report",
+				"endedReason": reason,
+				"startedAt": started_at.isoformat(),
+				"endedAt": (started_at + timedelta(seconds=duration)).isoformat(),
+				"durationSeconds": round(duration),
+				"recordingUrl": f"https://example.com/recordings/{call['id']}.wav" if duration else "",
+			},
+		)
+
+	def send(self, call, message):
+		try:
+			self.session.post(self.webhook_url, json={"message": {**message, "call": call}}, timeout=30)
+		except requests.exceptions.RequestException as e:
+			print(f"webhook for call {call['id']} failed: {e}")
+
+
+def make_handler(vapi):
+	class Handler(BaseHTTPRequestHandler):
+		def do_POST(self):
+			if self.path.rstrip("/") != "/call":
+				return self.respond(404, {"message": "Not Found"})
+
+			payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or "{}")
+			if not (payload.get("customer") or {}).get("number"):
+				return self.respond(400, {"message": "customer.number is required"})
+
+			self.respond(201, vapi.create_call(payload))
+
+		def respond(self, status, body):
+			body = json.dumps(body).encode()
+			self.send_response(status)
+			self.send_header("Content-Type", "application/json")
+			self.send_header("Content-Length", str(len(body)))
+			self.end_headers()
+			self.wfile.write(body)
+
+		def log_message(self, format, *args):
+			pass
+
+	return Handler
+
+
+def main():
+	parser = argparse.ArgumentParser(
+		description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+	)
+	parser.add_argument("--webhook-url", required=True)
+	parser.add_argument("--secret", required=True)
+	parser.add_argument("--host", default="127.0.0.1")
+	parser.add_argument("--port", type=int, default=8787)
+	parser.add_argument("--min-duration", type=float, default=5, help="shortest answered call in seconds")
+	parser.add_argument("--max-duration", type=float, default=60, help="longest answered call in seconds")
+	args = parser.parse_args()
+
+	vapi = MockVapi(args.webhook_url, args.secret, args.min_duration, args.max_duration)
+	server = ThreadingHTTPServer((args.host, args.port), make_handler(vapi))
+	print(f"Mock Vapi listening on http://{args.host}:{args.port}")
+	try:
+		server.serve_forever()
+	except KeyboardInterrupt:
+		server.server_close()
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,44 @@
+import frappe
+
+from crm.fcrm.doctype.crm_field_activity.crm_field_activity import (
+	AVOID_FIELDS,
+	FIELDS,
+	get_field_activity_rows,
+)
+
+CHUNK_SIZE = 5000
+
+
+def execute():
+	"""Project the existing lead and deal versions into CRM Field Activity"""
+	frappe.db.delete("CRM Field Activity")
+
+	Version = frappe.qb.DocType("Version")
+	last_name = None
+	while True:
+		query = (
+			frappe.qb.from_(Version)
+			.select(
+				Version.name,
+				Version.creation,
+				Version.owner,
+				Version.ref_doctype,
+				Version.docname,
+				Version.data,
+			)
+			.where(Version.ref_doctype.isin(list(AVOID_FIELDS)))
+			.orderby(Version.name)
+			.limit(CHUNK_SIZE)
+		)
+		if last_name:
+			query = query.where(Version.name > last_name)
+
+		versions = query.run(as_dict=True)
+		if not versions:
+			break
+
+		rows = []
+		for version in versions:
+			rows.extend(get_field_activity_rows(version, idx=len(rows)))
+		frappe.db.bulk_insert("CRM Field Activity", FIELDS, rows)
+		last_name = versions[-1].name
@@ -0,0 +1,8 @@
+import frappe
+
+
+def execute():
+	if not frappe.db.exists("CRM Form Script", "Create Quotation from CRM Deal"):
+		return
+
+	frappe.get_single("ERPNext CRM Settings").reset_erpnext_form_script()
@@ -1,9 +1,48 @@
-import { createResource } from 'frappe-ui'
+import { createResource, call } from 'frappe-ui'
 import { formatCurrency, formatNumber } from '@/utils/numberFormat.js'
 import { reactive } from 'vue'
 
 const doctypeMeta = reactive({})
 const userSettings = reactive({})
+const formMeta = {}
+const scripts = {}
+const SCRIPT_KEYS = { Form: 'form_script', List: 'list_script' }
+
+export function getFormMeta(doctype, version) {
+  let cached = formMeta[doctype]
+  if (cached && (!version || cached.version === version)) {
+    return cached.promise
+  }
+
+  let promise = call('crm.api.doc.get_form_meta', { doctype }).catch((err) => {
+    delete formMeta[doctype]
+    throw err
+  })
+  formMeta[doctype] = { version, promise }
+  return promise
+}
+
+export function getScriptHashes(doctype) {
+  let hashes = {}
+  for (let view in SCRIPT_KEYS) {
+    hashes[view] = scripts[doctype]?.[view]?.hash
+  }
+  return hashes
+}
+
+export function resolveScripts(doctype, data) {
+  // scripts are omitted from the response when their hash matches the one we sent
+  for (let [view, key] of Object.entries(SCRIPT_KEYS)) {
+    let hash = data[`${key}_hash`]
+    if (!hash) continue
+    scripts[doctype] ??= {}
+    if (key in data) {
+      scripts[doctype][view] = { hash, script: data[key] }
+    } else {
+      data[key] = scripts[doctype][view]?.script
+    }
+  }
+}
 
 export function getMeta(doctype) {
   const meta = createResource({
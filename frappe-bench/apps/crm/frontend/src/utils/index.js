@@ -3,7 +3,7 @@ import TaskPriorityIcon from '@/components/Icons/TaskPriorityIcon.vue'
 import { usersStore } from '@/stores/users'
 import { gemoji } from 'gemoji'
 import { useTimeAgo } from '@vueuse/core'
-import { getMeta } from '@/stores/meta'
+import { getMeta, getFormMeta } from '@/stores/meta'
 import { toast, dayjsLocal, dayjs } from 'frappe-ui'
 import { h } from 'vue'
 
@@ -158,6 +158,12 @@ async function getFormScript(script, obj) {
 }
 
 export async function setupCustomizations(doc, obj) {
+  if (doc.data?._form_meta_version) {
+    let meta = await getFormMeta(doc.data.doctype, doc.data._form_meta_version)
+    doc.data.fields_meta = meta.fields_meta
+    doc.data._form_script = meta.form_script
+  }
+
   if (!doc.data?._form_script) return []
 
   let statuses = []
@@ -394,7 +394,7 @@ def setup_redis_cache_connection():
 		# We need to check again since someone else might have setup connection before us.
 		if not cache:
 			cache = setup_cache()
-			client_cache = ClientCache()
+			client_cache = ClientCache(max_bytes=conf.get("client_cache_max_bytes"))
 
 
 def errprint(msg: str) -> None:
@@ -680,21 +680,34 @@ def is_whitelisted(method):
 
 
 def read_only():
+	"""Run the decorated function on the read replica, if one is configured with `read_from_replica`.
+
+	Reads stay on the primary when the session wrote recently or the replica lags behind, see
+	`frappe.database.replica`."""
+	from frappe.database.replica import can_read_from_replica, is_replica_lag_acceptable
+
 	def innfn(fn):
 		@functools.wraps(fn)
 		def wrapper_fn(*args, **kwargs):
 			# frappe.read_only could be called from nested functions, in such cases don't swap the
 			# connection again.
 			switched_connection = False
-			if conf.read_from_replica:
+			if conf.read_from_replica and can_read_from_replica():
 				switched_connection = connect_replica()
 
 			try:
+				if switched_connection and not is_replica_lag_acceptable(local.replica_db):
+					local.db.close()
+					local.db = local.primary_db
+					del local.replica_db, local.primary_db
+					switched_connection = False
+
 				retval = fn(*args, **get_newargs(fn, kwargs))
 			finally:
 				if switched_connection and hasattr(local, "primary_db"):
 					local.db.close()
 					local.db = local.primary_db
+					del local.replica_db, local.primary_db
 
 			return retval
 
@@ -951,6 +964,21 @@ def get_cached_doc(*args: Any, **kwargs: Any) -> "Document":
 	return doc
 
 
+def get_cached_docs(doctype: str, names: Iterable[str]) -> list["Document"]:
+	"""Identical to `frappe.get_docs`, but return documents from cache where available.
+
+	Documents missing from the cache are loaded with one `get_docs` call and cached."""
+	names = list(dict.fromkeys(names))
+	docs = {name: cache.get_value(get_document_cache_key(doctype, name)) for name in names}
+
+	if missing := [name for name, doc in docs.items() if not doc]:
+		for name, doc in zip(missing, get_docs(doctype, missing), strict=True):
+			_set_document_in_cache(get_document_cache_key(doctype, name), doc)
+			docs[name] = doc
+
+	return [docs[name] for name in names]
+
+
 def _set_document_in_cache(key: str, doc: "Document") -> None:
 	cache.set_value(key, doc, expires_in_sec=3600)
 
@@ -1967,7 +1995,7 @@ import frappe._optimizations
 from frappe.cache_manager import clear_cache, reset_metadata_version
 from frappe.config import get_common_site_config, get_conf, get_site_config
 from frappe.core.doctype.system_settings.system_settings import get_system_settings
-from frappe.model.document import get_doc
+from frappe.model.document import get_doc, get_docs
 from frappe.model.meta import get_meta
 from frappe.realtime import publish_progress, publish_realtime
 from frappe.utils import get_traceback, mock, parse_json, safe_eval
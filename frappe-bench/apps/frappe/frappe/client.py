@@ -280,16 +280,19 @@ def bulk_update(docs):
 	"""Bulk update documents
 
 	:param docs: JSON list of documents to be updated remotely. Each document must have `docname` property"""
+	from frappe.core.doctype.version.version import deferred_versions
+
 	docs = json.loads(docs)
 	failed_docs = []
-	for doc in docs:
-		doc.pop("flags", None)
-		try:
-			existing_doc = frappe.get_doc(doc["doctype"], doc["docname"])
-			existing_doc.update(doc)
-			existing_doc.save()
-		except Exception:
-			failed_docs.append({"doc": doc, "exc": frappe.utils.get_traceback()})
+	with deferred_versions():
+		for doc in docs:
+			doc.pop("flags", None)
+			try:
+				existing_doc = frappe.get_doc(doc["doctype"], doc["docname"])
+				existing_doc.update(doc)
+				existing_doc.save()
+			except Exception:
+				failed_docs.append({"doc": doc, "exc": frappe.utils.get_traceback()})
 
 	return {"failed_docs": failed_docs}
 
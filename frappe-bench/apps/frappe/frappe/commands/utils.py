@@ -222,6 +222,60 @@ def show_config(context: CliCtxObj, format):
 		click.echo(frappe.as_json(sites_config))
 
 
+@click.command("query-profile")
+@click.option("--limit", type=int, default=20, help="Number of methods to show")
+@click.option("--format", "-f", type=click.Choice(["text", "json"]), default="text")
+@click.option("--reset", is_flag=True, default=False, help="Clear the collected profiles")
+@pass_context
+def query_profile(context: CliCtxObj, limit=20, format="text", reset=False):
+	"Show the methods with the most time spent in requests and jobs sampled by query_profiler_sample_rate"
+	from frappe import query_profiler
+	from frappe.utils.commands import render_table
+
+	site = get_site(context)
+	try:
+		frappe.init(site)
+		frappe.connect()
+		if reset:
+			query_profiler.reset()
+			return
+		report = query_profiler.get_report(limit)
+	finally:
+		frappe.destroy()
+
+	if format == "json":
+		click.echo(frappe.as_json(report))
+		return
+
+	if not report:
+		click.echo("No profiles collected, set query_profiler_sample_rate in site config to start sampling")
+		return
+
+	data = [["Method", "Requests", "p50 ms", "p95 ms", "p99 ms", "Avg Queries", "p95 Queries", "DB Time"]]
+	for row in report:
+		data.append(
+			[
+				row["method"],
+				row["requests"],
+				row["p50_duration"],
+				row["p95_duration"],
+				row["p99_duration"],
+				row["avg_queries"],
+				row["p95_queries"],
+				f"{row['db_time_share']:.0%}" if row["db_time_share"] is not None else "",
+			]
+		)
+	render_table(data)
+
+	n_plus_one = [(row["method"], query) for row in report for query in row["n_plus_one"][:3]]
+	if n_plus_one:
+		click.secho("\nRepeated queries (N+1)", fg="yellow")
+		for method, query in n_plus_one:
+			click.echo(
+				f"{method}: {query['avg_repeats']}x in {query['requests']} requests\n\t{query['query']}"
+			)
+
+
 @click.command("reset-perms")
 @pass_context
 def reset_perms(context: CliCtxObj):
@@ -1050,6 +1104,7 @@ commands = [
 	mariadb,
 	sqlite,
 	postgres,
+	query_profile,
 	request,
 	reset_perms,
 	serve,
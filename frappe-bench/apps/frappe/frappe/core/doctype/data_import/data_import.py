@@ -155,7 +155,9 @@ def start_import(data_import):
 	data_import = frappe.get_doc("Data Import", data_import)
 	try:
 		i = Importer(data_import.reference_doctype, data_import=data_import)
-		i.import_data()
+		# the form only shows the latest progress, don't send an update for every row
+		with frappe.realtime.coalesce_realtime(events=["data_import_progress"]):
+			i.import_data()
 	except JobTimeoutException:
 		frappe.db.rollback()
 		data_import.db_set("status", "Timed Out")
@@ -268,7 +270,8 @@ def import_file(doctype, file_path, import_type, submit_after_import=False, cons
 	)
 
 	i = Importer(doctype=doctype, file_path=file_path, data_import=data_import, console=console)
-	i.import_data()
+	with frappe.realtime.coalesce_realtime(events=["data_import_progress"]):
+		i.import_data()
 
 
 def import_doc(path, pre_process=None, sort=False):
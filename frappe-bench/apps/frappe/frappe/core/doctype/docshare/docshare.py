@@ -93,6 +93,7 @@ class DocShare(Document):
 
 
 def on_doctype_update():
-	"""Add index in `tabDocShare` for `(user, share_doctype)`"""
+	"""Add indexes in `tabDocShare`, `(share_doctype, user, share_name)` serves share conditions of list queries"""
 	frappe.db.add_index("DocShare", ["user", "share_doctype"])
 	frappe.db.add_index("DocShare", ["share_doctype", "share_name"])
+	frappe.db.add_index("DocShare", ["share_doctype", "user", "share_name"])
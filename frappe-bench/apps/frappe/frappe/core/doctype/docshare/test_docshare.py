@@ -83,6 +83,26 @@ class TestDocShare(IntegrationTestCase):
 		with self.assertRaises(frappe.PermissionError):
 			frappe.get_list("Web Page")
 
+	def test_list_share_condition(self):
+		docs = []
+		for i in range(3):
+			doc = frappe.new_doc("Web Page")
+			doc.update({"title": f"test document {i} for docshare list condition"})
+			doc.insert()
+			docs.append(doc)
+			if i:
+				frappe.share.add("Web Page", doc.name, self.user)
+
+		frappe.set_user(self.user)
+		query = frappe.get_list("Web Page", run=False)
+		self.assertIn("exists (select 1 from `tabDocShare`", query)
+		self.assertNotIn(docs[1].name, query)
+		self.assertCountEqual(frappe.get_list("Web Page", pluck="name"), [docs[1].name, docs[2].name])
+
+		frappe.set_user("Administrator")
+		for doc in docs:
+			doc.delete(ignore_permissions=True)
+
 	def test_share_permission(self):
 		frappe.share.add("Event", self.event.name, self.user, write=1, share=1)
 
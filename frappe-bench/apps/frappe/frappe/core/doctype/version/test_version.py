@@ -1,9 +1,10 @@
 # Copyright (c) 2015, Frappe Technologies Pvt. Ltd. and Contributors
 # License: MIT. See LICENSE
 import copy
+from unittest.mock import patch
 
 import frappe
-from frappe.core.doctype.version.version import get_diff
+from frappe.core.doctype.version.version import deferred_versions, get_diff
 from frappe.tests import IntegrationTestCase, UnitTestCase
 from frappe.tests.utils import make_test_objects
 
@@ -54,6 +55,37 @@ class TestVersion(IntegrationTestCase):
 		t.save(ignore_version=False)
 		self.assertTrue(get_versions(t))
 
+	def test_deferred_versions(self):
+		from frappe.desk.form.load import get_versions
+
+		todos = [frappe.get_doc(doctype="ToDo", description="something").insert() for _ in range(3)]
+		with deferred_versions():
+			for todo in todos:
+				todo.description = "changed"
+				todo.save(ignore_version=False)
+			self.assertFalse(get_versions(todos[0]))
+
+		frappe.db.before_commit.run()
+		for todo in todos:
+			(version,) = get_versions(todo)
+			self.assertEqual(
+				frappe.parse_json(version.data).changed, [["description", "something", "changed"]]
+			)
+
+	def test_deferred_versions_in_background(self):
+		from frappe.desk.form.load import get_versions
+
+		todo = frappe.get_doc(doctype="ToDo", description="something").insert()
+		with patch("frappe.enqueue") as enqueue, deferred_versions(in_background=True):
+			todo.description = "changed"
+			todo.save(ignore_version=False)
+			frappe.db.before_commit.run()
+
+		self.assertFalse(get_versions(todo))
+		frappe.get_attr(enqueue.call_args.args[0])(enqueue.call_args.kwargs["documents"])
+		(version,) = get_versions(todo)
+		self.assertEqual(frappe.parse_json(version.data).changed, [["description", "something", "changed"]])
+
 
 def get_fieldnames(change_array):
 	return [d[0] for d in change_array]
@@ -2,14 +2,20 @@
 # License: MIT. See LICENSE
 
 import json
+from contextlib import contextmanager
 
 import frappe
+from frappe.desk.form.document_follow import follow_document
 from frappe.model import no_value_fields, table_fields
 from frappe.model.document import Document
-from frappe.utils import cstr
+from frappe.model.naming import make_autoname
+from frappe.utils import cstr, now_datetime
 
 FIELDTYPES_TO_IGNORE = frozenset(fieldtype for fieldtype in no_value_fields if fieldtype not in table_fields)
 
+# documents diffed by one background job, see `deferred_versions`
+BACKGROUND_DIFF_CHUNK_SIZE = 500
+
 
 class Version(Document):
 	# begin: auto-generated types
@@ -197,5 +203,139 @@ def get_diff(old, new, for_child=False, compare_cancelled=False):
 		return None
 
 
+@contextmanager
+def deferred_versions(in_background: bool = False):
+	"""Insert the versions of documents saved in this block together when the transaction commits.
+
+	Diffs are computed on save and the versions are written with one multi-row insert just before
+	commit, dropped on rollback. With `in_background`, the documents are kept as dicts and diffed
+	in background jobs after commit instead, for large batches.
+
+	        with deferred_versions():
+	                for deal in deals:
+	                        deal.save()
+	"""
+	previous = frappe.flags.defer_versions
+	frappe.flags.defer_versions = "background" if in_background else "commit"
+	try:
+		yield
+	finally:
+		frappe.flags.defer_versions = previous
+
+
+def defer_version(old: Document | None, new: Document):
+	"""Queue the version of `new` for the current transaction, called by `Document.save_version`"""
+	if frappe.flags.defer_versions == "background":
+		if not old and not new.flags.updater_reference:
+			return
+
+		session_data = {}
+		Version.set_impersonator(session_data)
+		get_pending_versions().append(
+			{
+				"old": old.as_dict() if old else None,
+				"new": new.as_dict(),
+				"via_data_import": new.flags.via_data_import,
+				"updater_reference": new.flags.updater_reference,
+				"session_data": session_data,
+			}
+		)
+		return
+
+	version = frappe.new_doc("Version")
+	if version.update_version_info(old, new):
+		get_pending_versions().append(version)
+
+
+def get_pending_versions() -> list:
+	pending = getattr(frappe.local, "pending_versions", None)
+	if pending is None:
+		pending = frappe.local.pending_versions = []
+		frappe.db.before_commit.add(flush_versions)
+		frappe.db.after_rollback.add(clear_pending_versions)
+	return pending
+
+
+def clear_pending_versions():
+	frappe.local.pending_versions = None
+
+
+def flush_versions():
+	pending = frappe.local.pending_versions or []
+	clear_pending_versions()
+
+	insert_versions([v for v in pending if isinstance(v, Version)])
+
+	documents = [v for v in pending if not isinstance(v, Version)]
+	for i in range(0, len(documents), BACKGROUND_DIFF_CHUNK_SIZE):
+		frappe.enqueue(
+			"frappe.core.doctype.version.version.diff_and_insert_versions",
+			queue="long",
+			documents=documents[i : i + BACKGROUND_DIFF_CHUNK_SIZE],
+			enqueue_after_commit=True,
+		)
+
+
+def diff_and_insert_versions(documents: list[dict]):
+	versions = []
+	for d in documents:
+		new = frappe.get_doc(d["new"])
+		new.flags.via_data_import = d["via_data_import"]
+		new.flags.updater_reference = d["updater_reference"]
+
+		version = frappe.new_doc("Version")
+		if version.update_version_info(frappe.get_doc(d["old"]) if d["old"] else None, new):
+			if d["session_data"]:
+				version.data = frappe.as_json(
+					{**version.get_data(), **d["session_data"]}, indent=None, separators=(",", ":")
+				)
+			versions.append(version)
+
+	insert_versions(versions)
+
+
+def insert_versions(versions: list[Version]):
+	"""Insert `versions` with one query and follow the documents if the user follows their changes.
+
+	`after_insert` hooks, webhooks and notifications of Version still run for every version, with
+	`flags.in_bulk_insert` set. Apps can handle all versions at once with `after_insert_versions`
+	hooks, called with the list of inserted versions."""
+	if not versions:
+		return
+
+	now = now_datetime()
+	user = frappe.session.user
+	for version in versions:
+		version.update(
+			{
+				"name": make_autoname("hash", "Version"),
+				"creation": now,
+				"modified": now,
+				"owner": user,
+				"modified_by": user,
+			}
+		)
+
+	frappe.db.bulk_insert(
+		"Version",
+		fields=["name", "creation", "modified", "owner", "modified_by", "ref_doctype", "docname", "data"],
+		values=[
+			(v.name, v.creation, v.modified, v.owner, v.modified_by, v.ref_doctype, v.docname, v.data)
+			for v in versions
+		],
+	)
+
+	for version in versions:
+		version.flags.in_bulk_insert = True
+		version.run_method("after_insert")
+
+	for method in frappe.get_hooks("after_insert_versions"):
+		frappe.get_attr(method)(versions)
+
+	if not frappe.flags.in_migrate and frappe.get_cached_value("User", user, "follow_created_documents"):
+		for ref_doctype, docname in dict.fromkeys((v.ref_doctype, v.docname) for v in versions):
+			follow_document(ref_doctype, docname, user)
+
+
 def on_doctype_update():
 	frappe.db.add_index("Version", ["ref_doctype", "docname"])
@@ -1160,9 +1160,15 @@ class Database:
 
 		self.before_commit.run()
 
+		had_writes = self.transaction_writes
 		self.sql("commit")
 		self.begin()  # explicitly start a new transaction
 
+		if had_writes and frappe.conf.read_from_replica:
+			from frappe.database.replica import record_write
+
+			record_write()
+
 		self.after_commit.run()
 
 	def rollback(self, *, save_point=None):
@@ -0,0 +1,74 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# License: MIT. See LICENSE
+"""Guards for reading from the read replica (`read_from_replica` in site config).
+
+- Read your writes: after a session commits a write, its reads stay on the primary for
+  `replica_read_your_writes_window` seconds (default 10), the replica may not have the write yet.
+- Replica lag: reads fall back to the primary when the replica is more than `replica_max_lag`
+  seconds (default 10) behind or its lag can't be determined. Set it to 0 to skip the check.
+"""
+
+import frappe
+from frappe.utils import cint, flt
+
+DEFAULT_READ_YOUR_WRITES_WINDOW = 10
+DEFAULT_MAX_LAG = 10
+# seconds the measured replica lag is reused for
+LAG_CHECK_INTERVAL = 5
+REPLICA_LAG_KEY = "replica_lag"
+
+
+def can_read_from_replica() -> bool:
+	"""Return True if reads of the current session can be served by the replica"""
+	if frappe.db and frappe.db.transaction_writes:
+		# uncommitted writes are only visible on the primary
+		return False
+
+	if key := get_read_your_writes_key():
+		return not frappe.cache.get_value(key)
+
+	return True
+
+
+def record_write():
+	"""Keep reads of the current session on the primary for the read-your-writes window"""
+	window = cint(frappe.conf.get("replica_read_your_writes_window", DEFAULT_READ_YOUR_WRITES_WINDOW))
+	if window > 0 and (key := get_read_your_writes_key()):
+		frappe.cache.set_value(key, 1, expires_in_sec=window)
+
+
+def get_read_your_writes_key() -> str | None:
+	session = getattr(frappe.local, "session", None)
+	if sid := session and session.get("sid"):
+		return f"replica_read_your_writes::{sid}"
+
+
+def is_replica_lag_acceptable(replica_db) -> bool:
+	max_lag = flt(frappe.conf.get("replica_max_lag", DEFAULT_MAX_LAG))
+	if max_lag <= 0:
+		return True
+
+	lag = frappe.cache.get_value(REPLICA_LAG_KEY)
+	if lag is None:
+		lag = get_replica_lag(replica_db)
+		# an unknown lag is stored as -1 so it is not measured again on every request
+		if lag is None:
+			lag = -1
+		frappe.cache.set_value(REPLICA_LAG_KEY, lag, expires_in_sec=LAG_CHECK_INTERVAL)
+
+	return 0 <= lag <= max_lag
+
+
+def get_replica_lag(replica_db) -> float | None:
+	"""Seconds the replica is behind the primary, None if it isn't replicating or the lag can't be read"""
+	try:
+		if replica_db.db_type == "postgres":
+			lag = replica_db.sql("select extract(epoch from now() - pg_last_xact_replay_timestamp())")[0][0]
+		else:
+			status = replica_db.sql("show slave status", as_dict=True)
+			lag = status[0].get("Seconds_Behind_Master") if status else None
+	except Exception:
+		frappe.logger("database").warning("Could not read replica lag", exc_info=True)
+		return None
+
+	return None if lag is None else flt(lag)
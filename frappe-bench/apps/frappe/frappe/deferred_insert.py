@@ -1,4 +1,5 @@
 import json
+import time
 from typing import TYPE_CHECKING, Union
 
 import redis
@@ -11,6 +12,12 @@ if TYPE_CHECKING:
 
 queue_prefix = "insert_queue_for_"
 
+# queue entries popped at once, an entry holds one or more records
+BULK_CHUNK_SIZE = 500
+# records flushed per doctype in one run
+MAX_RECORDS = 500
+MAX_BULK_RECORDS = 50_000
+
 
 def deferred_insert(doctype: str, records: list[Union[dict, "Document"]] | str):
 	if isinstance(records, dict | list):
@@ -26,29 +33,128 @@ def deferred_insert(doctype: str, records: list[Union[dict, "Document"]] | str):
 
 
 def save_to_db():
+	"""Flush queued records to the database, returns flush stats per doctype.
+
+	Doctypes listed in the `bulk_deferred_insert_doctypes` hook are written with one multi-row
+	insert per chunk, without running controller methods or document hooks. Other doctypes, and
+	records a bulk insert fails for, are inserted one document at a time."""
+	bulk_doctypes = set(frappe.get_hooks("bulk_deferred_insert_doctypes"))
+	stats = {}
+
 	queue_keys = frappe.cache.get_keys(queue_prefix)
 	for key in queue_keys:
-		record_count = 0
 		queue_key = get_key_name(key)
 		doctype = get_doctype_name(key)
-		while frappe.cache.llen(queue_key) > 0 and record_count <= 500:
-			records = frappe.cache.lpop(queue_key)
-			records = json.loads(records.decode("utf-8"))
-			if isinstance(records, dict):
-				record_count += 1
-				insert_record(records, doctype)
-				continue
-			for record in records:
-				record_count += 1
-				insert_record(record, doctype)
-
-
-def insert_record(record: Union[dict, "Document"], doctype: str):
+		start = time.monotonic()
+
+		if doctype in bulk_doctypes:
+			inserted, failed = bulk_save_to_db(queue_key, doctype)
+		else:
+			inserted, failed = single_save_to_db(queue_key, doctype)
+
+		if not (inserted or failed):
+			continue
+
+		duration = time.monotonic() - start
+		stats[doctype] = {
+			"inserted": inserted,
+			"failed": failed,
+			"duration": round(duration, 3),
+			"records_per_second": round((inserted + failed) / duration, 1) if duration else None,
+			"pending": frappe.cache.llen(queue_key),
+		}
+		frappe.logger("deferred_insert").info({"doctype": doctype, **stats[doctype]})
+
+	return stats
+
+
+def single_save_to_db(queue_key: str, doctype: str) -> tuple[int, int]:
+	inserted = failed = 0
+	while frappe.cache.llen(queue_key) > 0 and inserted + failed <= MAX_RECORDS:
+		for record in parse_records(frappe.cache.lpop(queue_key)):
+			if insert_record(record, doctype):
+				inserted += 1
+			else:
+				failed += 1
+
+	return inserted, failed
+
+
+def bulk_save_to_db(queue_key: str, doctype: str) -> tuple[int, int]:
+	inserted = failed = 0
+	while inserted + failed < MAX_BULK_RECORDS and (entries := pop_entries(queue_key, BULK_CHUNK_SIZE)):
+		records = [record for entry in entries for record in parse_records(entry)]
+		chunk_inserted, chunk_failed = bulk_insert_records(records, doctype)
+		inserted += chunk_inserted
+		failed += chunk_failed
+		frappe.db.commit()
+
+	return inserted, failed
+
+
+def pop_entries(queue_key: str, count: int) -> list[bytes]:
+	"""Atomically remove and return up to `count` entries from the head of the queue"""
+	pipeline = frappe.cache.pipeline(transaction=True)
+	key = frappe.cache.make_key(queue_key)
+	pipeline.lrange(key, 0, count - 1)
+	pipeline.ltrim(key, count, -1)
+	entries, _trimmed = pipeline.execute()
+	return entries
+
+
+def parse_records(entry: bytes) -> list[dict]:
+	records = json.loads(entry.decode("utf-8"))
+	return [records] if isinstance(records, dict) else records
+
+
+def bulk_insert_records(records: list[dict], doctype: str) -> tuple[int, int]:
+	"""Insert `records` with one multi-row insert, falling back to `insert_record` if it fails"""
+	docs = []
+	failed = 0
+	for record in records:
+		try:
+			docs.append(make_bulk_doc(record, doctype))
+		except Exception as e:
+			frappe.logger().error(f"Error while preparing deferred {doctype} record: {e}")
+			failed += 1
+
+	if not docs:
+		return 0, failed
+
+	rows = [doc.get_valid_dict(convert_dates_to_str=True, ignore_virtual=True) for doc in docs]
+	fields = list(rows[0])
+
+	frappe.db.savepoint("deferred_insert")
+	try:
+		frappe.db.bulk_insert(doctype, fields, [[row.get(field) for field in fields] for row in rows])
+	except Exception:
+		frappe.db.rollback(save_point="deferred_insert")
+		inserted = sum(insert_record(record, doctype) for record in records)
+		return inserted, len(records) - inserted
+	else:
+		frappe.db.release_savepoint("deferred_insert")
+
+	return len(docs), failed
+
+
+def make_bulk_doc(record: dict, doctype: str) -> "Document":
+	record.update({"doctype": doctype})
+	doc = frappe.get_doc(record)
+	doc._set_defaults()
+	doc.set_new_name(set_child_names=False)
+	if not doc.creation:
+		doc.set_user_and_timestamp()
+	return doc
+
+
+def insert_record(record: Union[dict, "Document"], doctype: str) -> bool:
 	try:
 		record.update({"doctype": doctype})
 		frappe.get_doc(record).insert()
+		return True
 	except Exception as e:
 		frappe.logger().error(f"Error while inserting deferred {doctype} record: {e}")
+		return False
 
 
 def get_key_name(key: str) -> str:
@@ -391,6 +391,16 @@ def get_job_status(job_id: str | None = None):
 		frappe.clear_messages()
 
 
+@frappe.whitelist()
+def get_client_cache_statistics():
+	"""Client side cache statistics of the worker that serves this request, overall and per key namespace"""
+	frappe.only_for("System Manager")
+	return {
+		**frappe.client_cache.statistics._asdict(),
+		"namespaces": frappe.client_cache.namespace_statistics,
+	}
+
+
 @redis_cache(ttl=5 * 60)
 def get_directory_size(*path):
 	return _get_directory_size(*path)
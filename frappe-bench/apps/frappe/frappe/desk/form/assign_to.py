@@ -151,6 +151,258 @@ def add_multiple(args=None):
 		add(args)
 
 
+def add_bulk(
+	doctype: str,
+	assignments: dict[str, str | list[str]],
+	*,
+	description: str | None = None,
+	priority: str = "Medium",
+	date: str | None = None,
+	assignment_rule: str | None = None,
+	ignore_permissions: bool = False,
+) -> list[dict]:
+	"""Assign many documents of `doctype` at once, `assignments` maps document names to users.
+
+	Unlike `add`, the ToDos and their "Assigned" comments are inserted with one query each,
+	`_assign` of all documents is updated in one pass and the assignees are notified by one
+	background job. ToDo document events are not run, the inserted ToDos are returned for callers
+	to handle their side effects.
+	"""
+	from frappe.model.naming import make_autoname
+	from frappe.utils import get_fullname, now_datetime, nowdate
+
+	assignments = {
+		str(name): [users] if isinstance(users, str) else list(users) for name, users in assignments.items()
+	}
+	if not assignments:
+		return []
+
+	names = list(assignments)
+	if not ignore_permissions:
+		permitted = set(frappe.get_list(doctype, filters={"name": ("in", names)}, pluck="name"))
+		if denied := [name for name in names if name not in permitted]:
+			frappe.throw(
+				_("Not permitted to assign {0}: {1}").format(_(doctype), ", ".join(denied)),
+				frappe.PermissionError,
+			)
+
+	# open assignments in the order they were made, to skip duplicates and rebuild `_assign`
+	assigned = {name: [] for name in names}
+	for todo in frappe.get_all(
+		"ToDo",
+		filters={
+			"reference_type": doctype,
+			"reference_name": ("in", names),
+			"status": ("not in", ("Cancelled", "Closed")),
+			"allocated_to": ("is", "set"),
+		},
+		fields=["reference_name", "allocated_to"],
+		order_by="creation asc",
+		for_update=True,
+	):
+		assigned[todo.reference_name].append(todo.allocated_to)
+
+	if description and not (strip_html(description) or "<img" in description):
+		description = None
+
+	now = now_datetime()
+	assigned_by = frappe.session.user
+	assigned_by_full_name = frappe.get_cached_value("User", assigned_by, "full_name")
+	date = date or nowdate()
+
+	todos = []
+	for name, users in assignments.items():
+		for assign_to in dict.fromkeys(users):
+			if assign_to in assigned[name]:
+				continue
+
+			assigned[name].append(assign_to)
+			todos.append(
+				frappe._dict(
+					name=make_autoname("hash", "ToDo"),
+					allocated_to=assign_to,
+					reference_type=doctype,
+					reference_name=name,
+					description=description or _("Assignment for {0} {1}").format(doctype, name),
+					priority=priority,
+					status="Open",
+					date=date,
+					assigned_by=assigned_by,
+					assigned_by_full_name=assigned_by_full_name,
+					assignment_rule=assignment_rule,
+				)
+			)
+
+	if not todos:
+		return []
+
+	todo_fields = list(todos[0])
+	frappe.db.bulk_insert(
+		"ToDo",
+		fields=["creation", "modified", "owner", "modified_by", *todo_fields],
+		values=[
+			(now, now, assigned_by, assigned_by, *(todo[field] for field in todo_fields)) for todo in todos
+		],
+	)
+
+	comments = {}
+	for todo in todos:
+		if todo.allocated_to == assigned_by:
+			text = _("{0} self assigned this task: {1}").format(get_fullname(assigned_by), todo.description)
+		else:
+			text = _("{0} assigned {1}: {2}").format(
+				get_fullname(assigned_by), get_fullname(todo.allocated_to), todo.description
+			)
+		if text not in comments:
+			comments[text] = frappe.utils.sanitize_html(text, always_sanitize=True)
+		todo.comment = comments[text]
+
+	frappe.db.bulk_insert(
+		"Comment",
+		fields=[
+			"name",
+			"creation",
+			"modified",
+			"owner",
+			"modified_by",
+			"comment_type",
+			"comment_email",
+			"reference_doctype",
+			"reference_name",
+			"content",
+		],
+		values=[
+			(
+				make_autoname("hash", "Comment"),
+				now,
+				now,
+				assigned_by,
+				assigned_by,
+				"Assigned",
+				assigned_by,
+				doctype,
+				todo.reference_name,
+				todo.pop("comment"),
+			)
+			for todo in todos
+		],
+	)
+
+	assigned_names = list(dict.fromkeys(todo.reference_name for todo in todos))
+	frappe.db.bulk_update(
+		doctype,
+		{name: {"_assign": json.dumps(assigned[name])} for name in assigned_names},
+		update_modified=False,
+	)
+	# set assigned_to if field exists
+	if frappe.get_meta(doctype).get_field("assigned_to"):
+		frappe.db.bulk_update(
+			doctype,
+			{todo.reference_name: {"assigned_to": todo.allocated_to} for todo in todos},
+			update_modified=False,
+		)
+	# bulk_update doesn't clear the document cache like set_value does
+	for name in assigned_names:
+		frappe.clear_document_cache(doctype, name)
+
+	share_with_assignees(doctype, todos)
+
+	for assign_to in {todo.allocated_to for todo in todos}:
+		# make these documents followed by assigned user
+		if frappe.get_cached_value("User", assign_to, "follow_assigned_documents"):
+			for todo in todos:
+				if todo.allocated_to == assign_to:
+					follow_document(doctype, todo.reference_name, assign_to)
+
+	frappe.enqueue(
+		"frappe.desk.form.assign_to.notify_assignments",
+		assigned_by=assigned_by,
+		doctype=doctype,
+		assignments=[(todo.reference_name, todo.allocated_to) for todo in todos],
+		description=description,
+		now=frappe.flags.in_test,
+		enqueue_after_commit=not frappe.flags.in_test,
+	)
+
+	return todos
+
+
+def share_with_assignees(doctype, todos):
+	"""Share the documents with assignees who can't read them"""
+	names_by_user = {}
+	for todo in todos:
+		names_by_user.setdefault(todo.allocated_to, []).append(todo.reference_name)
+
+	for assign_to, names in names_by_user.items():
+		permitted = set(
+			frappe.get_list(doctype, filters={"name": ("in", names)}, pluck="name", user=assign_to)
+		)
+		not_permitted = [name for name in names if name not in permitted]
+		if not not_permitted:
+			continue
+
+		if frappe.get_system_settings("disable_document_sharing"):
+			msg = _("User {0} is not permitted to access this document.").format(frappe.bold(assign_to))
+			msg += "<br>" + _(
+				"As document sharing is disabled, please give them the required permissions before assigning."
+			)
+			frappe.throw(msg, title=_("Missing Permission"))
+
+		for name in not_permitted:
+			frappe.share.add(doctype, name, assign_to)
+
+
+def notify_assignments(assigned_by, doctype, assignments, description=None):
+	"""Notify assignees of documents assigned by `add_bulk`, `assignments` is a list of (name, user)"""
+	from frappe.desk.doctype.notification_log.notification_log import make_notification_logs
+
+	users = {
+		user.name: user
+		for user in frappe.get_all(
+			"User",
+			filters={"name": ("in", list({user for __, user in assignments})), "enabled": 1},
+			fields=["name", "language"],
+		)
+	}
+
+	title_field = frappe.get_meta(doctype).get_title_field()
+	titles = {}
+	if title_field != "name":
+		titles = dict(
+			frappe.get_all(
+				doctype,
+				filters={"name": ("in", list({name for name, __ in assignments}))},
+				fields=["name", title_field],
+				as_list=True,
+			)
+		)
+
+	user_name = frappe.bold(frappe.get_cached_value("User", frappe.session.user, "full_name"))
+	description_html = f"<div>{description}</div>" if description else None
+	for name, allocated_to in assignments:
+		# skip if self assigned or user disabled
+		if assigned_by == allocated_to or allocated_to not in users:
+			continue
+
+		language = users[allocated_to].language
+		subject = _("{0} assigned a new task {1} {2} to you", lang=language).format(
+			user_name,
+			frappe.bold(_(doctype, lang=language)),
+			get_title_html(titles.get(name, name)),
+		)
+		make_notification_logs(
+			frappe._dict(
+				type="Assignment",
+				document_type=doctype,
+				subject=subject,
+				document_name=name,
+				from_user=frappe.session.user,
+				email_content=description_html,
+			),
+			[allocated_to],
+		)
+
+
 def close_all_assignments(doctype, name, ignore_permissions=False):
 	assignments = frappe.get_all(
 		"ToDo",
@@ -11,6 +11,8 @@ from frappe.utils.verified_command import get_signed_params, verify_request
 # This usually indicates a systemic failure so we shouldn't keep trying to send emails.
 EMAIL_QUEUE_BATCH_FAILURE_THRESHOLD_PERCENT = 0.33
 EMAIL_QUEUE_BATCH_FAILURE_THRESHOLD_COUNT = 10
+# Queued emails per worker needed to start another parallel flush job.
+EMAIL_QUEUE_WORKER_MIN_BATCH = 50
 
 
 def get_emails_sent_this_month(email_account=None):
@@ -125,9 +127,14 @@ def return_unsubscribed_page(email, doctype, name):
 	)
 
 
-def flush():
+def flush(worker: int = 0, workers: int = 1):
 	"""flush email queue, every time: called from scheduler.
 
+	Queue rows are sent account by account, reusing one SMTP connection per email account.
+	Every row is claimed with `SELECT ... FOR UPDATE SKIP LOCKED` before it is sent, so
+	`email_queue_workers` (site config) jobs can drain the queue in parallel, each worker starts
+	at a different offset of the batch.
+
 	This should not be called outside of background jobs.
 	"""
 	from frappe.email.doctype.email_queue.email_queue import EmailQueue
@@ -143,11 +150,23 @@ def flush():
 	if not email_queue_batch:
 		return
 
+	if not worker:
+		workers = enqueue_parallel_flush(len(email_queue_batch))
+
+	email_queue_batch = group_by_email_account(email_queue_batch)
+	offset = worker * len(email_queue_batch) // workers
+	email_queue_batch = email_queue_batch[offset:] + email_queue_batch[:offset]
+
+	connections = OutgoingConnections()
 	failed_email_queues = []
 	for row in email_queue_batch:
+		if not claim_email_queue(row.name):
+			# being sent by another worker
+			continue
+
 		try:
 			email_queue: EmailQueue = frappe.get_doc("Email Queue", row.name)
-			email_queue.send()
+			email_queue.send(**connections.get(email_queue))
 		except Exception:
 			frappe.get_doc("Email Queue", row.name).log_error()
 			failed_email_queues.append(row.name)
@@ -159,13 +178,86 @@ def flush():
 			):
 				frappe.throw(_("Email Queue flushing aborted due to too many failures."))
 
+		# release the row lock of emails which were not sent
+		frappe.db.commit()
+
+
+def enqueue_parallel_flush(queued: int) -> int:
+	"""Start up to `email_queue_workers` - 1 more flush jobs if the queue holds enough emails for them.
+
+	Returns the number of workers including the current one."""
+	workers = min(cint(frappe.conf.email_queue_workers) or 1, -(-queued // EMAIL_QUEUE_WORKER_MIN_BATCH))
+	for i in range(1, workers):
+		frappe.enqueue(
+			flush,
+			queue="short",
+			worker=i,
+			workers=workers,
+			job_id=f"{frappe.local.site}::email_queue_flush::{i}",
+			deduplicate=True,
+			enqueue_after_commit=True,
+		)
+	return max(workers, 1)
+
+
+def group_by_email_account(email_queue_batch):
+	"""Order the batch by email account, keeping the priority order within and across accounts"""
+	groups = {}
+	for row in email_queue_batch:
+		groups.setdefault(row.email_account or row.sender, []).append(row)
+
+	return [row for rows in groups.values() for row in rows]
+
+
+def claim_email_queue(name) -> bool:
+	"""Lock the queue row if it is still to be sent and not locked by another worker"""
+	return bool(
+		frappe.db.get_value(
+			"Email Queue",
+			{"name": name, "status": ("in", ["Not Sent", "Partially Sent"])},
+			"name",
+			for_update=True,
+			skip_locked=True,
+		)
+	)
+
+
+class OutgoingConnections:
+	"""Outgoing SMTP servers and Frappe Mail clients of this flush, one per email account.
+
+	SMTPServer revives a dropped session and is closed after the job, so the same connection is
+	used for every email sent from the account."""
+
+	def __init__(self):
+		self.smtp_servers = {}
+		self.frappe_mail_clients = {}
+
+	def get(self, email_queue) -> dict:
+		"""Returns `EmailQueue.send` kwargs for the account of `email_queue`"""
+		try:
+			email_account = email_queue.get_email_account()
+			if not email_account:
+				return {}
+
+			if email_account.service == "Frappe Mail":
+				if email_account.name not in self.frappe_mail_clients:
+					self.frappe_mail_clients[email_account.name] = email_account.get_frappe_mail_client()
+				return {"frappe_mail_client": self.frappe_mail_clients[email_account.name]}
+
+			if email_account.name not in self.smtp_servers:
+				self.smtp_servers[email_account.name] = email_account.get_smtp_server()
+			return {"smtp_server_instance": self.smtp_servers[email_account.name]}
+		except Exception:
+			# let `send` fail and record the error on the queue row
+			return {}
+
 
 def get_queue():
 	batch_size = cint(frappe.conf.email_queue_batch_size) or 500
 
 	return frappe.db.sql(
 		f"""select
-			name, sender
+			name, sender, email_account
 		from
 			`tabEmail Queue`
 		where
@@ -425,10 +425,12 @@ ignore_links_on_delete = [
 before_request = [
 	"frappe.recorder.record",
 	"frappe.monitor.start",
+	"frappe.query_profiler.start",
 	"frappe.rate_limiter.apply",
 ]
 
 after_request = [
+	"frappe.query_profiler.stop",
 	"frappe.monitor.stop",
 ]
 
@@ -436,6 +438,7 @@ after_request = [
 before_job = [
 	"frappe.recorder.record",
 	"frappe.monitor.start",
+	"frappe.query_profiler.start",
 ]
 
 if os.getenv("FRAPPE_SENTRY_DSN") and (
@@ -447,6 +450,7 @@ if os.getenv("FRAPPE_SENTRY_DSN") and (
 	before_job.append("frappe.utils.sentry.set_sentry_context")
 
 after_job = [
+	"frappe.query_profiler.stop",
 	"frappe.recorder.dump",
 	"frappe.monitor.stop",
 	"frappe.utils.file_lock.release_document_locks",
@@ -566,6 +570,15 @@ default_log_clearing_doctypes = {
 	"OAuth Bearer Token": 30,
 }
 
+# Log doctypes flushed from frappe.deferred_insert with multi-row inserts.
+# Only list doctypes whose controller and doc_events don't hook into insert, they are skipped.
+bulk_deferred_insert_doctypes = [
+	"Access Log",
+	"Route History",
+	"View Log",
+	"Web Page View",
+]
+
 # These keys will not be erased when doing frappe.clear_cache()
 persistent_cache_keys = [
 	"changelog-*",  # version update notifications
@@ -573,6 +586,7 @@ persistent_cache_keys = [
 	"recorder-*",  # Recorder
 	"global_search_queue",
 	"monitor-transactions",
+	"query-profiler*",  # Query Profiler
 	"rate-limit-counter-*",
 	"rl:*",
 ]
@@ -47,6 +47,8 @@ STRICT_FIELD_PATTERN = re.compile(r".*/\*.*")
 STRICT_UNION_PATTERN = re.compile(r".*\s(union).*\s")
 ORDER_GROUP_PATTERN = re.compile(r".*[^a-z0-9-_ ,`'\"\.\(\)].*")
 SPECIAL_FIELD_CHARS = frozenset(("(", "`", ".", "'", '"', "*"))
+# query plans kept per doctype, see `DatabaseQuery.load_query_plan`
+MAX_QUERY_PLANS = 128
 # XXX: These are just matching brackets to not confuse code formatters: ))
 
 
@@ -65,7 +67,7 @@ class DatabaseQuery:
 		self.flags = frappe._dict()
 		self.reference_doctype = None
 		self.permission_map = {}
-		self.shared = []
+		self.shared = False
 		self._fetch_shared_documents = False
 		self._metas = {}
 
@@ -257,9 +259,7 @@ from {tables}
 		)
 
 	def prepare_args(self):
-		self.parse_args()
-		self.sanitize_fields()
-		self.extract_tables()
+		self.load_query_plan()
 		self.set_optional_columns()
 		self.build_conditions()
 		self.apply_fieldlevel_read_permissions()
@@ -342,6 +342,50 @@ from {tables}
 
 		return args
 
+	def load_query_plan(self):
+		"""Parse, sanitize and extract tables from the fields, reusing the result for repeated field lists.
+
+		The plan only depends on the requested fields and the doctype's meta, it is kept on the
+		meta object so it is dropped along with it. Filters and permission conditions are still
+		built for every query, read permission on the joined tables is checked again on reuse."""
+		try:
+			key = (self.fields if isinstance(self.fields, str) else tuple(self.fields), self.strict)
+			plans = self.doctype_meta._query_plans
+			plan = plans.get(key)
+		except TypeError:
+			# unhashable fields
+			key = plan = None
+
+		if plan:
+			self.fields = list(plan.fields)
+			self.tables = list(plan.tables)
+			self.link_tables = list(plan.link_tables)
+			self.linked_table_aliases = plan.linked_table_aliases.copy()
+			self.linked_table_counter = plan.linked_table_counter.copy()
+			for doctype in plan.permission_doctypes:
+				self.check_read_permission(doctype)
+			return
+
+		self.parse_args()
+		self.sanitize_fields()
+		self.extract_tables()
+
+		if key is None:
+			return
+
+		if len(plans) >= MAX_QUERY_PLANS:
+			plans.pop(next(iter(plans)), None)
+		plans[key] = frappe._dict(
+			fields=tuple(self.fields),
+			tables=tuple(self.tables),
+			link_tables=tuple(self.link_tables),
+			linked_table_aliases=self.linked_table_aliases.copy(),
+			linked_table_counter=self.linked_table_counter.copy(),
+			permission_doctypes=tuple(
+				[link.doctype for link in self.link_tables] + [table[4:-1] for table in self.tables[1:]]
+			),
+		)
+
 	def parse_args(self):
 		"""Convert fields and filters from strings to list, dicts."""
 		if isinstance(self.fields, str):
@@ -944,7 +988,7 @@ from {tables}
 			and not has_any_user_permission_for_doctype(self.doctype, self.user, self.reference_doctype)
 		):
 			only_if_shared = True
-			self.shared = frappe.share.get_shared(self.doctype, self.user)
+			self.shared = bool(frappe.share.get_shared(self.doctype, self.user, limit=1))
 			if not self.shared:
 				frappe.throw(_("No permission to read {0}").format(_(self.doctype)), frappe.PermissionError)
 			else:
@@ -970,7 +1014,7 @@ from {tables}
 			#    1. DocType has if_owner constraint and hence can't see shared documents
 			#    2. DocType has user permissions and hence can't see shared documents
 			if self._fetch_shared_documents:
-				self.shared = frappe.share.get_shared(self.doctype, self.user)
+				self.shared = bool(frappe.share.get_shared(self.doctype, self.user, limit=1))
 
 		if as_condition:
 			conditions = ""
@@ -992,9 +1036,16 @@ from {tables}
 			return self.match_filters
 
 	def get_share_condition(self):
+		"""Semi-join on DocShare, the condition stays the same size however many documents are shared"""
+		users = f"`docshare`.`user` = {frappe.db.escape(self.user, percent=False)}"
+		if self.user != "Guest":
+			users += " or `docshare`.`everyone` = 1"
+
 		return (
-			cast_name(f"`tab{self.doctype}`.name")
-			+ f" in ({', '.join(frappe.db.escape(s, percent=False) for s in self.shared)})"
+			"exists (select 1 from `tabDocShare` `docshare`"
+			f" where `docshare`.`share_doctype` = {frappe.db.escape(self.doctype, percent=False)}"
+			f" and `docshare`.`share_name` = {cast_name(f'`tab{self.doctype}`.name')}"
+			f" and `docshare`.`read` = 1 and ({users}))"
 		)
 
 	def add_user_permissions(self, user_permissions):
@@ -142,6 +142,73 @@ def get_doc_from_dict(data: dict[str, Any], **kwargs) -> "Document":
 	raise ImportError(data["doctype"])
 
 
+def get_docs(doctype: str, names: Iterable[str], *, chunk_size: int = 1000) -> list["Document"]:
+	"""Load documents of `doctype` with all their child rows, in the order of `names`.
+
+	Parents are read with one `IN` query per `chunk_size` names and each child table with one
+	query for all of them, so loading N documents with K child tables costs K + 1 queries
+	instead of N * (K + 1). Raises `DoesNotExistError` if any of the documents does not exist.
+
+	Singles, virtual doctypes and controllers loading themselves differently fall back to `get_doc`.
+
+	        deals = frappe.get_docs("CRM Deal", deal_names)
+	"""
+	names = list(dict.fromkeys(names))
+	controller = get_controller(doctype)
+	meta = frappe.get_meta(doctype)
+
+	if (
+		meta.issingle
+		or meta.is_virtual
+		or doctype == "DocType"
+		or controller.load_from_db is not Document.load_from_db
+		or controller.load_children_from_db is not Document.load_children_from_db
+	):
+		return [get_doc(doctype, name) for name in names]
+
+	docs = {}
+	for i in range(0, len(names), chunk_size):
+		chunk = names[i : i + chunk_size]
+		for row in frappe.db.sql(
+			f"SELECT * FROM {get_table_name(doctype, wrap_in_backticks=True)} WHERE `name` IN %(names)s",
+			{"names": chunk},
+			as_dict=True,
+		):
+			row.doctype = doctype
+			docs[str(row.name)] = row
+
+	for name in names:
+		if str(name) not in docs:
+			frappe.throw(
+				_("{0} {1} not found").format(_(doctype), name), frappe.DoesNotExistError(doctype=doctype)
+			)
+
+	for df in meta.get_table_fields():
+		for doc in docs.values():
+			doc[df.fieldname] = []
+
+		if is_virtual_doctype(df.options):
+			continue
+
+		for i in range(0, len(names), chunk_size):
+			for child in frappe.db.sql(
+				f"""SELECT * FROM {get_table_name(df.options, wrap_in_backticks=True)}
+				WHERE `parent` IN %(parents)s
+					AND `parenttype` = %(parenttype)s
+					AND `parentfield` = %(parentfield)s
+				ORDER BY `parent`, `idx` ASC""",
+				{
+					"parents": [str(name) for name in names[i : i + chunk_size]],
+					"parenttype": doctype,
+					"parentfield": df.fieldname,
+				},
+				as_dict=True,
+			):
+				docs[child.parent][df.fieldname].append(child)
+
+	return [controller(docs[str(name)]) for name in names]
+
+
 class Document(BaseDocument, DocRef):
 	"""All controllers inherit from `Document`."""
 
@@ -261,6 +328,10 @@ class Document(BaseDocument, DocRef):
 				)
 
 			super().__init__(d)
+			if not is_doctype and self.doctype in frappe.get_hooks("snapshot_before_save_doctypes"):
+				# rows as read from the db, reused as the document before save instead of a reload
+				d["doctype"] = self.doctype
+				self._db_snapshot = d
 		self.flags.pop("ignore_children", None)
 
 		self.load_children_from_db()
@@ -312,6 +383,9 @@ class Document(BaseDocument, DocRef):
 			if children is None:
 				children = []
 
+			if snapshot := self.__dict__.get("_db_snapshot"):
+				snapshot[fieldname] = children
+
 			self.set(fieldname, children)
 
 		return self
@@ -532,7 +606,7 @@ class Document(BaseDocument, DocRef):
 		else:
 			self.db_update()
 
-		self.update_children()
+		self.update_children(previous=self._doc_before_save)
 		self.run_post_save_methods()
 
 		# clear unsaved flag
@@ -568,19 +642,27 @@ class Document(BaseDocument, DocRef):
 			)
 			_file.save()
 
-	def update_children(self):
-		"""update child tables"""
+	def update_children(self, previous: "Document | None" = None):
+		"""update child tables
+
+		:param previous: Copy of the document as it is in the database, only new or changed rows are written if set"""
 		if getattr(self.meta, "is_virtual", False):
 			# Virtual doctypes manage their own children
 			return
 
 		for df in self.meta.get_table_fields():
-			self.update_child_table(df.fieldname, df)
+			self.update_child_table(df.fieldname, df, previous=previous)
 
-	def update_child_table(self, fieldname: str, df: Optional["DocField"] = None):
-		"""sync child table for given fieldname"""
+	def update_child_table(
+		self, fieldname: str, df: Optional["DocField"] = None, previous: "Document | None" = None
+	):
+		"""sync child table for given fieldname
+
+		If `previous` (the document as it is in the database) is passed, rows removed from the table
+		are deleted by name and rows identical to their previous version are not written."""
 		df: DocField = df or self.meta.get_field(fieldname)
 		all_rows = self.get(df.fieldname)
+		previous_rows = {row.name: row for row in previous.get(df.fieldname)} if previous else None
 
 		# delete rows that do not match the ones in the document
 		# if the doctype isn't in ignore_children_type flag and isn't virtual
@@ -599,14 +681,20 @@ class Document(BaseDocument, DocRef):
 				.delete()
 			)
 
-			if existing_row_names:
-				qry = qry.where(tbl.name.notin(existing_row_names))
+			if previous_rows is not None:
+				if removed_row_names := set(previous_rows).difference(existing_row_names):
+					qry.where(tbl.name.isin(list(removed_row_names))).run()
+			else:
+				if existing_row_names:
+					qry = qry.where(tbl.name.notin(existing_row_names))
 
-			qry.run()
+				qry.run()
 
 		# update / insert
 		for d in all_rows:
 			d: Document
+			if previous_rows is not None and not _child_row_changed(d, previous_rows.get(d.name)):
+				continue
 			d.db_update()
 
 	def get_doc_before_save(self) -> "Self":
@@ -1289,10 +1377,15 @@ class Document(BaseDocument, DocRef):
 		"""load existing document from db before saving"""
 
 		self._doc_before_save = None
+		snapshot = self.__dict__.pop("_db_snapshot", None)
 
 		if self.is_new():
 			return
 
+		if snapshot and self._is_snapshot_latest(snapshot):
+			self._doc_before_save = get_doc(snapshot)
+			return
+
 		try:
 			self._doc_before_save = frappe.get_doc(self.doctype, self.name, for_update=True)
 		except frappe.DoesNotExistError:
@@ -1301,6 +1394,24 @@ class Document(BaseDocument, DocRef):
 
 			frappe.clear_last_message()
 
+	def _is_snapshot_latest(self, snapshot: dict) -> bool:
+		"""Lock the row and check that it wasn't modified since `snapshot` was read.
+
+		Child rows are only compared through the parent's `modified`, so child rows updated
+		without saving the parent are not detected."""
+		if cstr(snapshot.get("name")) != cstr(self.name):
+			return False
+
+		for_update = "FOR UPDATE" if frappe.db.db_type != "sqlite" else ""
+		modified = frappe.db.sql(
+			"SELECT `modified` FROM {table_name} WHERE `name` = %s {for_update}".format(
+				table_name=get_table_name(self.doctype, wrap_in_backticks=True),
+				for_update=for_update,
+			),
+			(self.name,),
+		)
+		return bool(modified) and cstr(modified[0][0]) == cstr(snapshot.get("modified"))
+
 	def run_post_save_methods(self):
 		"""Run standard methods after `INSERT` or `UPDATE`. Standard Methods are:
 
@@ -1455,6 +1566,12 @@ class Document(BaseDocument, DocRef):
 		if not doc_to_compare and (amended_from := self.get("amended_from")):
 			doc_to_compare = frappe.get_doc(self.doctype, amended_from)
 
+		if frappe.flags.defer_versions:
+			from frappe.core.doctype.version.version import defer_version
+
+			defer_version(doc_to_compare, self)
+			return
+
 		version = frappe.new_doc("Version")
 		if version.update_version_info(doc_to_compare, self):
 			version.insert(ignore_permissions=True)
@@ -1920,6 +2037,22 @@ def _document_values_generator(
 		yield tuple(doc_values.get(col) for col in columns)
 
 
+def _child_row_changed(row: "Document", previous_row: "Document | None") -> bool:
+	"""Return True if `row` has to be written, i.e. it is new or differs from `previous_row`.
+
+	`modified` and `modified_by` are ignored, `set_user_and_timestamp` stamps them on every row."""
+	if previous_row is None or row.is_new():
+		return True
+
+	current = row.get_valid_dict(convert_dates_to_str=True, ignore_virtual=True)
+	before = previous_row.get_valid_dict(convert_dates_to_str=True, ignore_virtual=True)
+	return any(
+		current[fieldname] != before.get(fieldname)
+		for fieldname in current
+		if fieldname not in ("modified", "modified_by")
+	)
+
+
 @frappe.whitelist()
 def unlock_document(doctype: str, name: str):
 	frappe.get_doc(doctype, name).unlock()
@@ -649,6 +649,11 @@ class Meta(Document):
 	def high_permlevel_fields(self):
 		return [df for df in self.fields if df.permlevel > 0]
 
+	@cached_property
+	def _query_plans(self) -> dict:
+		"""Query plans of `DatabaseQuery` for this doctype, by fields"""
+		return {}
+
 	def get_permitted_fieldnames(
 		self,
 		parenttype=None,
@@ -0,0 +1,258 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# License: MIT. See LICENSE
+"""Sampling query profiler that is cheap enough to keep enabled in production.
+
+A fraction (`query_profiler_sample_rate` in site config, 0 to 1) of requests and background jobs
+is profiled. For each profiled transaction, the number of queries, time spent in the database and
+queries repeated with the same shape (N+1 queries) are aggregated per method into histograms
+in Redis. Unlike `frappe.recorder`, no query text, stack or EXPLAIN is kept per transaction.
+
+Report with `bench --site [site] query-profile` or `frappe.query_profiler.get_report`.
+"""
+
+import random
+import re
+import time
+from bisect import bisect_left
+from collections import Counter
+
+import frappe
+from frappe.utils import cint, flt
+
+METHODS_KEY = "query-profiler-methods"
+METHOD_KEY_PREFIX = "query-profiler::"
+REPEATS_KEY_PREFIX = "query-profiler-repeats::"
+PROFILE_TTL = 7 * 24 * 60 * 60
+
+# histogram bucket upper bounds, values above the last bound are counted in the last bucket
+DURATION_BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+# a query shape run at least this many times in one transaction is reported as N+1
+REPEAT_THRESHOLD = 10
+MAX_SHAPE_LENGTH = 500
+
+STRING_LITERAL_PATTERN = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"")
+PLACEHOLDER_PATTERN = re.compile(r"%\(\w+\)s|%s|\b\d+(?:\.\d+)?\b")
+IN_LIST_PATTERN = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def start(*args, **kwargs):
+	"""before_request / before_job hook, profile this transaction if it is sampled"""
+	sample_rate = flt(frappe.conf.get("query_profiler_sample_rate"))
+	if sample_rate <= 0 or random.random() >= sample_rate:
+		return
+
+	if method := get_method():
+		frappe.local._query_profile = QueryProfile(method)
+
+
+def stop(*args, **kwargs):
+	"""after_request / after_job hook"""
+	if profile := getattr(frappe.local, "_query_profile", None):
+		del frappe.local._query_profile
+		profile.stop()
+
+
+def get_method() -> str | None:
+	if getattr(frappe.local, "request", None):
+		return frappe.local.form_dict.cmd or get_api_route(frappe.request.method, frappe.request.path)
+	if job := getattr(frappe.local, "job", None):
+		return job.method
+
+
+def get_api_route(http_method: str, path: str) -> str | None:
+	"""Whitelisted method of `/api/method/<method>` paths, route pattern of other API paths.
+
+	Document names are never part of the returned value so the number of profiled methods stays
+	bounded, paths outside the API (pages, files) aren't profiled."""
+	parts = path.strip("/").split("/")[1:] if path.startswith("/api/") else []
+	version = ""
+	if parts and parts[0] in ("v1", "v2"):
+		version = f"/{parts[0]}"
+		parts = parts[1:]
+	if len(parts) < 2:
+		return None
+
+	kind, args = parts[0], parts[1:]
+	if kind == "method":
+		if version == "/v2" and len(args) == 2:
+			# controller method of a document
+			return f"/api/v2/method/{{doctype}}/{args[1]}"
+		return args[0]
+
+	if kind in ("resource", "document"):
+		pattern = f"/api{version}/{kind}/{{doctype}}" + ("/{name}" if len(args) > 1 else "")
+	elif kind == "doctype" and len(args) == 2 and args[1] in ("meta", "count"):
+		pattern = f"/api{version}/doctype/{{doctype}}/{args[1]}"
+	else:
+		return None
+	return f"{http_method} {pattern}"
+
+
+def get_query_shape(query: str) -> str:
+	"""Replace literals and placeholders with `?` so queries differing only in values compare equal"""
+	query = STRING_LITERAL_PATTERN.sub("?", query)
+	query = PLACEHOLDER_PATTERN.sub("?", query)
+	query = IN_LIST_PATTERN.sub("(?)", query)
+	return WHITESPACE_PATTERN.sub(" ", query).strip()[:MAX_SHAPE_LENGTH]
+
+
+class QueryProfile:
+	__slots__ = ("db", "db_time", "method", "original_sql", "queries", "start_time")
+
+	def __init__(self, method: str):
+		self.method = method
+		self.start_time = time.monotonic()
+		self.queries = Counter()
+		self.db_time = 0.0
+		self.db = None
+		self.original_sql = None
+		self.patch_sql()
+
+	def patch_sql(self):
+		if not frappe.db:
+			return
+
+		self.db = frappe.db
+		self.original_sql = original_sql = self.db.sql
+
+		def sql(query, *args, **kwargs):
+			if kwargs.get("run") is False:
+				return original_sql(query, *args, **kwargs)
+
+			start = time.monotonic()
+			try:
+				return original_sql(query, *args, **kwargs)
+			finally:
+				self.db_time += time.monotonic() - start
+				self.queries[query if isinstance(query, str) else str(query)] += 1
+
+		self.db.sql = sql
+
+	def unpatch_sql(self):
+		if self.db:
+			self.db.sql = self.original_sql
+			self.db = None
+
+	def stop(self):
+		self.unpatch_sql()
+		duration = (time.monotonic() - self.start_time) * 1000
+
+		shapes = Counter()
+		for query, count in self.queries.items():
+			shapes[get_query_shape(query)] += count
+		repeated = {shape: count for shape, count in shapes.items() if count >= REPEAT_THRESHOLD}
+
+		try:
+			store(self.method, duration, self.db_time * 1000, sum(shapes.values()), repeated)
+		except Exception:
+			frappe.logger("query_profiler").warning("Failed to store query profile", exc_info=True)
+
+
+def store(method: str, duration: float, db_time: float, queries: int, repeated: dict[str, int]):
+	method_key = frappe.cache.make_key(f"{METHOD_KEY_PREFIX}{method}")
+	repeats_key = frappe.cache.make_key(f"{REPEATS_KEY_PREFIX}{method}")
+	methods_key = frappe.cache.make_key(METHODS_KEY)
+
+	pipeline = frappe.cache.pipeline(transaction=False)
+	pipeline.zincrby(methods_key, duration, method)
+	pipeline.hincrby(method_key, "requests", 1)
+	pipeline.hincrbyfloat(method_key, "duration", duration)
+	pipeline.hincrbyfloat(method_key, "db_time", db_time)
+	pipeline.hincrby(method_key, "queries", queries)
+	pipeline.hincrby(method_key, f"duration:{get_bucket(DURATION_BUCKETS, duration)}", 1)
+	pipeline.hincrby(method_key, f"queries:{get_bucket(QUERY_BUCKETS, queries)}", 1)
+	for shape, count in repeated.items():
+		pipeline.hincrby(repeats_key, f"requests:{shape}", 1)
+		pipeline.hincrby(repeats_key, f"queries:{shape}", count)
+	for key in (methods_key, method_key, repeats_key):
+		pipeline.expire(key, PROFILE_TTL)
+	pipeline.execute()
+
+
+def get_bucket(buckets: tuple, value: float) -> int:
+	return buckets[min(bisect_left(buckets, value), len(buckets) - 1)]
+
+
+def get_percentile(buckets: tuple, counts: dict[int, int], percentile: float) -> int | None:
+	"""Upper bound of the histogram bucket the `percentile` falls in"""
+	total = sum(counts.values())
+	if not total:
+		return None
+
+	cumulative = 0
+	for bucket in buckets:
+		cumulative += counts.get(bucket, 0)
+		if cumulative >= total * percentile / 100:
+			return bucket
+	return buckets[-1]
+
+
+def get_method_stats(method: str, data: dict, repeats: dict) -> dict:
+	requests = cint(data.get("requests"))
+	durations = {
+		int(field.split(":")[1]): cint(v) for field, v in data.items() if field.startswith("duration:")
+	}
+	queries = {int(field.split(":")[1]): cint(v) for field, v in data.items() if field.startswith("queries:")}
+
+	n_plus_one = [
+		{
+			"query": field.split(":", 1)[1],
+			"requests": cint(count),
+			"avg_repeats": round(cint(repeats.get(f"queries:{field.split(':', 1)[1]}")) / cint(count), 1),
+		}
+		for field, count in repeats.items()
+		if field.startswith("requests:")
+	]
+	n_plus_one.sort(key=lambda d: d["requests"] * d["avg_repeats"], reverse=True)
+
+	return {
+		"method": method,
+		"requests": requests,
+		"avg_duration": round(flt(data.get("duration")) / requests, 1) if requests else None,
+		"avg_queries": round(cint(data.get("queries")) / requests, 1) if requests else None,
+		"db_time_share": round(flt(data.get("db_time")) / flt(data.get("duration")), 2)
+		if flt(data.get("duration"))
+		else None,
+		**{f"p{p}_duration": get_percentile(DURATION_BUCKETS, durations, p) for p in (50, 95, 99)},
+		**{f"p{p}_queries": get_percentile(QUERY_BUCKETS, queries, p) for p in (50, 95, 99)},
+		"n_plus_one": n_plus_one,
+	}
+
+
+@frappe.whitelist()
+def get_report(limit: int = 20) -> list[dict]:
+	"""Methods with the most total time of the sampled transactions, slowest first"""
+	frappe.only_for("System Manager")
+
+	methods = frappe.cache.zrevrange(frappe.cache.make_key(METHODS_KEY), 0, cint(limit) - 1)
+	if not methods:
+		return []
+	methods = [frappe.safe_decode(method) for method in methods]
+
+	pipeline = frappe.cache.pipeline(transaction=False)
+	for method in methods:
+		pipeline.hgetall(frappe.cache.make_key(f"{METHOD_KEY_PREFIX}{method}"))
+		pipeline.hgetall(frappe.cache.make_key(f"{REPEATS_KEY_PREFIX}{method}"))
+	results = pipeline.execute()
+
+	report = []
+	for i, method in enumerate(methods):
+		data, repeats = (_decode_hash(results[2 * i]), _decode_hash(results[2 * i + 1]))
+		if data:
+			report.append(get_method_stats(method, data, repeats))
+	return report
+
+
+@frappe.whitelist()
+def reset():
+	frappe.only_for("System Manager")
+	frappe.cache.delete_value(METHODS_KEY)
+	frappe.cache.delete_keys(METHOD_KEY_PREFIX)
+	frappe.cache.delete_keys(REPEATS_KEY_PREFIX)
+
+
+def _decode_hash(data: dict) -> dict[str, str]:
+	return {frappe.safe_decode(k): frappe.safe_decode(v) for k, v in data.items()}
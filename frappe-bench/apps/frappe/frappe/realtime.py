@@ -1,7 +1,10 @@
 # Copyright (c) 2015, Frappe Technologies Pvt. Ltd. and contributors
 # License: MIT. See LICENSE
 
-from contextlib import suppress
+import itertools
+import time
+from collections.abc import Iterable
+from contextlib import contextmanager, suppress
 
 import redis
 
@@ -79,14 +82,14 @@ def publish_realtime(
 		params = [event, message, room]
 		if params not in frappe.local._realtime_log:
 			frappe.local._realtime_log.append(params)
+	elif buffer := getattr(frappe.local, "_realtime_buffer", None):
+		buffer.add(event, message, room)
 	else:
 		emit_via_redis(event, message, room)
 
 
 def flush_realtime_log():
-	for args in frappe.local._realtime_log:
-		frappe.realtime.emit_via_redis(*args)
-
+	emit_many_via_redis(frappe.local._realtime_log)
 	clear_realtime_log()
 
 
@@ -105,12 +108,78 @@ def emit_via_redis(event, message, room):
 
 	with suppress(redis.exceptions.ConnectionError):
 		r = get_redis_connection_without_auth()
-		r.publish(
-			"events",
-			frappe.as_json(
-				{"event": event, "message": message, "room": room, "namespace": frappe.local.site}
-			),
-		)
+		r.publish("events", get_event_payload(event, message, room))
+
+
+def emit_many_via_redis(events: Iterable[tuple[str, dict, str]]):
+	"""Publish (event, message, room) real-time updates via one redis pipeline"""
+	from frappe.utils.background_jobs import get_redis_connection_without_auth
+
+	if not events:
+		return
+
+	with suppress(redis.exceptions.ConnectionError):
+		pipeline = get_redis_connection_without_auth().pipeline(transaction=False)
+		for event, message, room in events:
+			pipeline.publish("events", get_event_payload(event, message, room))
+		pipeline.execute()
+
+
+def get_event_payload(event, message, room):
+	return frappe.as_json({"event": event, "message": message, "room": room, "namespace": frappe.local.site})
+
+
+@contextmanager
+def coalesce_realtime(events: Iterable[str] = (), interval: float = 0.5, max_size: int = 500):
+	"""Buffer real-time updates published inside the block and send them in batches.
+
+	Buffered updates are sent through one redis pipeline once `interval` seconds passed since the
+	previous batch or `max_size` updates are waiting, and when the block exits. Updates for `events`
+	only keep their latest message per room within a batch, so progress streams send a bounded number
+	of messages however fast they are published.
+
+	Usage:
+		with frappe.realtime.coalesce_realtime(events=["data_import_progress"]):
+			for row in rows:
+				import_row(row)
+				frappe.publish_realtime("data_import_progress", {...})
+
+	Updates published with `after_commit=True` are not buffered, they are already sent together.
+	"""
+	previous = getattr(frappe.local, "_realtime_buffer", None)
+	buffer = frappe.local._realtime_buffer = RealtimeBuffer(events, interval, max_size)
+	try:
+		yield buffer
+	finally:
+		frappe.local._realtime_buffer = previous
+		buffer.flush()
+
+
+class RealtimeBuffer:
+	def __init__(self, coalesce: Iterable[str], interval: float, max_size: int):
+		self.coalesce = frozenset(coalesce)
+		self.interval = interval
+		self.max_size = max_size
+		self.updates: dict[tuple, tuple[str, dict, str]] = {}
+		self.counter = itertools.count()
+		self.last_flush = time.monotonic()
+
+	def add(self, event: str, message: dict, room: str):
+		if event in self.coalesce:
+			# the latest message supersedes the pending one and takes its place at the end
+			key = (room, event)
+			self.updates.pop(key, None)
+		else:
+			key = (next(self.counter),)
+		self.updates[key] = (event, message, room)
+
+		if len(self.updates) >= self.max_size or time.monotonic() - self.last_flush >= self.interval:
+			self.flush()
+
+	def flush(self):
+		updates, self.updates = list(self.updates.values()), {}
+		self.last_flush = time.monotonic()
+		emit_many_via_redis(updates)
 
 
 @frappe.whitelist(allow_guest=True)
@@ -100,6 +100,58 @@ class TestAssign(IntegrationTestCase):
 
 		self.assertFalse(get_assignments("ToDo", todo.name))
 
+	def test_bulk_assign(self):
+		for user in ("test_assign1@example.com", "test_assign2@example.com"):
+			if not frappe.db.exists("User", user):
+				frappe.get_doc(
+					{
+						"doctype": "User",
+						"email": user,
+						"first_name": "Test",
+						"roles": [{"role": "System Manager"}],
+					}
+				).insert()
+
+		notes = [_make_test_record(public=1) for _ in range(3)]
+		assign(notes[0], "test_assign1@example.com")
+
+		todos = frappe.desk.form.assign_to.add_bulk(
+			TEST_DOCTYPE,
+			{
+				notes[0].name: ["test_assign1@example.com", "test_assign2@example.com"],
+				notes[1].name: "test_assign2@example.com",
+				notes[2].name: "test_assign1@example.com",
+			},
+		)
+
+		# already assigned users are skipped
+		self.assertEqual(
+			[(todo.reference_name, todo.allocated_to) for todo in todos],
+			[
+				(notes[0].name, "test_assign2@example.com"),
+				(notes[1].name, "test_assign2@example.com"),
+				(notes[2].name, "test_assign1@example.com"),
+			],
+		)
+		self.assertEqual(
+			frappe.parse_json(frappe.db.get_value(TEST_DOCTYPE, notes[0].name, "_assign")),
+			["test_assign1@example.com", "test_assign2@example.com"],
+		)
+		self.assertEqual(
+			[d.owner for d in get_assignments(TEST_DOCTYPE, notes[1].name)],
+			["test_assign2@example.com"],
+		)
+		self.assertTrue(
+			frappe.db.exists(
+				"Comment",
+				{
+					"reference_doctype": TEST_DOCTYPE,
+					"reference_name": notes[2].name,
+					"comment_type": "Assigned",
+				},
+			)
+		)
+
 
 def assign(doc, user):
 	return frappe.desk.form.assign_to.add(
@@ -92,6 +92,33 @@ class TestClientCache(IntegrationTestCase):
 
 		self.assertEqual(len(c.cache), 2)
 
+	def test_client_cache_lru_eviction(self):
+		c = ClientCache(maxsize=2)
+		c.set_value("doctype_meta::A", 1)
+		c.set_value("doctype_meta::B", 2)
+		c.get_value("doctype_meta::A")
+		c.set_value("document_cache::C", 3)
+
+		with self.assertRedisCallCounts(0):
+			self.assertEqual(c.get_value("doctype_meta::A"), 1)
+			self.assertEqual(c.get_value("document_cache::C"), 3)
+		self.assertNotIn(c.redis.make_key("doctype_meta::B"), c.cache)
+
+		stats = c.namespace_statistics
+		self.assertEqual(stats["doctype_meta"]["hits"], 2)
+		self.assertEqual(stats["doctype_meta"]["evictions"], 1)
+		self.assertEqual(stats["document_cache"]["used"], 1)
+		self.assertEqual(c.statistics.evictions, 1)
+
+	def test_client_cache_max_bytes(self):
+		c = ClientCache(max_bytes=10_000)
+		for i in range(5):
+			c.set_value(f"test_bytes::{i}", "x" * 3000)
+
+		self.assertEqual(len(c.cache), 3)
+		self.assertLessEqual(c.statistics.used_bytes, 10_000)
+		self.assertEqual(c.namespace_statistics["test_bytes"]["evictions"], 2)
+
 	def test_shared_keyspace(self):
 		val = frappe.generate_hash()
 		frappe.client_cache.set_value(TEST_KEY, val)
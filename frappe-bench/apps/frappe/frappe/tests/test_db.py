@@ -11,6 +11,7 @@ from frappe.core.utils import find
 from frappe.custom.doctype.custom_field.custom_field import create_custom_field
 from frappe.database import savepoint
 from frappe.database.database import get_query_execution_timeout
+from frappe.database.replica import REPLICA_LAG_KEY, get_read_your_writes_key
 from frappe.database.utils import FallBackDateTimeStr
 from frappe.query_builder import Field
 from frappe.query_builder.functions import Concat_ws
@@ -1046,10 +1047,19 @@ class TestTransactionManagement(IntegrationTestCase):
 		self.assertEqual(_get_transaction_id(), _get_transaction_id())
 
 
+REPLICA_CONF = {"read_from_replica": 1, "replica_host": "127.0.0.1", "replica_max_lag": 0}
+
+
 # Treat same DB as replica for tests, a separate connection will be opened
 class TestReplicaConnections(IntegrationTestCase):
+	def setUp(self):
+		# uncommitted writes and recent commits keep reads on the primary
+		frappe.db.rollback()
+		frappe.cache.delete_value(get_read_your_writes_key())
+		frappe.cache.delete_value(REPLICA_LAG_KEY)
+
 	def test_switching_to_replica(self):
-		with patch.dict(frappe.local.conf, {"read_from_replica": 1, "replica_host": "127.0.0.1"}):
+		with patch.dict(frappe.local.conf, REPLICA_CONF):
 
 			def db_id():
 				return id(frappe.local.db)
@@ -1076,6 +1086,51 @@ class TestReplicaConnections(IntegrationTestCase):
 			outer()
 			self.assertEqual(write_connection, db_id())
 
+	def test_replica_read_your_writes(self):
+		@frappe.read_only()
+		def read_connection():
+			return id(frappe.local.db)
+
+		with patch.dict(frappe.local.conf, REPLICA_CONF):
+			write_connection = id(frappe.local.db)
+			self.assertNotEqual(read_connection(), write_connection)
+
+			frappe.db.set_value(
+				"User", "Administrator", "modified_by", "Administrator", update_modified=False
+			)
+			# uncommitted write
+			self.assertEqual(read_connection(), write_connection)
+			frappe.db.commit()
+			# committed recently
+			self.assertEqual(read_connection(), write_connection)
+
+			frappe.cache.delete_value(get_read_your_writes_key())
+			self.assertNotEqual(read_connection(), write_connection)
+
+	def test_replica_lag_guard(self):
+		@frappe.read_only()
+		def read_connection():
+			return id(frappe.local.db)
+
+		with patch.dict(frappe.local.conf, {**REPLICA_CONF, "replica_max_lag": 10}):
+			write_connection = id(frappe.local.db)
+			with patch("frappe.database.replica.get_replica_lag", return_value=60):
+				self.assertEqual(read_connection(), write_connection)
+
+			frappe.cache.delete_value(REPLICA_LAG_KEY)
+			with patch("frappe.database.replica.get_replica_lag", return_value=1):
+				self.assertNotEqual(read_connection(), write_connection)
+
+			frappe.cache.delete_value(REPLICA_LAG_KEY)
+			with patch("frappe.database.replica.get_replica_lag", return_value=None):
+				self.assertEqual(read_connection(), write_connection)
+
+			# a failing lag check doesn't leave the replica connection in place
+			frappe.cache.delete_value(REPLICA_LAG_KEY)
+			with patch("frappe.database.replica.get_replica_lag", side_effect=ValueError):
+				self.assertRaises(ValueError, read_connection)
+			self.assertEqual(id(frappe.local.db), write_connection)
+
 
 class TestConcurrency(IntegrationTestCase):
 	@timeout(5, "There shouldn't be any lock wait")
@@ -70,6 +70,22 @@ class TestDBQuery(IntegrationTestCase):
 
 		clear_custom_fields("DocType")
 
+	def test_query_plan_reuse(self):
+		fields = ["name", "module.app_name as app_name", "`tabDocField`.fieldname"]
+		filters = {"name": "User"}
+		frappe.get_list("DocType", fields=fields, filters=filters, limit=1)
+
+		with patch.object(DatabaseQuery, "sanitize_fields") as sanitize_fields:
+			self.assertEqual(
+				DatabaseQuery("DocType").execute(fields=fields, filters=filters, run=False),
+				frappe.get_list("DocType", fields=fields, filters=filters, run=False),
+			)
+			result = frappe.get_list("DocType", fields=fields, filters={"name": "Note"}, limit=1)
+
+		sanitize_fields.assert_not_called()
+		self.assertEqual(result[0].name, "Note")
+		self.assertEqual(result[0].app_name, "frappe")
+
 	def test_child_table_field_syntax(self):
 		note = frappe.get_doc(
 			doctype="Note",
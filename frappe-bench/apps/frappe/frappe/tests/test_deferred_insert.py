@@ -1,3 +1,5 @@
+from unittest.mock import patch
+
 import frappe
 from frappe.deferred_insert import deferred_insert, save_to_db
 from frappe.tests import IntegrationTestCase
@@ -16,3 +18,25 @@ class TestDeferredInsert(IntegrationTestCase):
 		frappe.clear_cache()  # deferred_insert cache keys are supposed to be persistent
 		save_to_db()
 		self.assertTrue(frappe.db.exists("Route History", route_history))
+
+	def test_bulk_deferred_insert(self):
+		routes = [{"route": frappe.generate_hash(), "user": "Administrator"} for _ in range(5)]
+		deferred_insert("Route History", routes[:3])
+		deferred_insert("Route History", routes[3])
+
+		stats = save_to_db()
+		self.assertEqual(stats["Route History"]["inserted"], 5)
+		self.assertEqual(stats["Route History"]["pending"], 0)
+		for route in routes:
+			self.assertTrue(frappe.db.exists("Route History", route))
+
+	def test_bulk_deferred_insert_fallback(self):
+		routes = [{"route": frappe.generate_hash(), "user": "Administrator"} for _ in range(3)]
+		deferred_insert("Route History", routes)
+
+		with patch.object(frappe.db, "bulk_insert", side_effect=frappe.DuplicateEntryError):
+			stats = save_to_db()
+
+		self.assertEqual(stats["Route History"]["inserted"], 3)
+		for route in routes:
+			self.assertTrue(frappe.db.exists("Route History", route))
@@ -8,6 +8,8 @@ import frappe
 from frappe.app import make_form_dict
 from frappe.core.doctype.doctype.test_doctype import new_doctype
 from frappe.desk.doctype.note.note import Note
+from frappe.model.base_document import BaseDocument
+from frappe.model.document import Document
 from frappe.model.naming import make_autoname, parse_naming_series, revert_series_if_last
 from frappe.tests import IntegrationTestCase
 from frappe.utils import cint, now_datetime, set_request
@@ -76,6 +78,68 @@ class TestDocument(IntegrationTestCase):
 		doc.save()
 		self.assertEqual(doc.child_table[-1].some_fieldname, default)
 
+	def new_parent_doctype(self) -> tuple[str, str]:
+		"""Returns the names of a new doctype with a `title` and a `child_table` and of its child table"""
+		child_table = new_doctype(istable=1).insert().name
+		parent = new_doctype(
+			fields=[
+				{"fieldtype": "Data", "label": "Title", "fieldname": "title"},
+				{"fieldtype": "Table", "options": child_table, "fieldname": "child_table"},
+			]
+		).insert()
+		return parent.name, child_table
+
+	def test_save_writes_changed_child_rows(self):
+		parent, child_table = self.new_parent_doctype()
+		doc = frappe.get_doc(
+			{"doctype": parent, "child_table": [{"some_fieldname": str(i)} for i in range(50)]}
+		).insert()
+
+		with patch.object(
+			BaseDocument, "db_update", autospec=True, side_effect=BaseDocument.db_update
+		) as db_update:
+			doc.title = "changed"
+			doc.child_table[1].some_fieldname = "changed"
+			doc.remove(doc.child_table[-1])
+			doc.append("child_table", {"some_fieldname": "new"})
+			doc.save()
+
+		written = [call.args[0] for call in db_update.call_args_list if call.args[0].doctype == child_table]
+		self.assertEqual([row.some_fieldname for row in written], ["changed", "new"])
+
+		doc.reload()
+		self.assertEqual(doc.title, "changed")
+		self.assertEqual(len(doc.child_table), 50)
+		self.assertEqual(doc.child_table[1].some_fieldname, "changed")
+		self.assertEqual([row.some_fieldname for row in doc.child_table[-2:]], ["48", "new"])
+
+	def test_snapshot_before_save(self):
+		parent, child_table = self.new_parent_doctype()
+		name = (
+			frappe.get_doc({"doctype": parent, "title": "old", "child_table": [{"some_fieldname": "old"}]})
+			.insert()
+			.name
+		)
+
+		with self.patch_hooks({"snapshot_before_save_doctypes": [parent]}):
+			doc = frappe.get_doc(parent, name)
+			doc.title = "new"
+			doc.child_table[0].some_fieldname = "new"
+			with patch.object(Document, "load_from_db", autospec=True) as load_from_db:
+				doc.save()
+			load_from_db.assert_not_called()
+
+			self.assertTrue(doc.has_value_changed("title"))
+			self.assertEqual(doc.get_doc_before_save().title, "old")
+			self.assertEqual(doc.get_doc_before_save().child_table[0].some_fieldname, "old")
+			self.assertEqual(frappe.db.get_value(child_table, {"parent": name}, "some_fieldname"), "new")
+
+			# modified by someone else after loading, falls back to a reload and detects it
+			doc = frappe.get_doc(parent, name)
+			frappe.db.set_value(parent, name, "title", "other", update_modified=True)
+			doc.title = "newer"
+			self.assertRaises(frappe.TimestampMismatchError, doc.save)
+
 	def test_insert_with_child(self):
 		d = frappe.get_doc(
 			{
@@ -96,6 +160,18 @@ class TestDocument(IntegrationTestCase):
 
 		self.assertEqual(frappe.db.get_value(d.doctype, d.name, "subject"), "subject changed")
 
+	def test_get_docs(self):
+		events = [self.test_insert() for _ in range(3)]
+		names = [d.name for d in reversed(events)]
+
+		docs = frappe.get_docs("Event", [*names, names[0]])
+		self.assertEqual([d.name for d in docs], names)
+		for doc in docs:
+			self.assertIsInstance(doc, frappe.get_doc("Event", doc.name).__class__)
+			self.assertEqual(doc.as_dict(), frappe.get_doc("Event", doc.name).as_dict())
+
+		self.assertRaises(frappe.DoesNotExistError, frappe.get_docs, "Event", [*names, "not-an-event"])
+
 	def test_discard_transitions(self):
 		d = self.test_insert()
 		self.assertEqual(d.docstatus, 0)
@@ -82,6 +82,34 @@ class TestEmail(IntegrationTestCase):
 		self.assertEqual(len(queue_recipients), 2)
 		self.assertTrue("Unsubscribe" in frappe.safe_decode(frappe.flags.sent_mail))
 
+	def test_flush_reuses_smtp_server(self):
+		from frappe.email.doctype.email_account.email_account import EmailAccount
+		from frappe.email.queue import flush
+
+		for i in range(3):
+			frappe.sendmail(
+				recipients=[f"test{i}@example.com"],
+				sender="admin@example.com",
+				subject=f"Testing Queue {i}",
+				message="This mail is queued!",
+			)
+
+		with patch.object(EmailAccount, "get_smtp_server") as get_smtp_server:
+			flush()
+
+		get_smtp_server.assert_called_once()
+		self.assertEqual(frappe.db.count("Email Queue", {"status": "Sent"}), 3)
+
+	def test_flush_skips_claimed_emails(self):
+		from frappe.email.queue import claim_email_queue
+
+		self.test_email_queue()
+		name = frappe.db.get_value("Email Queue", {"status": "Not Sent"})
+		self.assertTrue(claim_email_queue(name))
+
+		frappe.db.set_value("Email Queue", name, "status", "Sending")
+		self.assertFalse(claim_email_queue(name))
+
 	def test_cc_header(self):
 		# test if sending with cc's makes it into header
 		frappe.sendmail(
@@ -0,0 +1,80 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# License: MIT. See LICENSE
+
+from unittest.mock import patch
+
+import frappe
+from frappe import query_profiler
+from frappe.query_profiler import REPEAT_THRESHOLD, get_api_route, get_percentile, get_query_shape
+from frappe.tests import IntegrationTestCase
+from frappe.utils import set_request
+
+
+class TestQueryProfiler(IntegrationTestCase):
+	def setUp(self):
+		query_profiler.reset()
+		set_request(path="/api/method/frappe.tests.test_query_profiler.sample_method")
+		frappe.local.form_dict.cmd = "frappe.tests.test_query_profiler.sample_method"
+
+	def tearDown(self):
+		query_profiler.reset()
+
+	def test_query_shape(self):
+		self.assertEqual(
+			get_query_shape("select name from `tabUser` where name = 'a' and idx in (1, 2,3) limit 20"),
+			get_query_shape("select  name from `tabUser`\nwhere name = %s and idx in (%s) limit %(limit)s"),
+		)
+
+	def test_api_route(self):
+		self.assertEqual(
+			get_api_route("POST", "/api/method/frappe.client.get_list"), "frappe.client.get_list"
+		)
+		self.assertEqual(get_api_route("GET", "/api/v2/method/frappe.ping"), "frappe.ping")
+		self.assertEqual(
+			get_api_route("POST", "/api/v2/method/User/send_welcome_mail"),
+			"/api/v2/method/{doctype}/send_welcome_mail",
+		)
+		self.assertEqual(
+			get_api_route("GET", "/api/resource/User/test@example.com"), "GET /api/resource/{doctype}/{name}"
+		)
+		self.assertEqual(get_api_route("POST", "/api/v2/document/User"), "POST /api/v2/document/{doctype}")
+		self.assertIsNone(get_api_route("GET", "/app/user"))
+		self.assertIsNone(get_api_route("GET", "/api/unknown/User"))
+
+	def test_percentile(self):
+		buckets = (10, 100, 1000)
+		counts = {10: 90, 100: 8, 1000: 2}
+		self.assertEqual(get_percentile(buckets, counts, 50), 10)
+		self.assertEqual(get_percentile(buckets, counts, 95), 100)
+		self.assertEqual(get_percentile(buckets, counts, 99), 1000)
+		self.assertIsNone(get_percentile(buckets, {}, 50))
+
+	def test_sampled_request(self):
+		with patch.dict(frappe.local.conf, {"query_profiler_sample_rate": 1}):
+			query_profiler.start()
+			sample_method()
+			query_profiler.stop()
+
+		(row,) = query_profiler.get_report()
+		self.assertEqual(row["method"], "frappe.tests.test_query_profiler.sample_method")
+		self.assertEqual(row["requests"], 1)
+		self.assertGreaterEqual(row["avg_queries"], REPEAT_THRESHOLD + 1)
+
+		(n_plus_one,) = row["n_plus_one"]
+		self.assertIn("`tabUser`", n_plus_one["query"])
+		self.assertEqual(n_plus_one["avg_repeats"], REPEAT_THRESHOLD)
+
+	def test_not_sampled(self):
+		original_sql = frappe.db.sql
+		with patch.dict(frappe.local.conf, {"query_profiler_sample_rate": 0}):
+			query_profiler.start()
+			self.assertEqual(frappe.db.sql, original_sql)
+			query_profiler.stop()
+
+		self.assertEqual(query_profiler.get_report(), [])
+
+
+def sample_method():
+	frappe.db.sql("select name from `tabDocType` limit 1")
+	for i in range(REPEAT_THRESHOLD):
+		frappe.db.sql("select name from `tabUser` where name = %s", f"user-{i}")
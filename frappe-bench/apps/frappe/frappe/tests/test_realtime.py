@@ -0,0 +1,41 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# License: MIT. See LICENSE
+
+from unittest.mock import patch
+
+import frappe
+from frappe.realtime import coalesce_realtime
+from frappe.tests import IntegrationTestCase
+
+
+class TestRealtime(IntegrationTestCase):
+	@patch("frappe.realtime.emit_via_redis")
+	@patch("frappe.realtime.emit_many_via_redis")
+	def test_coalesce_realtime(self, emit_many, emit):
+		with coalesce_realtime(events=["progress"], interval=3600):
+			for i in range(10):
+				frappe.publish_realtime("progress", {"current": i}, room="test_room")
+			frappe.publish_realtime("other", {"value": 1}, room="test_room")
+			frappe.publish_realtime("other", {"value": 2}, room="test_room")
+			emit_many.assert_not_called()
+
+		emit.assert_not_called()
+		emit_many.assert_called_once_with(
+			[
+				("progress", {"current": 9}, "test_room"),
+				("other", {"value": 1}, "test_room"),
+				("other", {"value": 2}, "test_room"),
+			]
+		)
+		self.assertIsNone(frappe.local._realtime_buffer)
+
+		frappe.publish_realtime("progress", {"current": 10}, room="test_room")
+		emit.assert_called_once_with("progress", {"current": 10}, "test_room")
+
+	@patch("frappe.realtime.emit_many_via_redis")
+	def test_coalesce_realtime_max_size(self, emit_many):
+		with coalesce_realtime(interval=3600, max_size=5):
+			for i in range(12):
+				frappe.publish_realtime("event", {"value": i}, room="test_room")
+
+		self.assertEqual([len(call.args[0]) for call in emit_many.call_args_list], [5, 5, 2])
@@ -2,10 +2,11 @@
 # License: MIT. See LICENSE
 import pickle
 import re
+import sys
 import threading
 import time
 import typing
-from collections import namedtuple
+from collections import Counter, OrderedDict, namedtuple
 from contextlib import suppress
 
 import redis
@@ -427,12 +428,17 @@ class _TrackedConnection(redis.Connection):
 				raise
 
 
-CachedValue = namedtuple("CachedValue", ["value", "expiry"])
+CachedValue = namedtuple("CachedValue", ["value", "expiry", "size", "namespace"], defaults=[0, None])
 CacheStatistics = namedtuple(
-	"CacheStatistics", ["hits", "misses", "capacity", "used", "utilization", "hit_ratio", "healthy"]
+	"CacheStatistics",
+	["hits", "misses", "evictions", "capacity", "used", "utilization", "hit_ratio", "healthy", "used_bytes"],
 )
 _PLACEHOLDER_VALUE = CachedValue(value=None, expiry=-1)
 
+# Keys after the first `_MAX_NAMESPACES` distinct namespaces are counted under `_OTHER_NAMESPACE`
+_MAX_NAMESPACES = 256
+_OTHER_NAMESPACE = "other"
+
 
 class ClientCache:
 	"""A subset of RedisWrapper that keeps "local" cache across requests.
@@ -460,16 +466,29 @@ class ClientCache:
 		  default Redis cache behaviour.
 		- Never use `frappe.cache`'s request local cache along with client-side cache. Two
 		  different copies of same key are a big source of data races.
-		- This cache uses simple FIFO eviction policy. Make sure your access patterns don't cause
-		  the worst case behaviour for this policy. E.g. looping over `maxsize` items repeatedly.
+		- This cache uses LRU eviction policy, bounded by `maxsize` keys and optionally by
+		  `max_bytes`, the approximate (pickled) size of the cached values. Make sure your access
+		  patterns don't cause the worst case behaviour for this policy. E.g. looping over
+		  `maxsize` items repeatedly.
+		- Hits, misses and evictions are also counted per namespace, the part of the key before
+		  the first `::` (e.g. `doctype_meta`, `document_cache`), see `namespace_statistics`.
 	"""
 
-	def __init__(self, maxsize: int = 1024, ttl=10 * 60, monitor: RedisWrapper | None = None) -> None:
+	def __init__(
+		self,
+		maxsize: int = 1024,
+		ttl=10 * 60,
+		monitor: RedisWrapper | None = None,
+		max_bytes: int | None = None,
+	) -> None:
 		self.maxsize = maxsize or 1024  # Expect 1024 * 4kb objects ~ 4MB
+		self.max_bytes = max_bytes
 		self.local_ttl = ttl
 		# This guards writes to self.cache, reads are done without a lock.
 		self.lock = threading.RLock()
-		self.cache: dict[bytes, CachedValue] = {}
+		# Least recently used keys first
+		self.cache: OrderedDict[bytes, CachedValue] = OrderedDict()
+		self.used_bytes = 0
 
 		self.invalidator = frappe.cache
 		self.healthy = True
@@ -487,7 +506,9 @@ class ClientCache:
 		# - Local miss = not found in worker memory
 		# - Global miss = not found in Redis too
 		# These stats can be *slightly* off, these aren't guarded by a mutex.
-		self.hits = self.misses = 0
+		self.hits = self.misses = self.evictions = 0
+		# namespace -> [hits, misses, evictions]
+		self.namespace_stats: dict[str, list[int]] = {}
 
 		if not self.invalidator_id:
 			return
@@ -509,14 +530,21 @@ class ClientCache:
 			val = self.cache[key]
 			if time.monotonic() < val.expiry:
 				self.hits += 1
+				self._count(val.namespace, 0)
+				# Reordering is a write, it must not race with eviction iterating over the cache
+				with self.lock, suppress(KeyError):
+					self.cache.move_to_end(key)
 				return val.value
 		except KeyError:
 			pass
 
 		self.misses += 1
+		namespace = self.get_namespace(key)
+		self._count(namespace, 1)
 
 		# Store a placeholder value to detect race between GET and parallel invalidation.
 		with self.lock:
+			self._pop(key)
 			self.cache[key] = _PLACEHOLDER_VALUE
 
 		val = self.redis.get_value(key, shared=True, use_local_cache=not self.healthy)
@@ -532,21 +560,19 @@ class ClientCache:
 			else:
 				return None
 
-		self.ensure_max_size()
 		with self.lock:
 			# Note: If our placeholder value is not present then it's possible that value we just
 			# got is invalidated, so we should not store it in local cache.
 			if key in self.cache:
-				self.cache[key] = CachedValue(value=val, expiry=time.monotonic() + self.local_ttl)
+				self._store(key, val, namespace)
 
 		return val
 
 	def set_value(self, key, val, *, shared=False):
 		key = self.redis.make_key(key, shared=shared)
-		self.ensure_max_size()
 		self.redis.set_value(key, val, shared=True)
 		with self.lock:
-			self.cache[key] = CachedValue(value=val, expiry=time.monotonic() + self.local_ttl)
+			self._store(key, val, self.get_namespace(key))
 		# XXX: We need to tell redis that we indeed read this key we just wrote
 		# This is an edge case:
 		# - Client A writes a key and reads it again from local cache
@@ -565,23 +591,67 @@ class ClientCache:
 		key = frappe.get_document_cache_key(doctype, name)
 		return self.get_value(key, generator=lambda: frappe.get_doc(doctype, name))
 
+	def _store(self, key: bytes, val, namespace: str) -> None:
+		"""Store `val` as the most recently used key and evict least recently used keys over the limits.
+
+		Caller must hold `self.lock`."""
+		size = get_approximate_size(val) if self.max_bytes else 0
+		self._pop(key)
+		self.cache[key] = CachedValue(
+			value=val, expiry=time.monotonic() + self.local_ttl, size=size, namespace=namespace
+		)
+		self.used_bytes += size
+		self.ensure_max_size()
+
+	def _pop(self, key: bytes) -> CachedValue | None:
+		"""Caller must hold `self.lock`"""
+		val = self.cache.pop(key, None)
+		if val:
+			self.used_bytes -= val.size
+		return val
+
 	def ensure_max_size(self):
-		if len(self.cache) >= self.maxsize:
-			with self.lock, suppress(RuntimeError):
-				self.cache.pop(next(iter(self.cache)), None)
+		with self.lock, suppress(RuntimeError):
+			while len(self.cache) > self.maxsize or (
+				self.max_bytes and self.used_bytes > self.max_bytes and len(self.cache) > 1
+			):
+				key = next(iter(self.cache))
+				val = self._pop(key)
+				if val is not _PLACEHOLDER_VALUE:
+					self.evictions += 1
+					self._count(val.namespace, 2)
+
+	def get_namespace(self, key: bytes) -> str:
+		"""Returns the part of the key before `::`, without the site prefix"""
+		key = cstr(key).split("|", 1)[-1]
+		namespace, sep, _ = key.partition("::")
+		if not sep:
+			namespace = key
+		if namespace not in self.namespace_stats and len(self.namespace_stats) >= _MAX_NAMESPACES:
+			return _OTHER_NAMESPACE
+		return namespace
+
+	def _count(self, namespace: str | None, stat: int) -> None:
+		if namespace is None:
+			return
+		try:
+			self.namespace_stats[namespace][stat] += 1
+		except KeyError:
+			counters = self.namespace_stats.setdefault(namespace, [0, 0, 0])
+			counters[stat] += 1
 
 	def delete_value(self, key, *, shared=False):
 		key = self.redis.make_key(key, shared=shared)
 		self.redis.delete_value(key, shared=True)
 		with self.lock:
-			self.cache.pop(key, None)
+			self._pop(key)
 
 	def delete_keys(self, pattern):
 		keys = self.redis.get_keys(pattern)
 		self.redis.delete_value(keys, shared=True, make_keys=False)
 		with self.lock:
 			for key in keys:
-				self.cache.pop(key, None)
+				self._pop(key)
 
 	def run_invalidator_thread(self):
 		self._watcher = self.invalidator.pubsub()
@@ -599,7 +669,7 @@ class ClientCache:
 			return
 		with self.lock:
 			for key in message["data"]:
-				self.cache.pop(key, None)
+				self._pop(key)
 
 	def _exception_handler(self, exc, pubsub, pubsub_thread):
 		if isinstance(exc, (redis.exceptions.ConnectionError)):
@@ -616,18 +686,45 @@ class ClientCache:
 	def clear_cache(self):
 		with self.lock:
 			self.cache.clear()
+			self.used_bytes = 0
 
 	@property
 	def statistics(self) -> CacheStatistics:
 		return CacheStatistics(
 			hits=self.hits,
 			misses=self.misses,
+			evictions=self.evictions,
 			capacity=self.maxsize,
 			used=len(self.cache),
 			healthy=self.healthy,
 			utilization=round(len(self.cache) / self.maxsize, 2),
 			hit_ratio=round(self.hits / (self.hits + self.misses), 2) if self.hits else None,
+			used_bytes=self.used_bytes,
 		)
 
+	@property
+	def namespace_statistics(self) -> dict[str, dict]:
+		"""Hits, misses, evictions and cached keys per namespace"""
+		keys = Counter(val.namespace for val in list(self.cache.values()) if val.namespace)
+		stats = {}
+		for namespace, (hits, misses, evictions) in list(self.namespace_stats.items()):
+			stats[namespace] = {
+				"hits": hits,
+				"misses": misses,
+				"evictions": evictions,
+				"used": keys[namespace],
+				"hit_ratio": round(hits / (hits + misses), 2) if hits else None,
+			}
+		return stats
+
 	def reset_statistics(self):
-		self.hits = self.misses = 0
+		self.hits = self.misses = self.evictions = 0
+		self.namespace_stats = {}
+
+
+def get_approximate_size(value) -> int:
+	"""Size of the pickled value, as stored in Redis"""
+	try:
+		return len(pickle.dumps(value))
+	except Exception:
+		return sys.getsizeof(value)